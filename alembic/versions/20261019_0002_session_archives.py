@@ -0,0 +1,66 @@
+"""session archives
+
+Revision ID: 20261019_0002
+Revises: 20260205_0001
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0002"
+down_revision = "20260205_0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "session_archives",
+        sa.Column("session_id", postgresql.UUID(as_uuid=True), primary_key=True, nullable=False),
+        sa.Column(
+            "instructor_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("instructors.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("team_id", sa.String(length=6), nullable=False),
+        sa.Column("participant_count", sa.Integer(), nullable=False),
+        sa.Column("message_count", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("ended_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "archived_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column("payload", postgresql.BYTEA(), nullable=False),
+    )
+    op.create_index(
+        "ix_session_archives_instructor_id_created_at",
+        "session_archives",
+        ["instructor_id", "created_at"],
+        unique=False,
+    )
+
+    # Supports the archival job's scan for long-ended sessions.
+    op.create_index(
+        "ix_exercise_sessions_ended_at",
+        "exercise_sessions",
+        ["ended_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 'ended'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_exercise_sessions_ended_at", table_name="exercise_sessions")
+    op.drop_index("ix_session_archives_instructor_id_created_at", table_name="session_archives")
+    op.drop_table("session_archives")
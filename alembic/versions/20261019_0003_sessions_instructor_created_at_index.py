@@ -0,0 +1,32 @@
+"""exercise_sessions (instructor_id, created_at) index
+
+Revision ID: 20261019_0003
+Revises: 20261019_0002
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0003"
+down_revision = "20261019_0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keyset pagination for GET /sessions: (created_at, id) per instructor.
+    op.create_index(
+        "ix_exercise_sessions_instructor_id_created_at",
+        "exercise_sessions",
+        ["instructor_id", "created_at", "id"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_exercise_sessions_instructor_id_created_at", table_name="exercise_sessions")
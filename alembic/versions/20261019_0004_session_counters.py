@@ -0,0 +1,56 @@
+"""exercise_sessions counters
+
+Revision ID: 20261019_0004
+Revises: 20261019_0003
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0004"
+down_revision = "20261019_0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    for column in ("active_participants", "ready_participants", "message_count"):
+        op.add_column(
+            "exercise_sessions",
+            sa.Column(column, sa.Integer(), server_default=sa.text("0"), nullable=False),
+        )
+
+    op.execute(
+        """
+        UPDATE exercise_sessions AS s
+        SET active_participants = (
+                SELECT count(*) FROM participants p
+                WHERE p.session_id = s.id AND p.left_at IS NULL
+            ),
+            ready_participants = (
+                SELECT count(*) FROM participants p
+                WHERE p.session_id = s.id AND p.left_at IS NULL AND p.is_ready
+            ),
+            message_count = (
+                SELECT count(*) FROM messages m WHERE m.session_id = s.id
+            )
+        """
+    )
+
+    op.create_check_constraint(
+        "ck_sessions_counters",
+        "exercise_sessions",
+        "ready_participants BETWEEN 0 AND active_participants AND message_count >= 0",
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("ck_sessions_counters", "exercise_sessions", type_="check")
+    for column in ("message_count", "ready_participants", "active_participants"):
+        op.drop_column("exercise_sessions", column)
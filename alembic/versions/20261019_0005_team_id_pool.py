@@ -0,0 +1,40 @@
+"""team id pool
+
+Revision ID: 20261019_0005
+Revises: 20261019_0004
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0005"
+down_revision = "20261019_0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "team_id_pool",
+        sa.Column("team_id", sa.String(length=6), primary_key=True, nullable=False),
+        sa.Column(
+            "created_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint(
+            "team_id ~ '^[A-HJ-NP-Z2-9]{6}$'",
+            name="ck_team_id_pool_team_id_format",
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("team_id_pool")
@@ -0,0 +1,33 @@
+"""messages idempotency key
+
+Revision ID: 20261019_0006
+Revises: 20261019_0005
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0006"
+down_revision = "20261019_0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("messages", sa.Column("idempotency_key", sa.String(length=255), nullable=True))
+    op.create_unique_constraint(
+        "uq_messages_participant_idempotency_key",
+        "messages",
+        ["participant_id", "idempotency_key"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_messages_participant_idempotency_key", "messages", type_="unique")
+    op.drop_column("messages", "idempotency_key")
@@ -0,0 +1,30 @@
+"""exercise_sessions version
+
+Revision ID: 20261019_0007
+Revises: 20261019_0006
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0007"
+down_revision = "20261019_0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "exercise_sessions",
+        sa.Column("version", sa.Integer(), server_default=sa.text("1"), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("exercise_sessions", "version")
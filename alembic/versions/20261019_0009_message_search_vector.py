@@ -0,0 +1,43 @@
+"""messages full-text search vector
+
+Revision ID: 20261019_0009
+Revises: 20261019_0008
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0009"
+down_revision = "20261019_0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "messages",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('simple'::regconfig, content)", persisted=True),
+            nullable=False,
+        ),
+    )
+    op.create_index(
+        "ix_messages_search_vector",
+        "messages",
+        ["search_vector"],
+        postgresql_using="gin",
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_messages_search_vector", table_name="messages")
+    op.drop_column("messages", "search_vector")
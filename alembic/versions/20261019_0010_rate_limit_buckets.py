@@ -0,0 +1,32 @@
+"""rate limit buckets
+
+Revision ID: 20261019_0010
+Revises: 20261019_0009
+Create Date: 2026-10-19
+
+"""
+
+from __future__ import annotations
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "20261019_0010"
+down_revision = "20261019_0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "rate_limit_buckets",
+        sa.Column("key", sa.Text(), primary_key=True, nullable=False),
+        sa.Column("tat", sa.Double(), nullable=False),
+        prefixes=["UNLOGGED"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("rate_limit_buckets")
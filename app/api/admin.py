@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+import threading
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+
+from app.core.settings import Settings, get_settings
+from app.services.profiler import ProfilerBusy, StackSampler, get_stack_sampler
+
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+
+async def require_admin(
+    settings: Settings = Depends(get_settings),
+    x_admin_token: str | None = Header(default=None, alias="X-Admin-Token"),
+) -> None:
+    # Without a configured token the admin endpoints do not exist.
+    if not settings.admin_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.admin_token.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid admin token")
+
+
+@router.post("/profile", dependencies=[Depends(require_admin)], include_in_schema=False)
+async def profile_worker(
+    seconds: float = Query(default=10.0, gt=0, le=60),
+    interval_ms: float = Query(default=10.0, ge=1, le=1000),
+    tasks: bool = Query(default=False),
+    sampler: StackSampler = Depends(get_stack_sampler),
+) -> Response:
+    loop = asyncio.get_running_loop()
+    try:
+        collapsed, samples = await asyncio.to_thread(
+            sampler.profile,
+            loop,
+            threading.get_ident(),
+            seconds=seconds,
+            interval=interval_ms / 1000,
+            tasks=tasks,
+        )
+    except ProfilerBusy:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="A profile is already running")
+
+    filename = f"profile-{datetime.now(timezone.utc):%Y%m%dT%H%M%SZ}.collapsed"
+    return Response(
+        content=collapsed,
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Profile-Samples": str(samples)},
+    )
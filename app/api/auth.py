@@ -8,6 +8,7 @@ from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.rate_limits import limit_by_ip
 from app.core.security import create_access_token, hash_password, verify_password
 from app.core.settings import Settings, get_settings
 from app.db.deps import get_db_session
@@ -37,7 +38,7 @@ class InstructorResponse(BaseModel):
     username: str
 
 
-@router.post("/login", response_model=TokenResponse)
+@router.post("/login", response_model=TokenResponse, dependencies=[Depends(limit_by_ip("login_ip"))])
 async def login(
     body: LoginRequest,
     db: AsyncSession = Depends(get_db_session),
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import decode_access_token
 from app.core.settings import Settings, get_settings
+from app.core.tracing import traced
 from app.db.deps import get_db_session
 from app.db.models.instructor import Instructor
 
@@ -16,6 +17,7 @@ from app.db.models.instructor import Instructor
 _bearer = HTTPBearer(auto_error=False)
 
 
+@traced("get_current_instructor")
 async def get_current_instructor(
     credentials: HTTPAuthorizationCredentials | None = Depends(_bearer),
     db: AsyncSession = Depends(get_db_session),
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.settings import Settings, get_settings
+from app.db.deps import get_sessionmaker
+
+
+router = APIRouter(tags=["health"])
+
+
+@router.get("/healthz", include_in_schema=False)
+async def healthz() -> dict[str, str]:
+    return {"status": "ok"}
+
+
+@router.get("/readyz", include_in_schema=False)
+async def readyz(
+    request: Request,
+    sessionmaker: async_sessionmaker[AsyncSession] = Depends(get_sessionmaker),
+    settings: Settings = Depends(get_settings),
+) -> dict[str, str]:
+    if not getattr(request.app.state, "pool_warmed", False):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Warming up")
+
+    try:
+        async with sessionmaker() as db:
+            await asyncio.wait_for(db.execute(text("SELECT 1")), settings.readiness_timeout_seconds)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database unreachable")
+    return {"status": "ready"}
@@ -4,16 +4,21 @@ import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
-from sqlalchemy import func, select
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.rate_limits import enforce_rate_limit, limit_by_ip
 from app.core.settings import Settings, get_settings
 from app.db.deps import get_db_session
-from app.db.models.exercise_session import ExerciseSession, SessionStatus
+from app.db.models.exercise_session import SessionStatus
 from app.db.models.participant import Participant
+from app.services.outbox import add_outbox_event, publish_outbox_event
 from app.services.participant_tokens import generate_participant_token, hash_participant_token
-from app.ws.deps import get_ws_manager
+from app.services.rate_limit import RateLimiter, get_rate_limiter
+from app.services.session_state import add_participant, lock_session_by_team_id
+from app.ws.deps import get_event_dispatcher, get_ws_manager
+from app.ws.dispatcher import EventDispatcher
 from app.ws.manager import WsManager
 
 
@@ -31,15 +36,17 @@ class JoinResponse(BaseModel):
     session_id: uuid.UUID
 
 
-@router.post("/join", response_model=JoinResponse)
+@router.post("/join", response_model=JoinResponse, dependencies=[Depends(limit_by_ip("join_ip"))])
 async def join_session(
     body: JoinRequest,
     db: AsyncSession = Depends(get_db_session),
     settings: Settings = Depends(get_settings),
     ws: WsManager = Depends(get_ws_manager),
+    events: EventDispatcher = Depends(get_event_dispatcher),
+    limiter: RateLimiter = Depends(get_rate_limiter),
 ) -> JoinResponse:
-    result = await db.execute(select(ExerciseSession).where(ExerciseSession.team_id == body.team_id))
-    session = result.scalar_one_or_none()
+    await enforce_rate_limit(limiter, settings, "join_team", body.team_id)
+    session = await lock_session_by_team_id(db, body.team_id)
 
     if session is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
@@ -47,14 +54,7 @@ async def join_session(
     if session.status != SessionStatus.lobby:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session is not joinable")
 
-    count_result = await db.execute(
-        select(func.count())
-        .select_from(Participant)
-        .where(Participant.session_id == session.id)
-        .where(Participant.left_at.is_(None))
-    )
-    active_count = int(count_result.scalar_one())
-    if active_count >= session.max_participants:
+    if session.active_participants >= session.max_participants:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session is full")
 
     exists_result = await db.execute(
@@ -72,29 +72,32 @@ async def join_session(
         session_id=session.id,
         display_name=body.display_name,
         token_hash=token_hash,
+        is_ready=False,
     )
     db.add(participant)
+    add_participant(session, participant)
 
     try:
+        await db.flush()
+        event = add_outbox_event(
+            db,
+            session_id=session.id,
+            event_type="participant_joined",
+            data={
+                "participant": {
+                    "id": str(participant.id),
+                    "display_name": participant.display_name,
+                    "is_ready": participant.is_ready,
+                }
+            },
+        )
         await db.commit()
     except IntegrityError:
         await db.rollback()
         # Could be display_name uniqueness under concurrency or token_hash uniqueness (extremely unlikely).
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Unable to join")
 
-    await db.refresh(participant)
-
-    await ws.broadcast(
-        session_id=session.id,
-        event_type="participant_joined",
-        data={
-            "participant": {
-                "id": str(participant.id),
-                "display_name": participant.display_name,
-                "is_ready": participant.is_ready,
-            }
-        },
-    )
+    await publish_outbox_event(events, ws, event)
 
     return JoinResponse(
         participant_token=participant_token,
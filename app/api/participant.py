@@ -6,21 +6,32 @@ from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, Header, HTTPException, status
 from pydantic import BaseModel, Field
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.api.rate_limits import enforce_rate_limit, limit_by_ip
 from app.core.settings import Settings, get_settings
+from app.core.tracing import traced
 from app.db.deps import get_db_session
 from app.db.models.exercise_session import ExerciseSession, SessionStatus
 from app.db.models.message import Message
 from app.db.models.participant import Participant
+from app.services.idempotency import IdempotencyCache, get_idempotency_cache
+from app.services.outbox import add_outbox_event, publish_outbox_event
 from app.services.participant_tokens import hash_participant_token
-from app.ws.deps import get_ws_manager
+from app.services.rate_limit import RateLimiter, get_rate_limiter
+from app.services.session_state import (
+    lock_session,
+    mark_participant_left,
+    record_message,
+    set_participant_ready,
+)
+from app.ws.deps import get_event_dispatcher, get_ws_manager
+from app.ws.dispatcher import EventDispatcher
 from app.ws.manager import WsManager
 
 
-router = APIRouter(prefix="/participant", tags=["participant"])
-
-
+@traced("get_current_participant")
 async def get_current_participant(
     db: AsyncSession = Depends(get_db_session),
     settings: Settings = Depends(get_settings),
@@ -55,6 +66,22 @@ async def get_current_participant(
     return session, participant
 
 
+async def limit_participant(
+    current: tuple[ExerciseSession, Participant] = Depends(get_current_participant),
+    limiter: RateLimiter = Depends(get_rate_limiter),
+    settings: Settings = Depends(get_settings),
+) -> None:
+    await enforce_rate_limit(limiter, settings, "participant", str(current[1].id))
+
+
+# The IP rule runs before authentication, so it also throttles token guessing.
+router = APIRouter(
+    prefix="/participant",
+    tags=["participant"],
+    dependencies=[Depends(limit_by_ip("participant_ip")), Depends(limit_participant)],
+)
+
+
 class ReadyRequest(BaseModel):
     is_ready: bool
 
@@ -70,16 +97,23 @@ async def set_ready_state(
     current: tuple[ExerciseSession, Participant] = Depends(get_current_participant),
     db: AsyncSession = Depends(get_db_session),
     ws: WsManager = Depends(get_ws_manager),
+    events: EventDispatcher = Depends(get_event_dispatcher),
 ) -> ReadyResponse:
     session, participant = current
 
     if session.status != SessionStatus.lobby:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Session is not in lobby")
 
-    participant.is_ready = body.is_ready
-    await db.commit()
+    session = await lock_session(db, session.id)
+    await db.refresh(participant)
+    if session is None or participant.left_at is not None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if session.status != SessionStatus.lobby:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Session is not in lobby")
 
-    await ws.broadcast(
+    set_participant_ready(session, participant, body.is_ready)
+    event = add_outbox_event(
+        db,
         session_id=session.id,
         event_type="participant_ready_changed",
         data={
@@ -90,6 +124,9 @@ async def set_ready_state(
             }
         },
     )
+    await db.commit()
+
+    await publish_outbox_event(events, ws, event)
 
     return ReadyResponse(participant_id=participant.id, is_ready=participant.is_ready)
 
@@ -105,50 +142,106 @@ class SubmitMessageResponse(BaseModel):
     content: str
 
 
+async def _find_idempotent_message(
+    db: AsyncSession, *, participant_id: uuid.UUID, idempotency_key: str
+) -> SubmitMessageResponse | None:
+    result = await db.execute(
+        select(Message)
+        .where(Message.participant_id == participant_id)
+        .where(Message.idempotency_key == idempotency_key)
+    )
+    message = result.scalar_one_or_none()
+    if message is None:
+        return None
+    return SubmitMessageResponse(
+        message_id=message.id,
+        session_id=message.session_id,
+        participant_id=message.participant_id,
+        content=message.content,
+    )
+
+
 @router.post("/message", response_model=SubmitMessageResponse)
 async def submit_message(
     body: SubmitMessageRequest,
     current: tuple[ExerciseSession, Participant] = Depends(get_current_participant),
     db: AsyncSession = Depends(get_db_session),
     ws: WsManager = Depends(get_ws_manager),
+    events: EventDispatcher = Depends(get_event_dispatcher),
+    idempotency_cache: IdempotencyCache = Depends(get_idempotency_cache),
+    idempotency_key: str | None = Header(default=None, alias="Idempotency-Key", min_length=1, max_length=255),
 ) -> SubmitMessageResponse:
     session, participant = current
 
+    # A retried request returns the original response without a second insert or broadcast.
+    if idempotency_key is not None:
+        original = idempotency_cache.get(participant.id, idempotency_key)
+        if original is None:
+            original = await _find_idempotent_message(
+                db, participant_id=participant.id, idempotency_key=idempotency_key
+            )
+        if original is not None:
+            idempotency_cache.put(participant.id, idempotency_key, original)
+            return original
+
     if session.status != SessionStatus.running:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Session is not running")
 
+    if not await record_message(db, session.id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Session is not running")
+
     message = Message(
         session_id=session.id,
         participant_id=participant.id,
         content=body.content,
+        idempotency_key=idempotency_key,
     )
     db.add(message)
-    await db.commit()
-    await db.refresh(message)
-
-    await ws.broadcast(
-        session_id=session.id,
-        event_type="message_submitted",
-        data={
-            "message": {
-                "id": str(message.id),
-                "participant_id": str(message.participant_id),
-                "content": message.content,
-                "created_at": message.created_at.isoformat(),
-            },
-            "participant": {
-                "id": str(participant.id),
-                "display_name": participant.display_name,
+    try:
+        # The flush fills in the id and server-side created_at the event carries.
+        await db.flush()
+        event = add_outbox_event(
+            db,
+            session_id=session.id,
+            event_type="message_submitted",
+            data={
+                "message": {
+                    "id": str(message.id),
+                    "participant_id": str(message.participant_id),
+                    "content": message.content,
+                    "created_at": message.created_at.isoformat(),
+                },
+                "participant": {
+                    "id": str(participant.id),
+                    "display_name": participant.display_name,
+                },
             },
-        },
-    )
-
-    return SubmitMessageResponse(
+        )
+        await db.commit()
+    except IntegrityError:
+        # A concurrent retry with the same key won the insert.
+        await db.rollback()
+        if idempotency_key is None:
+            raise
+        original = await _find_idempotent_message(
+            db, participant_id=participant.id, idempotency_key=idempotency_key
+        )
+        if original is None:
+            raise
+        idempotency_cache.put(participant.id, idempotency_key, original)
+        return original
+
+    await publish_outbox_event(events, ws, event)
+
+    response = SubmitMessageResponse(
         message_id=message.id,
         session_id=session.id,
         participant_id=participant.id,
         content=message.content,
     )
+    if idempotency_key is not None:
+        idempotency_cache.put(participant.id, idempotency_key, response)
+    return response
 
 
 class LeaveResponse(BaseModel):
@@ -162,16 +255,19 @@ async def leave_session(
     current: tuple[ExerciseSession, Participant] = Depends(get_current_participant),
     db: AsyncSession = Depends(get_db_session),
     ws: WsManager = Depends(get_ws_manager),
+    events: EventDispatcher = Depends(get_event_dispatcher),
 ) -> LeaveResponse:
     session, participant = current
 
-    now = datetime.now(timezone.utc)
-    participant.left_at = now
-    participant.token_revoked_at = now
-    participant.is_ready = False
-    await db.commit()
+    session = await lock_session(db, session.id)
+    await db.refresh(participant)
+    if session is None or participant.left_at is not None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    await ws.broadcast(
+    now = datetime.now(timezone.utc)
+    mark_participant_left(session, participant, now=now)
+    event = add_outbox_event(
+        db,
         session_id=session.id,
         event_type="participant_left",
         data={
@@ -182,5 +278,8 @@ async def leave_session(
             }
         },
     )
+    await db.commit()
+
+    await publish_outbox_event(events, ws, event)
 
     return LeaveResponse(participant_id=participant.id, session_id=session.id, left_at=now)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import math
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.core.metrics import HTTP_REQUESTS_RATE_LIMITED
+from app.core.settings import Settings, get_settings
+from app.services.rate_limit import RateLimiter, get_rate_limiter
+
+
+async def enforce_rate_limit(limiter: RateLimiter, settings: Settings, rule: str, subject: str) -> None:
+    limit = settings.rate_limits.get(rule)
+    if limit is None:
+        return
+    requests, seconds = limit
+    retry_after = await limiter.hit(f"{rule}:{subject}", requests=requests, seconds=seconds)
+    if retry_after > 0:
+        HTTP_REQUESTS_RATE_LIMITED.inc(rule)
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+
+def client_ip(request: Request) -> str:
+    # Behind a proxy, run uvicorn with --proxy-headers so this is the real client.
+    return request.client.host if request.client is not None else "unknown"
+
+
+def limit_by_ip(rule: str):
+    async def dependency(
+        request: Request,
+        limiter: RateLimiter = Depends(get_rate_limiter),
+        settings: Settings = Depends(get_settings),
+    ) -> None:
+        await enforce_rate_limit(limiter, settings, rule, client_ip(request))
+
+    return dependency
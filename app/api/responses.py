@@ -0,0 +1,17 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import Response
+from pydantic_core import to_json
+
+
+class RawJSONResponse(Response):
+    media_type = "application/json"
+
+
+# Opt-in fast path for large payloads: routes keep response_model= for the OpenAPI schema,
+# but build plain dicts from row tuples and encode them once here. Returning a Response makes
+# FastAPI skip its own validation and serialization, so the route owns the output shape.
+def json_response(content: Any, *, headers: dict[str, str] | None = None) -> RawJSONResponse:
+    return RawJSONResponse(content=to_json(content), headers=headers)
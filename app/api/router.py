@@ -1,12 +1,22 @@
 from fastapi import APIRouter
 
+from app.api.admin import router as admin_router
 from app.api.auth import router as auth_router
+from app.api.health import router as health_router
 from app.api.join import router as join_router
+from app.api.metrics import router as metrics_router
 from app.api.participant import router as participant_router
 from app.api.sessions import router as sessions_router
 
-api_router = APIRouter()
-api_router.include_router(auth_router)
-api_router.include_router(sessions_router)
-api_router.include_router(join_router)
-api_router.include_router(participant_router)
+# Included into the app one by one: FastAPI rebuilds every route (signature analysis,
+# response models) on each include_router, so nesting them under another router would
+# build each route a third time at import.
+api_routers: tuple[APIRouter, ...] = (
+    auth_router,
+    sessions_router,
+    join_router,
+    participant_router,
+    metrics_router,
+    health_router,
+    admin_router,
+)
@@ -1,22 +1,42 @@
 from __future__ import annotations
 
+import base64
 import uuid
 from datetime import datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import func, select
+from pydantic_core import to_json
+from sqlalchemy import func, literal, select, tuple_, union_all
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_instructor
+from app.api.responses import json_response
 from app.db.deps import get_db_session
 from app.db.models.exercise_session import ExerciseSession, SessionEndedBy, SessionStatus
 from app.db.models.instructor import Instructor
 from app.db.models.message import Message
 from app.db.models.participant import Participant
+from app.db.models.session_archive import SessionArchive
+from app.services.archival import load_session_archive
+from app.services.message_search import search_archived_messages, search_session_messages
+from app.services.outbox import add_outbox_event, publish_outbox_event
+from app.services.response_cache import CachedResponse, ResponseCache, get_response_cache
+from app.services.session_state import bump_version, close_participants, lock_session
+from app.services.session_stats import SessionStatsAggregator, build_archived_stats, get_session_stats
+from app.services.session_versions import SessionVersionCache, get_session_version_cache
 from app.services.team_id import generate_team_id
-from app.ws.deps import get_ws_manager
+from app.services.team_id_pool import allocate_team_id, discard_team_id
+from app.services.transcript_export import (
+    EXPORT_MEDIA_TYPES,
+    ExportFormat,
+    stream_archived_transcript,
+    stream_session_transcript,
+)
+from app.ws.deps import get_event_dispatcher, get_ws_manager
+from app.ws.dispatcher import EventDispatcher
 from app.ws.manager import WsManager
 
 
@@ -49,6 +69,21 @@ class SessionDetailResponse(BaseModel):
     created_at: datetime
 
 
+class SessionSummaryResponse(BaseModel):
+    id: uuid.UUID
+    team_id: str
+    status: SessionStatus
+    created_at: datetime
+    ended_at: datetime | None
+    participant_count: int
+    message_count: int
+
+
+class SessionsListResponse(BaseModel):
+    sessions: list[SessionSummaryResponse]
+    next_cursor: str | None
+
+
 class ParticipantResponse(BaseModel):
     id: uuid.UUID
     display_name: str
@@ -70,6 +105,51 @@ class MessageResponse(BaseModel):
     created_at: datetime
 
 
+class MessageSearchResult(BaseModel):
+    id: uuid.UUID
+    participant_id: uuid.UUID
+    display_name: str
+    content: str
+    created_at: datetime
+    rank: float
+
+
+class MessageSearchResponse(BaseModel):
+    session_id: uuid.UUID
+    results: list[MessageSearchResult]
+    next_cursor: str | None
+
+
+class ParticipantStatsResponse(BaseModel):
+    id: uuid.UUID
+    display_name: str
+    is_ready: bool
+    left: bool
+    message_count: int
+    seconds_to_first_submission: float | None
+
+
+class SubmissionRatesResponse(BaseModel):
+    last_1m: float
+    last_5m: float
+    last_15m: float
+
+
+class TimelineBucketResponse(BaseModel):
+    minute: datetime
+    count: int
+
+
+class SessionStatsResponse(BaseModel):
+    session_id: uuid.UUID
+    started_at: datetime | None
+    total_messages: int
+    seconds_to_first_submission: float | None
+    submissions_per_minute: SubmissionRatesResponse
+    timeline: list[TimelineBucketResponse]
+    participants: list[ParticipantStatsResponse]
+
+
 class MessagesListResponse(BaseModel):
     session_id: uuid.UUID
     messages: list[MessageResponse]
@@ -82,11 +162,13 @@ async def create_session(
     db: AsyncSession = Depends(get_db_session),
 ) -> SessionCreatedResponse:
     body = body or CreateSessionRequest()
-    # Team ID collisions are unlikely, but handle it gracefully.
+    # Pooled team IDs are known to be unused, so this is normally a single insert.
+    # Random IDs (and the retry) only come into play while the pool is empty.
     for _ in range(10):
+        team_id = await allocate_team_id(db) or generate_team_id()
         session = ExerciseSession(
             instructor_id=instructor.id,
-            team_id=generate_team_id(),
+            team_id=team_id,
             status=SessionStatus.lobby,
             max_participants=body.max_participants,
             duration_seconds=body.duration_seconds,
@@ -97,9 +179,10 @@ async def create_session(
             await db.commit()
         except IntegrityError:
             await db.rollback()
+            await discard_team_id(db, team_id)
+            await db.commit()
             continue
 
-        await db.refresh(session)
         return SessionCreatedResponse(
             session_id=session.id,
             team_id=session.team_id,
@@ -114,12 +197,187 @@ async def create_session(
     )
 
 
+def _encode_cursor(created_at: datetime, session_id: uuid.UUID) -> str:
+    raw = f"{created_at.isoformat()}|{session_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        created_at, session_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), uuid.UUID(session_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+@router.get("", response_model=SessionsListResponse)
+async def list_sessions(
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None),
+    instructor: Instructor = Depends(get_current_instructor),
+    db: AsyncSession = Depends(get_db_session),
+) -> SessionsListResponse:
+    participant_count = (
+        select(func.count())
+        .select_from(Participant)
+        .where(Participant.session_id == ExerciseSession.id)
+        .correlate(ExerciseSession)
+        .scalar_subquery()
+    )
+
+    hot = select(
+        ExerciseSession.id.label("id"),
+        ExerciseSession.team_id.label("team_id"),
+        ExerciseSession.status.label("status"),
+        ExerciseSession.created_at.label("created_at"),
+        ExerciseSession.ended_at.label("ended_at"),
+        participant_count.label("participant_count"),
+        ExerciseSession.message_count.label("message_count"),
+    ).where(ExerciseSession.instructor_id == instructor.id)
+    archived = select(
+        SessionArchive.session_id,
+        SessionArchive.team_id,
+        literal(SessionStatus.ended, ExerciseSession.status.type),
+        SessionArchive.created_at,
+        SessionArchive.ended_at,
+        SessionArchive.participant_count,
+        SessionArchive.message_count,
+    ).where(SessionArchive.instructor_id == instructor.id)
+
+    if cursor is not None:
+        cursor_created_at, cursor_id = _decode_cursor(cursor)
+        hot = hot.where(
+            tuple_(ExerciseSession.created_at, ExerciseSession.id) < tuple_(cursor_created_at, cursor_id)
+        )
+        archived = archived.where(
+            tuple_(SessionArchive.created_at, SessionArchive.session_id) < tuple_(cursor_created_at, cursor_id)
+        )
+
+    # Each branch walks its (instructor_id, created_at) index and stops after one page.
+    page_size = limit + 1
+    hot = hot.order_by(ExerciseSession.created_at.desc(), ExerciseSession.id.desc()).limit(page_size)
+    archived = archived.order_by(SessionArchive.created_at.desc(), SessionArchive.session_id.desc()).limit(
+        page_size
+    )
+    page = union_all(hot.subquery().select(), archived.subquery().select()).subquery()
+
+    result = await db.execute(
+        select(page).order_by(page.c.created_at.desc(), page.c.id.desc()).limit(page_size)
+    )
+    rows = result.all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
+
+    return SessionsListResponse(
+        sessions=[
+            SessionSummaryResponse(
+                id=row.id,
+                team_id=row.team_id,
+                status=row.status,
+                created_at=row.created_at,
+                ended_at=row.ended_at,
+                participant_count=row.participant_count,
+                message_count=row.message_count,
+            )
+            for row in rows
+        ],
+        next_cursor=next_cursor,
+    )
+
+
+def _session_etag(session_id: uuid.UUID, version: int) -> str:
+    return f'"{session_id}-{version}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+async def _not_modified(
+    db: AsyncSession,
+    versions: SessionVersionCache,
+    *,
+    session_id: uuid.UUID,
+    instructor_id: uuid.UUID,
+    if_none_match: str | None,
+) -> Response | None:
+    # Revalidation reads only the version column, never the participants.
+    if not if_none_match:
+        return None
+    version = versions.get(session_id, instructor_id=instructor_id)
+    if version is None:
+        result = await db.execute(
+            select(ExerciseSession.version, ExerciseSession.status)
+            .where(ExerciseSession.id == session_id)
+            .where(ExerciseSession.instructor_id == instructor_id)
+        )
+        row = result.one_or_none()
+        if row is None:
+            return None
+        version, session_status = row
+        if session_status == SessionStatus.ended:
+            versions.put_final(session_id, instructor_id=instructor_id, version=version)
+
+    etag = _session_etag(session_id, version)
+    if not _etag_matches(if_none_match, etag):
+        return None
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
+_IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def _cached_response(entry: CachedResponse, if_none_match: str | None) -> Response:
+    etag = entry.headers.get("ETag")
+    if etag is not None and if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=entry.headers)
+    return Response(content=entry.body, media_type="application/json", headers=entry.headers)
+
+
+def _cache_ended_response(
+    cache: ResponseCache,
+    kind: str,
+    *,
+    session_id: uuid.UUID,
+    instructor_id: uuid.UUID,
+    body: BaseModel | dict,
+    etag: str | None = None,
+) -> Response:
+    headers = {"Cache-Control": _IMMUTABLE_CACHE_CONTROL}
+    if etag is not None:
+        headers["ETag"] = etag
+    entry = CachedResponse(instructor_id=instructor_id, body=to_json(body), headers=headers)
+    cache.put(kind, session_id, entry)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
 @router.get("/{session_id}", response_model=SessionDetailResponse)
 async def get_session_details(
     session_id: uuid.UUID,
+    response: Response,
+    if_none_match: str | None = Header(default=None),
     instructor: Instructor = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db_session),
-) -> SessionDetailResponse:
+    versions: SessionVersionCache = Depends(get_session_version_cache),
+    cache: ResponseCache = Depends(get_response_cache),
+) -> SessionDetailResponse | Response:
+    cached = cache.get("details", session_id, instructor_id=instructor.id)
+    if cached is not None:
+        return _cached_response(cached, if_none_match)
+
+    not_modified = await _not_modified(
+        db, versions, session_id=session_id, instructor_id=instructor.id, if_none_match=if_none_match
+    )
+    if not_modified is not None:
+        return not_modified
+
     result = await db.execute(
         select(ExerciseSession)
         .where(ExerciseSession.id == session_id)
@@ -127,9 +385,18 @@ async def get_session_details(
     )
     session = result.scalar_one_or_none()
     if session is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        archive = await load_session_archive(db, session_id=session_id, instructor_id=instructor.id)
+        if archive is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        return _cache_ended_response(
+            cache,
+            "details",
+            session_id=session_id,
+            instructor_id=instructor.id,
+            body=SessionDetailResponse(**archive["session"]),
+        )
 
-    return SessionDetailResponse(
+    detail = SessionDetailResponse(
         id=session.id,
         instructor_id=session.instructor_id,
         team_id=session.team_id,
@@ -141,14 +408,38 @@ async def get_session_details(
         ended_by=session.ended_by,
         created_at=session.created_at,
     )
+    etag = _session_etag(session.id, session.version)
+    if session.status == SessionStatus.ended:
+        return _cache_ended_response(
+            cache, "details", session_id=session.id, instructor_id=instructor.id, body=detail, etag=etag
+        )
+    response.headers["ETag"] = etag
+    return detail
+
+
+# Column order of the fast-path select below.
+_PARTICIPANT_FIELDS = tuple(ParticipantResponse.model_fields)
 
 
 @router.get("/{session_id}/participants", response_model=ParticipantsListResponse)
 async def list_session_participants(
     session_id: uuid.UUID,
+    if_none_match: str | None = Header(default=None),
     instructor: Instructor = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db_session),
-) -> ParticipantsListResponse:
+    versions: SessionVersionCache = Depends(get_session_version_cache),
+    cache: ResponseCache = Depends(get_response_cache),
+) -> ParticipantsListResponse | Response:
+    cached = cache.get("participants", session_id, instructor_id=instructor.id)
+    if cached is not None:
+        return _cached_response(cached, if_none_match)
+
+    not_modified = await _not_modified(
+        db, versions, session_id=session_id, instructor_id=instructor.id, if_none_match=if_none_match
+    )
+    if not_modified is not None:
+        return not_modified
+
     session_result = await db.execute(
         select(ExerciseSession)
         .where(ExerciseSession.id == session_id)
@@ -156,28 +447,41 @@ async def list_session_participants(
     )
     session = session_result.scalar_one_or_none()
     if session is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        archive = await load_session_archive(db, session_id=session_id, instructor_id=instructor.id)
+        if archive is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        return _cache_ended_response(
+            cache,
+            "participants",
+            session_id=session_id,
+            instructor_id=instructor.id,
+            body=ParticipantsListResponse(
+                session_id=session_id,
+                participants=[ParticipantResponse(**p) for p in archive["participants"]],
+            ),
+        )
 
     participants_result = await db.execute(
-        select(Participant)
+        select(
+            Participant.id,
+            Participant.display_name,
+            Participant.is_ready,
+            Participant.joined_at,
+            Participant.left_at,
+        )
         .where(Participant.session_id == session.id)
         .order_by(Participant.joined_at.asc())
     )
-    participants = participants_result.scalars().all()
-
-    return ParticipantsListResponse(
-        session_id=session.id,
-        participants=[
-            ParticipantResponse(
-                id=p.id,
-                display_name=p.display_name,
-                is_ready=p.is_ready,
-                joined_at=p.joined_at,
-                left_at=p.left_at,
-            )
-            for p in participants
-        ],
-    )
+    body = {
+        "session_id": session.id,
+        "participants": [dict(zip(_PARTICIPANT_FIELDS, row)) for row in participants_result.all()],
+    }
+    etag = _session_etag(session.id, session.version)
+    if session.status == SessionStatus.ended:
+        return _cache_ended_response(
+            cache, "participants", session_id=session.id, instructor_id=instructor.id, body=body, etag=etag
+        )
+    return json_response(body, headers={"ETag": etag})
 
 
 @router.post("/{session_id}/start", response_model=SessionDetailResponse)
@@ -186,41 +490,22 @@ async def start_session(
     instructor: Instructor = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db_session),
     ws: WsManager = Depends(get_ws_manager),
+    events: EventDispatcher = Depends(get_event_dispatcher),
 ) -> SessionDetailResponse:
-    result = await db.execute(
-        select(ExerciseSession)
-        .where(ExerciseSession.id == session_id)
-        .where(ExerciseSession.instructor_id == instructor.id)
-    )
-    session = result.scalar_one_or_none()
+    session = await lock_session(db, session_id, instructor_id=instructor.id)
     if session is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
 
     if session.status != SessionStatus.lobby:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Session is not in lobby")
 
-    active_count_result = await db.execute(
-        select(func.count())
-        .select_from(Participant)
-        .where(Participant.session_id == session.id)
-        .where(Participant.left_at.is_(None))
-    )
-    active_count = int(active_count_result.scalar_one())
-    if active_count < 1:
+    if session.active_participants < 1:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="No participants have joined",
         )
 
-    not_ready_count_result = await db.execute(
-        select(func.count())
-        .select_from(Participant)
-        .where(Participant.session_id == session.id)
-        .where(Participant.left_at.is_(None))
-        .where(Participant.is_ready.is_(False))
-    )
-    not_ready_count = int(not_ready_count_result.scalar_one())
-    if not_ready_count > 0:
+    if session.ready_participants < session.active_participants:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Not all participants are ready",
@@ -228,10 +513,9 @@ async def start_session(
 
     session.status = SessionStatus.running
     session.started_at = datetime.now(timezone.utc)
-    await db.commit()
-    await db.refresh(session)
-
-    await ws.broadcast(
+    bump_version(session)
+    event = add_outbox_event(
+        db,
         session_id=session.id,
         event_type="session_started",
         data={
@@ -242,6 +526,9 @@ async def start_session(
             }
         },
     )
+    await db.commit()
+
+    await publish_outbox_event(events, ws, event)
 
     return SessionDetailResponse(
         id=session.id,
@@ -263,13 +550,9 @@ async def end_session(
     instructor: Instructor = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db_session),
     ws: WsManager = Depends(get_ws_manager),
+    events: EventDispatcher = Depends(get_event_dispatcher),
 ) -> SessionDetailResponse:
-    result = await db.execute(
-        select(ExerciseSession)
-        .where(ExerciseSession.id == session_id)
-        .where(ExerciseSession.instructor_id == instructor.id)
-    )
-    session = result.scalar_one_or_none()
+    session = await lock_session(db, session_id, instructor_id=instructor.id)
     if session is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
 
@@ -279,10 +562,10 @@ async def end_session(
     session.status = SessionStatus.ended
     session.ended_at = datetime.now(timezone.utc)
     session.ended_by = SessionEndedBy.instructor
-    await db.commit()
-    await db.refresh(session)
-
-    await ws.broadcast(
+    await close_participants(db, session, now=session.ended_at)
+    bump_version(session)
+    event = add_outbox_event(
+        db,
         session_id=session.id,
         event_type="session_ended",
         data={
@@ -294,6 +577,9 @@ async def end_session(
             }
         },
     )
+    await db.commit()
+
+    await publish_outbox_event(events, ws, event)
 
     return SessionDetailResponse(
         id=session.id,
@@ -309,12 +595,21 @@ async def end_session(
     )
 
 
+# Column order of the fast-path select below.
+_MESSAGE_FIELDS = tuple(MessageResponse.model_fields)
+
+
 @router.get("/{session_id}/messages", response_model=MessagesListResponse)
 async def list_session_messages(
     session_id: uuid.UUID,
     instructor: Instructor = Depends(get_current_instructor),
     db: AsyncSession = Depends(get_db_session),
-) -> MessagesListResponse:
+    cache: ResponseCache = Depends(get_response_cache),
+) -> MessagesListResponse | Response:
+    cached = cache.get("messages", session_id, instructor_id=instructor.id)
+    if cached is not None:
+        return _cached_response(cached, None)
+
     session_result = await db.execute(
         select(ExerciseSession)
         .where(ExerciseSession.id == session_id)
@@ -322,26 +617,159 @@ async def list_session_messages(
     )
     session = session_result.scalar_one_or_none()
     if session is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        archive = await load_session_archive(db, session_id=session_id, instructor_id=instructor.id)
+        if archive is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        display_names = {p["id"]: p["display_name"] for p in archive["participants"]}
+        return _cache_ended_response(
+            cache,
+            "messages",
+            session_id=session_id,
+            instructor_id=instructor.id,
+            body=MessagesListResponse(
+                session_id=session_id,
+                messages=[
+                    MessageResponse(display_name=display_names[m["participant_id"]], **m)
+                    for m in archive["messages"]
+                ],
+            ),
+        )
 
     messages_result = await db.execute(
-        select(Message, Participant.display_name)
+        select(
+            Message.id,
+            Message.participant_id,
+            Participant.display_name,
+            Message.content,
+            Message.created_at,
+        )
         .join(Participant, Participant.id == Message.participant_id)
         .where(Message.session_id == session.id)
         .order_by(Message.created_at.asc())
     )
-    rows = messages_result.all()
+    body = {
+        "session_id": session.id,
+        "messages": [dict(zip(_MESSAGE_FIELDS, row)) for row in messages_result.all()],
+    }
+    if session.status == SessionStatus.ended:
+        return _cache_ended_response(
+            cache, "messages", session_id=session.id, instructor_id=instructor.id, body=body
+        )
+    return json_response(body)
 
-    return MessagesListResponse(
-        session_id=session.id,
-        messages=[
-            MessageResponse(
-                id=m.id,
-                participant_id=m.participant_id,
-                display_name=display_name,
-                content=m.content,
-                created_at=m.created_at,
+
+@router.get("/{session_id}/stats", response_model=SessionStatsResponse)
+async def get_session_live_stats(
+    session_id: uuid.UUID,
+    instructor: Instructor = Depends(get_current_instructor),
+    db: AsyncSession = Depends(get_db_session),
+    stats: SessionStatsAggregator = Depends(get_session_stats),
+) -> SessionStatsResponse:
+    session_result = await db.execute(
+        select(ExerciseSession)
+        .where(ExerciseSession.id == session_id)
+        .where(ExerciseSession.instructor_id == instructor.id)
+    )
+    session = session_result.scalar_one_or_none()
+    if session is None:
+        archive = await load_session_archive(db, session_id=session_id, instructor_id=instructor.id)
+        if archive is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        return SessionStatsResponse(**build_archived_stats(archive, now=datetime.now(timezone.utc)))
+
+    return SessionStatsResponse(**await stats.snapshot(db, session))
+
+
+def _encode_search_cursor(rank: float, message_id: uuid.UUID) -> str:
+    raw = f"{rank!r}|{message_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_search_cursor(cursor: str) -> tuple[float, uuid.UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8")
+        rank, message_id = raw.split("|", 1)
+        return float(rank), uuid.UUID(message_id)
+    except Exception:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+@router.get("/{session_id}/messages/search", response_model=MessageSearchResponse)
+async def search_messages(
+    session_id: uuid.UUID,
+    q: str = Query(min_length=1, max_length=200),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: str | None = Query(default=None),
+    instructor: Instructor = Depends(get_current_instructor),
+    db: AsyncSession = Depends(get_db_session),
+) -> MessageSearchResponse:
+    after = _decode_search_cursor(cursor) if cursor is not None else None
+
+    session_result = await db.execute(
+        select(ExerciseSession.id)
+        .where(ExerciseSession.id == session_id)
+        .where(ExerciseSession.instructor_id == instructor.id)
+    )
+    if session_result.scalar_one_or_none() is None:
+        archive = await load_session_archive(db, session_id=session_id, instructor_id=instructor.id)
+        if archive is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        hits = search_archived_messages(archive, q=q, limit=limit + 1, after=after)
+    else:
+        hits = await search_session_messages(db, session_id=session_id, q=q, limit=limit + 1, after=after)
+
+    next_cursor = None
+    if len(hits) > limit:
+        hits = hits[:limit]
+        next_cursor = _encode_search_cursor(hits[-1].rank, hits[-1].id)
+
+    return MessageSearchResponse(
+        session_id=session_id,
+        results=[
+            MessageSearchResult(
+                id=hit.id,
+                participant_id=hit.participant_id,
+                display_name=hit.display_name,
+                content=hit.content,
+                created_at=hit.created_at,
+                rank=hit.rank,
             )
-            for (m, display_name) in rows
+            for hit in hits
         ],
+        next_cursor=next_cursor,
+    )
+
+
+@router.get(
+    "/{session_id}/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in EXPORT_MEDIA_TYPES.values()}}},
+)
+async def export_session_messages(
+    session_id: uuid.UUID,
+    export_format: ExportFormat = Query(default="csv", alias="format"),
+    instructor: Instructor = Depends(get_current_instructor),
+    db: AsyncSession = Depends(get_db_session),
+) -> StreamingResponse:
+    session_result = await db.execute(
+        select(ExerciseSession)
+        .where(ExerciseSession.id == session_id)
+        .where(ExerciseSession.instructor_id == instructor.id)
+    )
+    session = session_result.scalar_one_or_none()
+    if session is None:
+        archive = await load_session_archive(db, session_id=session_id, instructor_id=instructor.id)
+        if archive is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
+        team_id = archive["session"]["team_id"]
+        body = stream_archived_transcript(archive, export_format=export_format)
+    else:
+        team_id = session.team_id
+        body = stream_session_transcript(db, session_id=session.id, export_format=export_format)
+
+    filename = f"session-{team_id}-messages.{export_format}"
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.metrics import HTTP_QUEUE_WAITING, HTTP_REQUESTS_SHED
+
+
+# (method or None for any, path pattern, group); first match wins. Routes outside these
+# groups (health, metrics, admin, WebSockets) and OPTIONS requests are never queued or shed.
+# Exports hold their slot until the streamed body ends, so they get a group of their own
+# rather than starving instructor reads.
+ROUTE_GROUPS: tuple[tuple[str | None, re.Pattern[str], str], ...] = tuple(
+    (method, re.compile(pattern), group)
+    for method, pattern, group in (
+        ("POST", r"/auth/login", "login"),
+        ("POST", r"/join", "join"),
+        ("POST", r"/participant/message", "message"),
+        (None, r"/participant(/.*)?", "participant"),
+        ("GET", r"/sessions/[^/]+/export", "export"),
+        ("GET", r"/sessions(/.*)?", "instructor_read"),
+        (None, r"/sessions(/.*)?", "instructor_write"),
+    )
+)
+
+
+def route_group(method: str, path: str) -> str | None:
+    if method == "OPTIONS":
+        return None
+    for group_method, pattern, group in ROUTE_GROUPS:
+        if group_method is not None and group_method != method:
+            continue
+        if pattern.fullmatch(path):
+            return group
+    return None
+
+
+class _Gate:
+    def __init__(self, group: str, concurrency: int, queue_timeout: float) -> None:
+        self.group = group
+        self.queue_timeout = queue_timeout
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(concurrency)
+
+    async def acquire(self) -> bool:
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+            return True
+        if self.queue_timeout <= 0:
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+        return True
+
+    def release(self) -> None:
+        self._semaphore.release()
+
+
+class LoadSheddingMiddleware:
+    # Bounds concurrent requests per route group so an overloaded group (say, logins hashing
+    # passwords) queues on its own instead of every request queueing on the connection pool.
+    # A request that cannot get a slot within the group's queue budget fails fast with 503.
+    def __init__(
+        self, app: ASGIApp, *, limits: dict[str, tuple[int, float]], retry_after_seconds: int = 1
+    ) -> None:
+        self.app = app
+        self.retry_after_seconds = retry_after_seconds
+        self.gates = {
+            group: _Gate(group, concurrency, queue_timeout)
+            for group, (concurrency, queue_timeout) in limits.items()
+        }
+        HTTP_QUEUE_WAITING.set_function(lambda: {(g.group,): g.waiting for g in self.gates.values()})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        gate = self.gates.get(route_group(scope["method"], scope["path"]))
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await gate.acquire():
+            HTTP_REQUESTS_SHED.inc(gate.group)
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({"detail": "Server busy, retry later"}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.retry_after_seconds).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from app.core.metrics import LOOP_LAG, LOOP_STALLS
+
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    # A task on the loop measures how late its own wake-ups are (the lag every other callback
+    # sees). A watchdog thread notices when those wake-ups stop altogether and logs the loop
+    # thread's stack while the blocking call is still running; healthy, that is one timer per
+    # interval on the loop and one wait per interval in the thread.
+    def __init__(self, *, interval: float, threshold: float) -> None:
+        self.interval = interval
+        self.threshold = threshold
+        self._beat = 0.0
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._beat = time.monotonic()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._tick(loop))
+        self._watchdog = threading.Thread(
+            target=self._watch, args=(loop, threading.get_ident()), name="loop-watchdog", daemon=True
+        )
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._stopped.set()
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._watchdog.join(timeout=self.interval * 2)
+        self._task = None
+        self._watchdog = None
+
+    async def _tick(self, loop: asyncio.AbstractEventLoop) -> None:
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self._beat = time.monotonic()
+            lag = max(0.0, loop.time() - started - self.interval)
+            LOOP_LAG.observe(lag)
+            if lag >= self.threshold:
+                LOOP_STALLS.inc()
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, loop_thread: int) -> None:
+        reported = None
+        while not self._stopped.wait(self.interval):
+            beat = self._beat
+            blocked = time.monotonic() - beat
+            # One report per stall: the beat only moves once the loop runs again.
+            if blocked < self.interval + self.threshold or beat == reported:
+                continue
+            reported = beat
+            frame = sys._current_frames().get(loop_thread)
+            if frame is None:
+                continue
+            task = asyncio.current_task(loop)
+            logger.warning(
+                "Event loop blocked for %.0f ms so far (task %s); loop thread stack:\n%s",
+                blocked * 1000,
+                task.get_name() if task is not None else "-",
+                "".join(traceback.format_stack(frame)),
+            )
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import math
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# Instruments are plain dict updates without locks. Everything that records into them runs on
+# the event loop thread (pool checkouts too, through SQLAlchemy's greenlet bridge), so an
+# update is never interleaved with another one or with a scrape.
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Labels = tuple[str, ...]
+Sample = tuple[str, Labels, Labels, float]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+
+    def samples(self) -> Iterator[Sample]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[Labels, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, value in self._values.items():
+            yield self.name, self.labelnames, labels, value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Labels = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[Labels, float] = {}
+        self._function: Callable[[], Any] | None = None
+
+    def set(self, value: float, *labels: str) -> None:
+        self._values[labels] = value
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels: str, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set_function(self, function: Callable[[], Any] | None) -> None:
+        # Read at scrape time: a number, or a mapping of label tuples to numbers.
+        self._function = function
+
+    def value(self, *labels: str) -> float:
+        return dict(self._collect()).get(labels, 0.0)
+
+    def _collect(self) -> list[tuple[Labels, float]]:
+        if self._function is None:
+            return list(self._values.items())
+        result = self._function()
+        if isinstance(result, Mapping):
+            return list(result.items())
+        return [((), result)]
+
+    def samples(self) -> Iterator[Sample]:
+        for labels, value in self._collect():
+            yield self.name, self.labelnames, labels, value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, help: str, labelnames: Labels = (), *, buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per series: one count per bucket plus +Inf (not cumulative), then sum, then count.
+        self._series: dict[Labels, list[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 3)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-2] += value
+        series[-1] += 1
+
+    def count(self, *labels: str) -> int:
+        series = self._series.get(labels)
+        return int(series[-1]) if series is not None else 0
+
+    def samples(self) -> Iterator[Sample]:
+        bucket_labelnames = (*self.labelnames, "le")
+        for labels, series in list(self._series.items()):
+            cumulative = 0
+            for bound, observed in zip((*self.buckets, math.inf), series):
+                cumulative += observed
+                yield f"{self.name}_bucket", bucket_labelnames, (*labels, _format_value(bound)), cumulative
+            yield f"{self.name}_sum", self.labelnames, labels, series[-2]
+            yield f"{self.name}_count", self.labelnames, labels, series[-1]
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"Metric {metric.name} is already registered differently")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: Labels = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def gauge(self, name: str, help: str, labelnames: Labels = ()) -> Gauge:
+        return self._register(Gauge(name, help, labelnames))
+
+    def histogram(
+        self, name: str, help: str, labelnames: Labels = (), *, buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets=buckets))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, labelnames, labels, value in metric.samples():
+                if labelnames:
+                    pairs = ",".join(f'{k}="{_escape(v)}"' for k, v in zip(labelnames, labels))
+                    name = f"{name}{{{pairs}}}"
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status")
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.", ("method", "route")
+)
+HTTP_IN_FLIGHT = registry.gauge("http_requests_in_flight", "HTTP requests currently being served.")
+HTTP_REQUESTS_SHED = registry.counter(
+    "http_requests_shed_total", "Requests rejected with 503 because their route group was saturated.", ("group",)
+)
+HTTP_REQUESTS_RATE_LIMITED = registry.counter(
+    "http_requests_rate_limited_total", "Requests rejected with 429 by a rate limit rule.", ("rule",)
+)
+HTTP_QUEUE_WAITING = registry.gauge(
+    "http_requests_queued", "Requests waiting for a slot in their route group.", ("group",)
+)
+
+DB_POOL_CHECKOUT = registry.histogram(
+    "db_pool_checkout_seconds",
+    "Time to obtain a database connection from the pool, including opening a new one.",
+)
+DB_POOL_SIZE = registry.gauge("db_pool_size", "Configured database pool size.")
+DB_POOL_CHECKED_OUT = registry.gauge("db_pool_checked_out", "Database connections currently checked out.")
+DB_POOL_OVERFLOW = registry.gauge("db_pool_overflow", "Database connections open beyond the pool size.")
+
+WS_CONNECTIONS = registry.gauge("ws_connections", "Open WebSocket connections by role.", ("role",))
+WS_BROADCAST_DURATION = registry.histogram(
+    "ws_broadcast_duration_seconds", "Time to fan one event out to a session's sockets.", ("event_type",)
+)
+WS_SEND_FAILURES = registry.counter(
+    "ws_send_failures_total", "WebSocket sends that raised during a broadcast.", ("event_type",)
+)
+
+EVENT_QUEUE_DEPTH = registry.gauge("event_dispatcher_queue_depth", "Realtime events waiting for delivery.")
+
+LOOP_LAG = registry.histogram(
+    "event_loop_lag_seconds",
+    "How late the event loop ran a timer; every callback on the worker waits this long.",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LOOP_STALLS = registry.counter("event_loop_stalls_total", "Loop lag samples above the stall threshold.")
+
+DB_QUERY_DURATION = registry.histogram("db_query_duration_seconds", "Time spent executing one SQL statement.")
+HTTP_REQUEST_QUERIES = registry.histogram(
+    "http_request_db_queries",
+    "SQL statements issued while serving one HTTP request.",
+    ("method", "route"),
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+
+
+def route_label(scope: Scope) -> str:
+    # The router records the matched route on the scope; label by its template so ids in the
+    # path do not create a series each.
+    return getattr(scope.get("route"), "path", None) or "unmatched"
+
+
+def bind_runtime(*, pool: Any, ws: Any, events: Any) -> None:
+    # Gauges over live objects are read at scrape time rather than updated on every change.
+    DB_POOL_SIZE.set_function(pool.size)
+    DB_POOL_CHECKED_OUT.set_function(pool.checkedout)
+    DB_POOL_OVERFLOW.set_function(lambda: max(pool.overflow(), 0))
+    WS_CONNECTIONS.set_function(lambda: {(role,): n for role, n in ws.connection_counts().items()})
+    EVENT_QUEUE_DEPTH.set_function(lambda: events.queue_depth)
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            route = route_label(scope)
+            HTTP_REQUESTS.inc(scope["method"], route, str(status))
+            HTTP_REQUEST_DURATION.observe(elapsed, scope["method"], route)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import contextlib
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import DB_QUERY_DURATION, HTTP_REQUEST_QUERIES, route_label
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+
+
+# Every tracker active in the current context; a statement counts towards all of them, so a
+# test can wrap several requests that each track their own. SQLAlchemy's greenlets share the
+# calling task's context, so the engine hooks see the request's trackers.
+_active: ContextVar[tuple[QueryStats, ...]] = ContextVar("query_stats", default=())
+
+
+@contextlib.contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    stats = QueryStats()
+    token = _active.set((*_active.get(), stats))
+    try:
+        yield stats
+    finally:
+        _active.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    DB_QUERY_DURATION.observe(elapsed)
+    for stats in _active.get():
+        stats.count += 1
+        stats.seconds += elapsed
+
+
+def instrument_engine(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    def __init__(self, app: ASGIApp, *, server_timing: bool = True) -> None:
+        self.app = app
+        self.server_timing = server_timing
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+
+        with track_queries() as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start" and self.server_timing:
+                    total_ms = (time.perf_counter() - start) * 1000
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries", app;dur={total_ms:.1f}',
+                    )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                HTTP_REQUEST_QUERIES.observe(stats.count, scope["method"], route_label(scope))
@@ -3,12 +3,13 @@ from __future__ import annotations
 import time
 from dataclasses import dataclass
 
-import bcrypt
-from jose import JWTError, jwt
-
 from app.core.settings import Settings
 
 
+# bcrypt and jose (which loads the cryptography backends) are imported on first use rather
+# than with the app; see benchmarks/bench_import_time.py.
+
+
 def _check_bcrypt_password_length(password: str) -> None:
     # bcrypt only uses the first 72 bytes of the password.
     # We reject longer passwords to avoid surprising truncation.
@@ -17,6 +18,8 @@ def _check_bcrypt_password_length(password: str) -> None:
 
 
 def hash_password(password: str) -> str:
+    import bcrypt
+
     _check_bcrypt_password_length(password)
     password_bytes = password.encode("utf-8")
     salt = bcrypt.gensalt(rounds=12)
@@ -31,6 +34,8 @@ def verify_password(password: str, password_hash: str) -> bool:
     except ValueError:
         return False
 
+    import bcrypt
+
     try:
         password_bytes = password.encode("utf-8")
         hash_bytes = password_hash.encode("utf-8")
@@ -45,6 +50,8 @@ class TokenData:
 
 
 def create_access_token(settings: Settings, *, instructor_id: str) -> str:
+    from jose import jwt
+
     now = int(time.time())
     payload = {
         "sub": instructor_id,
@@ -57,6 +64,8 @@ def create_access_token(settings: Settings, *, instructor_id: str) -> str:
 
 
 def decode_access_token(settings: Settings, token: str) -> TokenData:
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(
             token,
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 
-from pydantic import AnyHttpUrl
+from pydantic import AnyHttpUrl, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -14,8 +14,58 @@ class Settings(BaseSettings):
 
     cors_origins: str = ""
 
+    # Per route group (see app/core/load_shedding.py): max concurrent requests, and seconds a
+    # request may wait for a slot before it is shed with 503 + Retry-After. An empty mapping
+    # disables load shedding.
+    load_shed_limits: dict[str, tuple[int, float]] = {
+        "login": (4, 2.0),
+        "join": (10, 1.0),
+        "message": (20, 1.0),
+        "participant": (10, 1.0),
+        "instructor_read": (10, 2.0),
+        "export": (2, 1.0),
+        "instructor_write": (5, 2.0),
+    }
+    load_shed_retry_after_seconds: int = 1
+
+    # Rate limit rules: requests allowed per seconds, as a token bucket per subject. Rules:
+    # login_ip, join_ip, join_team, participant_ip, participant (per participant id).
+    # A rule missing from the mapping is not enforced.
+    rate_limits: dict[str, tuple[int, float]] = {
+        "login_ip": (20, 60.0),
+        "join_ip": (120, 60.0),
+        "join_team": (60, 60.0),
+        "participant_ip": (600, 60.0),
+        "participant": (30, 10.0),
+    }
+    # "memory" keeps buckets per worker; "postgres" shares them across workers.
+    rate_limit_backend: str = "memory"
+
+    # Adds a Server-Timing header with per-request SQL statement count and DB time.
+    server_timing_enabled: bool = True
+
+    # Event loop lag sampling (0 disables); a stall longer than the threshold is logged with
+    # the loop thread's stack.
+    loop_monitor_interval_seconds: float = 0.1
+    loop_lag_threshold_seconds: float = 0.25
+
+    # Trace spans (requests, auth dependencies, SQL, commits, broadcasts) are written as
+    # OTLP/JSON lines to this file, rotated by size; empty disables tracing.
+    trace_file: str = ""
+    trace_file_max_bytes: int = 50 * 1024 * 1024
+    trace_file_backup_count: int = 5
+
     database_url: str
 
+    # Connection pool per worker: connections kept open, and extra ones allowed under load.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    # Connections opened at startup, with the hot statements prepared on each, before
+    # /readyz passes (capped at db_pool_size; 0 skips the warm-up).
+    db_pool_warmup_connections: int = 5
+    # /readyz fails when SELECT 1 takes longer than this.
+    readiness_timeout_seconds: float = 2.0
+
     jwt_secret: str
     jwt_issuer: str = "cyberxercise"
     jwt_audience: str = "cyberxercise-api"
@@ -27,6 +77,47 @@ class Settings(BaseSettings):
     # Pepper used for HMAC hashing participant tokens.
     participant_token_pepper: str
 
+    # Shared secret for /admin endpoints (X-Admin-Token); empty disables them.
+    admin_token: str = ""
+
+    # Ended sessions older than this are moved into session_archives.
+    archive_after_days: int = 30
+    # How often the archival job runs; 0 disables it.
+    archive_interval_seconds: int = 3600
+    archive_batch_size: int = 50
+
+    # Pre-reserved unused team IDs kept ready for session creation.
+    team_id_pool_size: int = 256
+    # How often the pool is topped up; 0 disables the refiller.
+    team_id_pool_refill_interval_seconds: int = 10
+
+    # Upper bound on pre-encoded responses cached for ended sessions, per process; 0 disables.
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+
+    # Post-commit WebSocket fan-out: worker count and per-worker queue bound.
+    event_dispatcher_shards: int = 4
+    event_queue_max_size: int = 10_000
+
+    # Outbox relay: how often it runs (0 disables), how old a pending event must be before
+    # it is replayed, and how many rows it handles per batch.
+    outbox_relay_interval_seconds: float = 1.0
+    outbox_grace_seconds: int = 30
+    outbox_batch_size: int = 500
+    # How often rows of delivered events are deleted. Runs whether or not the relay does, so
+    # delivered ids never pile up in memory; it cannot be disabled.
+    outbox_cleanup_interval_seconds: float = Field(default=1.0, gt=0)
+
+    # Live session stats: minutes of per-minute history kept, sessions held in memory, and
+    # how often changed stats are pushed to instructors (0 disables the push).
+    stats_window_minutes: int = 60
+    stats_max_sessions: int = Field(default=1000, ge=1)
+    stats_broadcast_interval_seconds: float = 5.0
+
+    # A participant whose socket drops is marked left only if they have not reconnected
+    # within this many seconds; the sweeper persists expired departures in batches.
+    presence_grace_seconds: float = 30.0
+    presence_sweep_interval_seconds: float = 1.0
+
 
 @lru_cache
 def get_settings() -> Settings:
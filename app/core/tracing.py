@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import json
+import logging
+import os
+import queue
+import re
+import time
+from collections.abc import Callable, Iterator
+from contextlib import AbstractContextManager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from logging.handlers import QueueListener, RotatingFileHandler
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.metrics import route_label
+from app.core.settings import Settings
+
+
+# Spans are only recorded while an export file is configured; otherwise span() returns at
+# once. Finished spans go to a queue and are encoded and written by a listener thread, so
+# the event loop never does file IO for them.
+
+SERVICE_NAME = "cyberxercise-api"
+
+# OTLP span kinds and status codes.
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+_MAX_STATEMENT_LENGTH = 1000
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    kind: int = KIND_INTERNAL
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: dict[str, Any] = field(default_factory=dict)
+    error: bool = False
+
+
+@dataclass(frozen=True)
+class RemoteParent:
+    trace_id: str
+    span_id: str
+
+
+_current: ContextVar[Span | RemoteParent | None] = ContextVar("trace_span", default=None)
+_queue: queue.SimpleQueue | None = None
+_listener: QueueListener | None = None
+
+
+def enabled() -> bool:
+    return _queue is not None
+
+
+def current_span() -> Span | RemoteParent | None:
+    return _current.get()
+
+
+def start_span(
+    name: str,
+    *,
+    parent: Span | RemoteParent | None = None,
+    kind: int = KIND_INTERNAL,
+    attributes: dict[str, Any] | None = None,
+) -> Span:
+    parent = parent or _current.get()
+    return Span(
+        name=name,
+        trace_id=parent.trace_id if parent is not None else os.urandom(16).hex(),
+        span_id=os.urandom(8).hex(),
+        parent_id=parent.span_id if parent is not None else None,
+        kind=kind,
+        attributes=attributes or {},
+    )
+
+
+def end_span(span: Span, *, error: bool = False) -> None:
+    span.end_ns = time.time_ns()
+    span.error = span.error or error
+    if _queue is not None:
+        _queue.put_nowait(logging.makeLogRecord({"msg": span}))
+
+
+# Returned by span() while tracing is off, so hot loops pay one call and no generator.
+_NOOP_SPAN = contextlib.nullcontext()
+
+
+def span(
+    name: str,
+    *,
+    parent: Span | RemoteParent | None = None,
+    kind: int = KIND_INTERNAL,
+    attributes: dict[str, Any] | None = None,
+) -> AbstractContextManager[Span | None]:
+    if _queue is None:
+        return _NOOP_SPAN
+    return _recorded_span(name, parent=parent, kind=kind, attributes=attributes)
+
+
+@contextlib.contextmanager
+def _recorded_span(
+    name: str, *, parent: Span | RemoteParent | None, kind: int, attributes: dict[str, Any] | None
+) -> Iterator[Span]:
+    current = start_span(name, parent=parent, kind=kind, attributes=attributes)
+    token = _current.set(current)
+    try:
+        yield current
+    except BaseException:
+        current.error = True
+        raise
+    finally:
+        _current.reset(token)
+        end_span(current)
+
+
+def traced(name: str) -> Callable:
+    # For async dependencies and helpers; FastAPI still sees the wrapped signature.
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with span(name):
+                return await fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def _otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def to_otlp(span: Span) -> dict[str, Any]:
+    # One OTLP/JSON export request per span, as written by the collector's file exporter.
+    encoded = {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.name,
+        "kind": span.kind,
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in span.attributes.items()],
+        "status": {"code": _STATUS_ERROR if span.error else _STATUS_OK},
+    }
+    if span.parent_id is not None:
+        encoded["parentSpanId"] = span.parent_id
+    return {
+        "resourceSpans": [
+            {
+                "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": [encoded]}],
+            }
+        ]
+    }
+
+
+class _OtlpJsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(to_otlp(record.msg), separators=(",", ":"))
+
+
+def configure_tracing(settings: Settings) -> None:
+    global _queue, _listener
+    if _queue is not None or not settings.trace_file:
+        return
+    handler = RotatingFileHandler(
+        settings.trace_file,
+        maxBytes=settings.trace_file_max_bytes,
+        backupCount=settings.trace_file_backup_count,
+        encoding="utf-8",
+        delay=True,
+    )
+    handler.setFormatter(_OtlpJsonFormatter())
+    _queue = queue.SimpleQueue()
+    _listener = QueueListener(_queue, handler)
+    _listener.start()
+
+
+def shutdown_tracing() -> None:
+    global _queue, _listener
+    if _listener is None:
+        return
+    _queue = None
+    # stop() flushes everything already queued before returning.
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    parent = _current.get()
+    if parent is not None and _queue is not None:
+        context._trace_span = start_span(
+            "db.query",
+            parent=parent,
+            kind=KIND_CLIENT,
+            attributes={"db.system": "postgresql", "db.statement": statement[:_MAX_STATEMENT_LENGTH]},
+        )
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    traced_span = getattr(context, "_trace_span", None)
+    if traced_span is not None:
+        context._trace_span = None
+        end_span(traced_span)
+
+
+def _handle_error(exception_context) -> None:
+    context = exception_context.execution_context
+    traced_span = getattr(context, "_trace_span", None)
+    if traced_span is not None:
+        context._trace_span = None
+        end_span(traced_span, error=True)
+
+
+def _before_commit(session: Session) -> None:
+    parent = _current.get()
+    if parent is not None and _queue is not None:
+        # Starts before the flush, so the commit span covers the flushed statements too.
+        session.info["trace_commit"] = start_span("db.commit", parent=parent)
+
+
+def _end_commit_span(session: Session, *, error: bool) -> None:
+    traced_span = session.info.pop("trace_commit", None)
+    if traced_span is not None:
+        end_span(traced_span, error=error)
+
+
+def instrument_engine(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(engine, "handle_error", _handle_error)
+
+
+event.listen(Session, "before_commit", _before_commit)
+event.listen(Session, "after_commit", lambda session: _end_commit_span(session, error=False))
+event.listen(Session, "after_rollback", lambda session: _end_commit_span(session, error=True))
+
+
+def _remote_parent(scope: Scope) -> RemoteParent | None:
+    for key, value in scope["headers"]:
+        if key == b"traceparent":
+            match = _TRACEPARENT_RE.match(value.decode("latin-1").strip())
+            if match is not None and match.group(1) != "0" * 32 and match.group(2) != "0" * 16:
+                return RemoteParent(trace_id=match.group(1), span_id=match.group(2))
+    return None
+
+
+class TracingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or _queue is None:
+            await self.app(scope, receive, send)
+            return
+
+        root = start_span(
+            "HTTP",
+            parent=_remote_parent(scope),
+            kind=KIND_SERVER,
+            attributes={"http.request.method": scope["method"], "url.path": scope["path"]},
+        )
+
+        async def send_with_trace(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                root.attributes["http.response.status_code"] = message["status"]
+                root.error = message["status"] >= 500
+                # Lets a client report the trace id of a slow or failed request.
+                MutableHeaders(scope=message).append("traceresponse", f"00-{root.trace_id}-{root.span_id}-01")
+            await send(message)
+
+        token = _current.set(root)
+        try:
+            await self.app(scope, receive, send_with_trace)
+        except BaseException:
+            root.error = True
+            raise
+        finally:
+            _current.reset(token)
+            route = route_label(scope)
+            root.name = f"{scope['method']} {route}"
+            root.attributes["http.route"] = route
+            end_span(root)
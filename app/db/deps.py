@@ -12,7 +12,12 @@ from app.db.session import create_engine, create_sessionmaker
 @lru_cache
 def get_engine() -> AsyncEngine:
     settings = get_settings()
-    return create_engine(settings.database_url, echo=False)
+    return create_engine(
+        settings.database_url,
+        echo=False,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+    )
 
 
 @lru_cache
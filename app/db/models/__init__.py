@@ -1,13 +1,21 @@
 from app.db.models.exercise_session import ExerciseSession, SessionEndedBy, SessionStatus
 from app.db.models.instructor import Instructor
 from app.db.models.message import Message
+from app.db.models.outbox_event import OutboxEvent
 from app.db.models.participant import Participant
+from app.db.models.rate_limit_bucket import RateLimitBucket
+from app.db.models.session_archive import SessionArchive
+from app.db.models.team_id_pool import TeamIdPoolEntry
 
 __all__ = [
     "ExerciseSession",
     "Instructor",
     "Message",
+    "OutboxEvent",
     "Participant",
+    "RateLimitBucket",
+    "SessionArchive",
     "SessionEndedBy",
     "SessionStatus",
+    "TeamIdPoolEntry",
 ]
@@ -38,6 +38,18 @@ class ExerciseSession(Base):
             "team_id ~ '^[A-HJ-NP-Z2-9]{6}$'",
             name="ck_sessions_team_id_format",
         ),
+        sa.CheckConstraint(
+            "ready_participants BETWEEN 0 AND active_participants AND message_count >= 0",
+            name="ck_sessions_counters",
+        ),
+        sa.Index(
+            "ix_exercise_sessions_instructor_id_created_at", "instructor_id", "created_at", "id"
+        ),
+        sa.Index(
+            "ix_exercise_sessions_ended_at",
+            "ended_at",
+            postgresql_where=sa.text("status = 'ended'"),
+        ),
     )
 
     id: Mapped[uuid.UUID] = mapped_column(
@@ -73,6 +85,22 @@ class ExerciseSession(Base):
         sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
     )
 
+    # Denormalized counters, maintained by the write paths under a row lock on the session.
+    active_participants: Mapped[int] = mapped_column(
+        sa.Integer(), nullable=False, default=0, server_default=sa.text("0")
+    )
+    ready_participants: Mapped[int] = mapped_column(
+        sa.Integer(), nullable=False, default=0, server_default=sa.text("0")
+    )
+    message_count: Mapped[int] = mapped_column(
+        sa.Integer(), nullable=False, default=0, server_default=sa.text("0")
+    )
+
+    # Bumped on every change visible in the session details or participant list; used as ETag.
+    version: Mapped[int] = mapped_column(
+        sa.Integer(), nullable=False, default=1, server_default=sa.text("1")
+    )
+
     instructor: Mapped["Instructor"] = relationship(back_populates="sessions")
     participants: Mapped[list["Participant"]] = relationship(
         back_populates="session", cascade="all, delete-orphan"
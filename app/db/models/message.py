@@ -6,7 +6,7 @@ from typing import TYPE_CHECKING
 
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.orm import Mapped, deferred, mapped_column, relationship
 
 from app.db.base import Base
 
@@ -19,6 +19,13 @@ if TYPE_CHECKING:
 class Message(Base):
     __tablename__ = "messages"
 
+    __table_args__ = (
+        sa.UniqueConstraint(
+            "participant_id", "idempotency_key", name="uq_messages_participant_idempotency_key"
+        ),
+        sa.Index("ix_messages_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     id: Mapped[uuid.UUID] = mapped_column(
         postgresql.UUID(as_uuid=True), primary_key=True, default=uuid.uuid4
     )
@@ -39,9 +46,22 @@ class Message(Base):
 
     content: Mapped[str] = mapped_column(sa.Text(), nullable=False)
 
+    # Client-supplied Idempotency-Key; retries with the same key return the original message.
+    idempotency_key: Mapped[str | None] = mapped_column(sa.String(255), nullable=True)
+
     created_at: Mapped[datetime] = mapped_column(
         sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
     )
 
+    # 'simple' keeps CVE ids and hostnames intact (no stemming or stop words). Deferred so
+    # ordinary loads of Message never fetch it.
+    search_vector: Mapped[str] = deferred(
+        mapped_column(
+            postgresql.TSVECTOR,
+            sa.Computed("to_tsvector('simple'::regconfig, content)", persisted=True),
+            nullable=False,
+        )
+    )
+
     session: Mapped["ExerciseSession"] = relationship(back_populates="messages")
     participant: Mapped["Participant"] = relationship(back_populates="messages")
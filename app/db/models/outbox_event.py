@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+from typing import Any
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+
+    # Identity ids follow commit order closely enough to replay a session's events in order.
+    id: Mapped[int] = mapped_column(sa.BigInteger(), sa.Identity(), primary_key=True)
+
+    # No foreign key: pending events must survive the session being archived.
+    session_id: Mapped[uuid.UUID] = mapped_column(postgresql.UUID(as_uuid=True), nullable=False)
+
+    event_type: Mapped[str] = mapped_column(sa.String(64), nullable=False)
+    payload: Mapped[dict[str, Any]] = mapped_column(postgresql.JSONB, nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+    )
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    # Limiter state is disposable, so the table skips the WAL.
+    __table_args__ = {"prefixes": ["UNLOGGED"]}
+
+    # "<rule>:<subject>", e.g. "join_ip:203.0.113.7".
+    key: Mapped[str] = mapped_column(sa.Text, primary_key=True)
+
+    # GCRA theoretical arrival time, in epoch seconds of the database clock. The bucket is
+    # full again once this is in the past, so such rows can be deleted.
+    tat: Mapped[float] = mapped_column(sa.Double, nullable=False)
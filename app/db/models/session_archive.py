@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class SessionArchive(Base):
+    __tablename__ = "session_archives"
+
+    __table_args__ = (
+        sa.Index("ix_session_archives_instructor_id_created_at", "instructor_id", "created_at"),
+    )
+
+    # Same id as the archived exercise_sessions row, so links keep working.
+    session_id: Mapped[uuid.UUID] = mapped_column(postgresql.UUID(as_uuid=True), primary_key=True)
+
+    instructor_id: Mapped[uuid.UUID] = mapped_column(
+        postgresql.UUID(as_uuid=True), sa.ForeignKey("instructors.id", ondelete="CASCADE"), nullable=False
+    )
+
+    team_id: Mapped[str] = mapped_column(sa.String(6), nullable=False)
+
+    participant_count: Mapped[int] = mapped_column(sa.Integer(), nullable=False)
+    message_count: Mapped[int] = mapped_column(sa.Integer(), nullable=False)
+
+    created_at: Mapped[datetime] = mapped_column(sa.DateTime(timezone=True), nullable=False)
+    ended_at: Mapped[datetime | None] = mapped_column(sa.DateTime(timezone=True), nullable=True)
+    archived_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+    )
+
+    # zlib-compressed JSON document: {"session": {...}, "participants": [...], "messages": [...]}
+    payload: Mapped[bytes] = mapped_column(postgresql.BYTEA, nullable=False)
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from datetime import datetime
+
+import sqlalchemy as sa
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.base import Base
+
+
+class TeamIdPoolEntry(Base):
+    __tablename__ = "team_id_pool"
+
+    __table_args__ = (
+        sa.CheckConstraint(
+            "team_id ~ '^[A-HJ-NP-Z2-9]{6}$'",
+            name="ck_team_id_pool_team_id_format",
+        ),
+    )
+
+    # Unused team IDs, reserved ahead of time so session creation never retries.
+    team_id: Mapped[str] = mapped_column(sa.String(6), primary_key=True)
+
+    created_at: Mapped[datetime] = mapped_column(
+        sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False
+    )
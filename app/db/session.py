@@ -1,12 +1,40 @@
 from __future__ import annotations
 
+import time
 from collections.abc import AsyncIterator
 
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
-
-
-def create_engine(database_url: str, *, echo: bool = False) -> AsyncEngine:
-    return create_async_engine(database_url, echo=echo, pool_pre_ping=True)
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from app.core.metrics import DB_POOL_CHECKOUT
+from app.core import tracing
+from app.core.query_stats import instrument_engine
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    # _do_get is where a checkout waits for a free connection (or opens an overflow one).
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT.observe(time.perf_counter() - start)
+
+
+def create_engine(
+    database_url: str, *, echo: bool = False, pool_size: int = 5, max_overflow: int = 10
+) -> AsyncEngine:
+    engine = create_async_engine(
+        database_url,
+        echo=echo,
+        pool_pre_ping=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+    )
+    instrument_engine(engine.sync_engine)
+    tracing.instrument_engine(engine.sync_engine)
+    return engine
 
 
 def create_sessionmaker(engine: AsyncEngine) -> async_sessionmaker[AsyncSession]:
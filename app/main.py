@@ -1,21 +1,99 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from app.api.router import api_router
+from app.api.router import api_routers
+from app.core import metrics, tracing
+from app.core.load_shedding import LoadSheddingMiddleware
+from app.core.loop_monitor import LoopLagMonitor
+from app.core.query_stats import QueryStatsMiddleware
 from app.core.settings import get_settings
-from app.db.deps import get_engine
+from app.db.deps import get_engine, get_sessionmaker
+from app.services.archival import run_archiver
+from app.services.outbox import delete_delivered_events, run_outbox_cleanup, run_outbox_relay
+from app.services.presence import get_presence_tracker, run_presence_sweeper
+from app.services.session_stats import get_session_stats, run_stats_broadcaster
+from app.services.team_id_pool import run_team_id_pool_refiller
+from app.services.warmup import run_pool_warmup
+from app.ws.deps import get_event_dispatcher, get_ws_manager
 from app.ws.router import router as ws_router
 
 
+logger = logging.getLogger(__name__)
+
+
+def _resolve(app: FastAPI, dependency):
+    # Background jobs honour dependency overrides (e.g. the test database).
+    return app.dependency_overrides.get(dependency, dependency)()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Ensure engine is created at startup; dispose at shutdown.
     engine = get_engine()
+    settings = _resolve(app, get_settings)
+    sessionmaker = _resolve(app, get_sessionmaker)
+    events = _resolve(app, get_event_dispatcher)
+    ws = _resolve(app, get_ws_manager)
+    stats = _resolve(app, get_session_stats)
+    events.add_listener(stats.observe)
+    events.start()
+    metrics.bind_runtime(pool=sessionmaker.kw["bind"].pool, ws=ws, events=events)
+    tracing.configure_tracing(settings)
+
+    monitor = None
+    if settings.loop_monitor_interval_seconds > 0:
+        monitor = LoopLagMonitor(
+            interval=settings.loop_monitor_interval_seconds, threshold=settings.loop_lag_threshold_seconds
+        )
+        monitor.start()
+
+    tasks: list[asyncio.Task] = []
+    warmup_connections = min(settings.db_pool_warmup_connections, settings.db_pool_size)
+    app.state.pool_warmed = warmup_connections <= 0
+    if not app.state.pool_warmed:
+        # In the background so /healthz answers at once; /readyz waits for it.
+        tasks.append(
+            asyncio.create_task(run_pool_warmup(sessionmaker, connections=warmup_connections, state=app.state))
+        )
+    if settings.archive_interval_seconds > 0:
+        tasks.append(asyncio.create_task(run_archiver(sessionmaker, settings)))
+    if settings.team_id_pool_refill_interval_seconds > 0:
+        tasks.append(asyncio.create_task(run_team_id_pool_refiller(sessionmaker, settings)))
+    tasks.append(asyncio.create_task(run_outbox_cleanup(sessionmaker, events, settings)))
+    if settings.outbox_relay_interval_seconds > 0:
+        tasks.append(asyncio.create_task(run_outbox_relay(sessionmaker, events, ws, settings)))
+    if settings.stats_broadcast_interval_seconds > 0:
+        tasks.append(asyncio.create_task(run_stats_broadcaster(stats, ws, settings)))
+    if settings.presence_sweep_interval_seconds > 0:
+        presence = _resolve(app, get_presence_tracker)
+        tasks.append(
+            asyncio.create_task(run_presence_sweeper(presence, sessionmaker, events, ws, settings))
+        )
+
     yield
+
+    for task in tasks:
+        task.cancel()
+    for task in tasks:
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    # Deliver what was already committed before the sockets go away.
+    await events.stop()
+    events.remove_listener(stats.observe)
+    try:
+        await delete_delivered_events(sessionmaker, events.take_acknowledged())
+    except Exception:
+        logger.exception("Failed to clear delivered outbox events on shutdown")
+    if monitor is not None:
+        await monitor.stop()
+    tracing.shutdown_tracing()
     await engine.dispose()
 
 
@@ -23,6 +101,15 @@ def create_app() -> FastAPI:
     settings = get_settings()
     app = FastAPI(title="Cyberxercise API", lifespan=lifespan)
 
+    # Added first so it is innermost: CORS answers preflights before they reach it and adds
+    # its headers to shed 503s, so the SPA can read the status and Retry-After.
+    if settings.load_shed_limits:
+        app.add_middleware(
+            LoadSheddingMiddleware,
+            limits=settings.load_shed_limits,
+            retry_after_seconds=settings.load_shed_retry_after_seconds,
+        )
+
     origins = [o.strip() for o in (settings.cors_origins or "").split(",") if o.strip()]
     if origins:
         app.add_middleware(
@@ -33,7 +120,13 @@ def create_app() -> FastAPI:
             allow_headers=["*"] ,
         )
 
-    app.include_router(api_router)
+    app.add_middleware(QueryStatsMiddleware, server_timing=settings.server_timing_enabled)
+    app.add_middleware(tracing.TracingMiddleware)
+    # Added last so it is outermost and times everything, CORS preflights included.
+    app.add_middleware(metrics.MetricsMiddleware)
+
+    for router in api_routers:
+        app.include_router(router)
     app.include_router(ws_router)
     return app
 
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import uuid
+import zlib
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.settings import Settings
+from app.db.models.exercise_session import ExerciseSession, SessionStatus
+from app.db.models.message import Message
+from app.db.models.participant import Participant
+from app.db.models.session_archive import SessionArchive
+from app.services.team_id_pool import release_team_ids
+
+
+logger = logging.getLogger(__name__)
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+def encode_archive_payload(document: dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(document, separators=(",", ":")).encode("utf-8"))
+
+
+def decode_archive_payload(payload: bytes) -> dict[str, Any]:
+    return json.loads(zlib.decompress(payload))
+
+
+async def _build_archive(db: AsyncSession, session: ExerciseSession) -> SessionArchive:
+    participants_result = await db.execute(
+        select(Participant)
+        .where(Participant.session_id == session.id)
+        .order_by(Participant.joined_at.asc())
+    )
+    participants = participants_result.scalars().all()
+
+    messages_result = await db.execute(
+        select(Message.id, Message.participant_id, Message.content, Message.created_at)
+        .where(Message.session_id == session.id)
+        .order_by(Message.created_at.asc())
+    )
+    messages = messages_result.all()
+
+    document = {
+        "session": {
+            "id": str(session.id),
+            "instructor_id": str(session.instructor_id),
+            "team_id": session.team_id,
+            "status": session.status.value,
+            "max_participants": session.max_participants,
+            "duration_seconds": session.duration_seconds,
+            "started_at": _iso(session.started_at),
+            "ended_at": _iso(session.ended_at),
+            "ended_by": session.ended_by.value if session.ended_by else None,
+            "created_at": _iso(session.created_at),
+        },
+        "participants": [
+            {
+                "id": str(p.id),
+                "display_name": p.display_name,
+                "is_ready": p.is_ready,
+                "joined_at": _iso(p.joined_at),
+                "left_at": _iso(p.left_at),
+            }
+            for p in participants
+        ],
+        "messages": [
+            {
+                "id": str(message_id),
+                "participant_id": str(participant_id),
+                "content": content,
+                "created_at": _iso(created_at),
+            }
+            for (message_id, participant_id, content, created_at) in messages
+        ],
+    }
+
+    return SessionArchive(
+        session_id=session.id,
+        instructor_id=session.instructor_id,
+        team_id=session.team_id,
+        participant_count=len(participants),
+        message_count=len(messages),
+        created_at=session.created_at,
+        ended_at=session.ended_at,
+        payload=encode_archive_payload(document),
+    )
+
+
+async def archive_ended_sessions(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    *,
+    older_than: timedelta,
+    batch_size: int = 50,
+) -> int:
+    cutoff = datetime.now(timezone.utc) - older_than
+
+    async with sessionmaker() as db:
+        result = await db.execute(
+            select(ExerciseSession)
+            .where(ExerciseSession.status == SessionStatus.ended)
+            .where(ExerciseSession.ended_at < cutoff)
+            .order_by(ExerciseSession.ended_at.asc())
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        sessions = result.scalars().all()
+        if not sessions:
+            return 0
+
+        for session in sessions:
+            db.add(await _build_archive(db, session))
+
+        # Participants and messages go with the session via ON DELETE CASCADE.
+        await db.execute(
+            delete(ExerciseSession).where(ExerciseSession.id.in_([s.id for s in sessions]))
+        )
+        await release_team_ids(db, [s.team_id for s in sessions])
+        await db.commit()
+        return len(sessions)
+
+
+async def load_session_archive(
+    db: AsyncSession, *, session_id: uuid.UUID, instructor_id: uuid.UUID
+) -> dict[str, Any] | None:
+    result = await db.execute(
+        select(SessionArchive.payload)
+        .where(SessionArchive.session_id == session_id)
+        .where(SessionArchive.instructor_id == instructor_id)
+    )
+    payload = result.scalar_one_or_none()
+    if payload is None:
+        return None
+    return decode_archive_payload(payload)
+
+
+async def run_archiver(sessionmaker: async_sessionmaker[AsyncSession], settings: Settings) -> None:
+    older_than = timedelta(days=settings.archive_after_days)
+    while True:
+        await asyncio.sleep(settings.archive_interval_seconds)
+        try:
+            while (
+                await archive_ended_sessions(
+                    sessionmaker, older_than=older_than, batch_size=settings.archive_batch_size
+                )
+                >= settings.archive_batch_size
+            ):
+                pass
+        except Exception:
+            logger.exception("Session archival run failed")
@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+
+class IdempotencyCache:
+    # Per-process fast path in front of the (participant_id, idempotency_key) constraint;
+    # misses fall through to the database, so eviction never breaks correctness.
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[tuple[uuid.UUID, str], Any] = OrderedDict()
+
+    def get(self, participant_id: uuid.UUID, key: str) -> Any | None:
+        entry_key = (participant_id, key)
+        value = self._entries.get(entry_key)
+        if value is not None:
+            self._entries.move_to_end(entry_key)
+        return value
+
+    def put(self, participant_id: uuid.UUID, key: str, value: Any) -> None:
+        entry_key = (participant_id, key)
+        self._entries[entry_key] = value
+        self._entries.move_to_end(entry_key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+@lru_cache
+def get_idempotency_cache() -> IdempotencyCache:
+    return IdempotencyCache()
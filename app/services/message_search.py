@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import re
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import func, literal, select, tuple_
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.message import Message
+from app.db.models.participant import Participant
+
+
+SEARCH_CONFIG = "simple"
+
+_WORD_RE = re.compile(r"\w+")
+
+
+@dataclass(frozen=True)
+class MessageSearchHit:
+    id: uuid.UUID
+    participant_id: uuid.UUID
+    display_name: str
+    content: str
+    created_at: datetime
+    rank: float
+
+
+async def search_session_messages(
+    db: AsyncSession,
+    *,
+    session_id: uuid.UUID,
+    q: str,
+    limit: int,
+    after: tuple[float, uuid.UUID] | None = None,
+) -> list[MessageSearchHit]:
+    # Ordered by (rank, id) descending so the cursor is a plain row comparison.
+    query = func.websearch_to_tsquery(literal(SEARCH_CONFIG).cast(REGCONFIG), q)
+    rank = func.ts_rank(Message.search_vector, query)
+
+    stmt = (
+        select(
+            Message.id,
+            Message.participant_id,
+            Participant.display_name,
+            Message.content,
+            Message.created_at,
+            rank.label("rank"),
+        )
+        .join(Participant, Participant.id == Message.participant_id)
+        .where(Message.session_id == session_id)
+        .where(Message.search_vector.bool_op("@@")(query))
+    )
+    if after is not None:
+        stmt = stmt.where(tuple_(rank, Message.id) < tuple_(*after))
+    stmt = stmt.order_by(rank.desc(), Message.id.desc()).limit(limit)
+
+    result = await db.execute(stmt)
+    return [MessageSearchHit(*row) for row in result.all()]
+
+
+def search_archived_messages(
+    archive: dict[str, Any],
+    *,
+    q: str,
+    limit: int,
+    after: tuple[float, uuid.UUID] | None = None,
+) -> list[MessageSearchHit]:
+    # Archives hold the transcript as JSON, so match in Python: every query word must occur
+    # as a word of the message, ranked by occurrences. websearch operators are not supported.
+    terms = [term.lower() for term in _WORD_RE.findall(q)]
+    if not terms:
+        return []
+
+    display_names = {p["id"]: p["display_name"] for p in archive["participants"]}
+    hits = []
+    for message in archive["messages"]:
+        words = [word.lower() for word in _WORD_RE.findall(message["content"])]
+        if not all(term in words for term in terms):
+            continue
+        rank = float(sum(words.count(term) for term in terms))
+        key = (rank, uuid.UUID(message["id"]))
+        if after is not None and not key < after:
+            continue
+        hits.append(
+            MessageSearchHit(
+                id=key[1],
+                participant_id=uuid.UUID(message["participant_id"]),
+                display_name=display_names[message["participant_id"]],
+                content=message["content"],
+                created_at=datetime.fromisoformat(message["created_at"]),
+                rank=rank,
+            )
+        )
+    hits.sort(key=lambda hit: (hit.rank, hit.id), reverse=True)
+    return hits[:limit]
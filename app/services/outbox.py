@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import Any
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.settings import Settings
+from app.db.models.outbox_event import OutboxEvent
+from app.ws.dispatcher import EventDispatcher
+
+
+logger = logging.getLogger(__name__)
+
+
+# Realtime events are written in the same transaction as the state change. After commit the
+# route hands the row to the dispatcher (fast path); whatever is still in the table after the
+# grace period, e.g. because the process died or the broadcast failed, is replayed by the relay
+# through the same dispatcher shard. Delivery is at-least-once. Like WsManager itself, this
+# assumes a single API process.
+def add_outbox_event(
+    db: AsyncSession, *, session_id: uuid.UUID, event_type: str, data: dict[str, Any]
+) -> OutboxEvent:
+    event = OutboxEvent(session_id=session_id, event_type=event_type, payload=data)
+    db.add(event)
+    return event
+
+
+async def publish_outbox_event(events: EventDispatcher, ws: Any, event: OutboxEvent) -> None:
+    await events.publish(
+        ws,
+        session_id=event.session_id,
+        event_type=event.event_type,
+        data=event.payload,
+        outbox_id=event.id,
+    )
+
+
+async def delete_delivered_events(sessionmaker: async_sessionmaker[AsyncSession], ids: Sequence[int]) -> None:
+    if not ids:
+        return
+    async with sessionmaker() as db:
+        await db.execute(delete(OutboxEvent).where(OutboxEvent.id.in_(ids)))
+        await db.commit()
+
+
+async def relay_pending_events(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    events: EventDispatcher,
+    ws: Any,
+    *,
+    older_than: timedelta,
+    batch_size: int = 500,
+) -> int:
+    # Overdue rows are claimed by moving created_at to now, which leases them for another
+    # grace period, and the claim is committed before anything is sent. Rows the dispatcher
+    # still holds are skipped, so a backed-up shard is not delivered twice.
+    overdue = (
+        select(OutboxEvent.id)
+        .where(OutboxEvent.created_at < func.now() - older_than)
+        .order_by(OutboxEvent.id.asc())
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    unsettled = events.unsettled_outbox_ids()
+    if unsettled:
+        overdue = overdue.where(OutboxEvent.id.not_in(unsettled))
+
+    async with sessionmaker() as db:
+        result = await db.execute(
+            update(OutboxEvent)
+            .where(OutboxEvent.id.in_(overdue))
+            .values(created_at=func.now())
+            .returning(OutboxEvent.id, OutboxEvent.session_id, OutboxEvent.event_type, OutboxEvent.payload)
+        )
+        rows = sorted(result.all())
+        await db.commit()
+
+    # Published onto the session's shard like any other event; acknowledged ids are deleted
+    # by run_outbox_cleanup.
+    for event_id, session_id, event_type, payload in rows:
+        await events.publish(ws, session_id=session_id, event_type=event_type, data=payload, outbox_id=event_id)
+    return len(rows)
+
+
+async def run_outbox_cleanup(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    events: EventDispatcher,
+    settings: Settings,
+) -> None:
+    while True:
+        await asyncio.sleep(settings.outbox_cleanup_interval_seconds)
+        acknowledged = events.take_acknowledged()
+        try:
+            await delete_delivered_events(sessionmaker, acknowledged)
+        except Exception:
+            # The rows stay; if the relay runs it replays them (at-least-once).
+            logger.exception("Deleting %d delivered outbox events failed", len(acknowledged))
+
+
+async def run_outbox_relay(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    events: EventDispatcher,
+    ws: Any,
+    settings: Settings,
+) -> None:
+    older_than = timedelta(seconds=settings.outbox_grace_seconds)
+    while True:
+        await asyncio.sleep(settings.outbox_relay_interval_seconds)
+        try:
+            while (
+                await relay_pending_events(
+                    sessionmaker, events, ws, older_than=older_than, batch_size=settings.outbox_batch_size
+                )
+                >= settings.outbox_batch_size
+            ):
+                pass
+        except Exception:
+            logger.exception("Outbox relay run failed")
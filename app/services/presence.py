@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.settings import Settings, get_settings
+from app.db.models.exercise_session import SessionStatus
+from app.db.models.participant import Participant
+from app.services.outbox import add_outbox_event, publish_outbox_event
+from app.services.session_state import lock_session, mark_participant_left
+from app.ws.dispatcher import EventDispatcher
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PendingDeparture:
+    session_id: uuid.UUID
+    participant_id: uuid.UUID
+    disconnected_at: datetime
+
+
+class PresenceTracker:
+    # A dropped participant socket only starts a grace window; the participant is marked left
+    # once it expires without a reconnect. State is per process, like WsManager's sockets.
+    def __init__(self, *, grace_seconds: float) -> None:
+        self.grace = timedelta(seconds=grace_seconds)
+        self._sockets: dict[uuid.UUID, int] = defaultdict(int)
+        self._pending: dict[uuid.UUID, PendingDeparture] = {}
+
+    def connected(self, participant_id: uuid.UUID) -> bool:
+        # True when this connection cancels a pending departure.
+        self._sockets[participant_id] += 1
+        return self._pending.pop(participant_id, None) is not None
+
+    def disconnected(self, *, session_id: uuid.UUID, participant_id: uuid.UUID, now: datetime) -> bool:
+        # True when the participant's last socket went away and the grace window started.
+        self._sockets[participant_id] -= 1
+        if self._sockets[participant_id] > 0:
+            return False
+        del self._sockets[participant_id]
+        self._pending[participant_id] = PendingDeparture(
+            session_id=session_id,
+            participant_id=participant_id,
+            disconnected_at=now,
+        )
+        return True
+
+    def is_pending(self, participant_id: uuid.UUID) -> bool:
+        return participant_id in self._pending
+
+    def restore(self, departures: list[PendingDeparture]) -> None:
+        # Put back departures that could not be persisted, unless the participant came back.
+        for departure in departures:
+            if departure.participant_id not in self._sockets:
+                self._pending.setdefault(departure.participant_id, departure)
+
+    def take_expired(self, now: datetime) -> list[PendingDeparture]:
+        cutoff = now - self.grace
+        expired = [d for d in self._pending.values() if d.disconnected_at <= cutoff]
+        for departure in expired:
+            del self._pending[departure.participant_id]
+        return expired
+
+
+async def persist_departures(
+    sessionmaker: async_sessionmaker[AsyncSession],
+    events: EventDispatcher,
+    ws: Any,
+    departures: list[PendingDeparture],
+) -> int:
+    if not departures:
+        return 0
+
+    by_session: dict[uuid.UUID, list[PendingDeparture]] = defaultdict(list)
+    for departure in departures:
+        by_session[departure.session_id].append(departure)
+
+    async with sessionmaker() as db:
+        result = await db.execute(
+            select(Participant)
+            .where(Participant.id.in_([d.participant_id for d in departures]))
+            .where(Participant.left_at.is_(None))
+        )
+        participants = {p.id: p for p in result.scalars().all()}
+
+        outbox = []
+        # Sessions are locked in a stable order so concurrent sweeps cannot deadlock.
+        for session_id in sorted(by_session, key=str):
+            session = await lock_session(db, session_id)
+            # Ending a session already marked everyone left; ended sessions never change.
+            if session is None or session.status == SessionStatus.ended:
+                continue
+            for departure in by_session[session_id]:
+                participant = participants.get(departure.participant_id)
+                if participant is None:
+                    # Left explicitly during the grace window.
+                    continue
+                await db.refresh(participant)
+                if participant.left_at is not None:
+                    continue
+                mark_participant_left(session, participant, now=departure.disconnected_at)
+                outbox.append(
+                    add_outbox_event(
+                        db,
+                        session_id=session_id,
+                        event_type="participant_left",
+                        data={
+                            "participant": {
+                                "id": str(participant.id),
+                                "display_name": participant.display_name,
+                                "left_at": departure.disconnected_at.isoformat(),
+                            }
+                        },
+                    )
+                )
+        await db.commit()
+
+    for event in outbox:
+        await publish_outbox_event(events, ws, event)
+    return len(outbox)
+
+
+async def run_presence_sweeper(
+    presence: PresenceTracker,
+    sessionmaker: async_sessionmaker[AsyncSession],
+    events: EventDispatcher,
+    ws: Any,
+    settings: Settings,
+) -> None:
+    while True:
+        await asyncio.sleep(settings.presence_sweep_interval_seconds)
+        expired = presence.take_expired(datetime.now(timezone.utc))
+        try:
+            await persist_departures(sessionmaker, events, ws, expired)
+        except Exception:
+            logger.exception("Persisting %d participant departures failed", len(expired))
+            presence.restore(expired)
+
+
+@lru_cache
+def get_presence_tracker() -> PresenceTracker:
+    return PresenceTracker(grace_seconds=get_settings().presence_grace_seconds)
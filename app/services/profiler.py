@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+from types import FrameType
+
+
+def _frame_label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({code.co_filename}:{frame.f_lineno})"
+
+
+def _collapse(frames: list[FrameType]) -> str:
+    # Root first, as flamegraph.pl / speedscope expect.
+    return ";".join(_frame_label(frame) for frame in frames)
+
+
+def _thread_stack(frame: FrameType | None) -> list[FrameType]:
+    frames = []
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+class StackSampler:
+    # Samples the event loop thread's stack from a separate thread, so the loop pays only for
+    # the GIL hand-offs. With tasks=True each sample also records where every suspended task
+    # is awaiting (a wall-clock view of what the worker is waiting on); that walk holds the
+    # GIL per task, so it is opt-in.
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def profile(
+        self, loop: asyncio.AbstractEventLoop, loop_thread: int, *, seconds: float, interval: float, tasks: bool
+    ) -> tuple[str, int]:
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy
+        try:
+            return self._sample(loop, loop_thread, seconds=seconds, interval=interval, tasks=tasks)
+        finally:
+            self._lock.release()
+
+    def _sample(
+        self, loop: asyncio.AbstractEventLoop, loop_thread: int, *, seconds: float, interval: float, tasks: bool
+    ) -> tuple[str, int]:
+        stacks: Counter[str] = Counter()
+        samples = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(loop_thread)
+            if frame is not None:
+                stacks["loop;" + _collapse(_thread_stack(frame))] += 1
+            if tasks:
+                for task in _suspended_tasks(loop):
+                    stack = task.get_stack()
+                    if stack:
+                        stacks[f"task:{task.get_name()};" + _collapse(stack)] += 1
+            samples += 1
+            time.sleep(interval)
+        return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common()), samples
+
+
+def _suspended_tasks(loop: asyncio.AbstractEventLoop) -> list[asyncio.Task]:
+    try:
+        running = asyncio.current_task(loop)
+        return [task for task in asyncio.all_tasks(loop) if task is not running]
+    except RuntimeError:
+        # The task set changed under us; skip this sample's tasks.
+        return []
+
+
+@lru_cache
+def get_stack_sampler() -> StackSampler:
+    return StackSampler()
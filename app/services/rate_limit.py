@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import time
+from functools import lru_cache
+from typing import Protocol
+
+import sqlalchemy as sa
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.settings import get_settings
+from app.db.deps import get_sessionmaker
+from app.db.models.rate_limit_bucket import RateLimitBucket
+
+
+# Token buckets kept as GCRA: a bucket allowing `requests` per `seconds` is one number, the
+# time at which it would be full again (its "theoretical arrival time"). Each request pushes
+# that time forward by seconds / requests, and is refused when that would put it more than
+# `seconds` ahead of now. A bucket whose time has passed is full and can be dropped.
+
+_SWEEP_INTERVAL_SECONDS = 60.0
+# Floor for Retry-After on a refused request whose wait rounds to nothing, e.g. when a
+# concurrent request moved the bucket after this one read it.
+_MIN_RETRY_AFTER_SECONDS = 0.001
+
+
+class RateLimiter(Protocol):
+    async def hit(self, key: str, *, requests: int, seconds: float) -> float:
+        # 0 when the request is allowed, else seconds until it would be.
+        ...
+
+
+class MemoryRateLimiter:
+    # Per process: with several workers a client gets up to one budget per worker.
+    def __init__(self, *, clock=time.monotonic) -> None:
+        self._clock = clock
+        self._tat: dict[str, float] = {}
+        self._next_sweep = clock() + _SWEEP_INTERVAL_SECONDS
+
+    def __len__(self) -> int:
+        return len(self._tat)
+
+    async def hit(self, key: str, *, requests: int, seconds: float) -> float:
+        now = self._clock()
+        if now >= self._next_sweep:
+            self._sweep(now)
+        tat = max(self._tat.get(key, now), now) + seconds / requests
+        if tat - now > seconds:
+            return tat - now - seconds
+        self._tat[key] = tat
+        return 0.0
+
+    def _sweep(self, now: float) -> None:
+        self._tat = {key: tat for key, tat in self._tat.items() if tat > now}
+        self._next_sweep = now + _SWEEP_INTERVAL_SECONDS
+
+
+class PostgresRateLimiter:
+    # Shared by every worker through the rate_limit_buckets table. Times come from the
+    # database clock. Each check is its own short transaction on a second pooled connection,
+    # next to the one the request's session may already hold, so size DB_POOL_SIZE /
+    # DB_MAX_OVERFLOW for that.
+    def __init__(self, sessionmaker: async_sessionmaker[AsyncSession]) -> None:
+        self._sessionmaker = sessionmaker
+        self._next_sweep = time.monotonic() + _SWEEP_INTERVAL_SECONDS
+
+    async def hit(self, key: str, *, requests: int, seconds: float) -> float:
+        interval = seconds / requests
+        now = select(
+            sa.cast(sa.extract("epoch", sa.func.clock_timestamp()), sa.Double).label("t")
+        ).cte("now")
+        insert = postgresql.insert(RateLimitBucket).from_select(
+            ["key", "tat"], select(sa.literal(key), now.c.t + interval)
+        )
+        # excluded.tat - interval is the statement's "now".
+        request_now = insert.excluded.tat - interval
+        tat = sa.func.greatest(RateLimitBucket.tat, request_now) + interval
+        upsert = (
+            insert.on_conflict_do_update(
+                index_elements=[RateLimitBucket.key],
+                set_={"tat": tat},
+                where=tat - request_now <= seconds,
+            )
+            .returning(RateLimitBucket.tat)
+            .cte("upsert")
+        )
+        # One round trip: whether the upsert granted the request, plus the bucket as it was
+        # before (the outer select sees the pre-statement snapshot) at the same "now".
+        stmt = select(
+            select(upsert.c.tat).scalar_subquery().label("granted"),
+            RateLimitBucket.tat.label("previous"),
+            now.c.t,
+        ).select_from(now.outerjoin(RateLimitBucket, RateLimitBucket.key == key))
+
+        async with self._sessionmaker() as db:
+            granted, previous, current = (await db.execute(stmt)).one()
+            if time.monotonic() >= self._next_sweep:
+                self._next_sweep = time.monotonic() + _SWEEP_INTERVAL_SECONDS
+                await db.execute(delete(RateLimitBucket).where(RateLimitBucket.tat < current))
+            await db.commit()
+        if granted is not None:
+            return 0.0
+        wait = max(previous or current, current) + interval - current - seconds
+        return max(wait, _MIN_RETRY_AFTER_SECONDS)
+
+
+@lru_cache
+def get_rate_limiter() -> RateLimiter:
+    settings = get_settings()
+    if settings.rate_limit_backend == "postgres":
+        return PostgresRateLimiter(get_sessionmaker())
+    return MemoryRateLimiter()
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+from app.core.settings import get_settings
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    instructor_id: uuid.UUID
+    body: bytes
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+class ResponseCache:
+    # Pre-encoded bodies of ended sessions. Those never change, so entries are only ever
+    # dropped by LRU eviction once the total body size exceeds max_bytes.
+    def __init__(self, max_bytes: int) -> None:
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._entries: OrderedDict[tuple[str, uuid.UUID], CachedResponse] = OrderedDict()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def get(self, kind: str, session_id: uuid.UUID, *, instructor_id: uuid.UUID) -> CachedResponse | None:
+        key = (kind, session_id)
+        entry = self._entries.get(key)
+        if entry is None or entry.instructor_id != instructor_id:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, kind: str, session_id: uuid.UUID, entry: CachedResponse) -> None:
+        if len(entry.body) > self._max_bytes:
+            return
+        key = (kind, session_id)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous.body)
+        self._entries[key] = entry
+        self._size += len(entry.body)
+        while self._size > self._max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.body)
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    return ResponseCache(max_bytes=get_settings().response_cache_max_bytes)
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime
+
+from sqlalchemy import func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models.exercise_session import ExerciseSession, SessionStatus
+from app.db.models.participant import Participant
+
+
+# Every write that changes a session's counters or status first takes the session row
+# lock, so the counters stay exact without re-counting participants.
+async def lock_session(
+    db: AsyncSession, session_id: uuid.UUID, *, instructor_id: uuid.UUID | None = None
+) -> ExerciseSession | None:
+    stmt = (
+        select(ExerciseSession)
+        .where(ExerciseSession.id == session_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    if instructor_id is not None:
+        stmt = stmt.where(ExerciseSession.instructor_id == instructor_id)
+    result = await db.execute(stmt)
+    return result.scalar_one_or_none()
+
+
+async def lock_session_by_team_id(db: AsyncSession, team_id: str) -> ExerciseSession | None:
+    result = await db.execute(
+        select(ExerciseSession)
+        .where(ExerciseSession.team_id == team_id)
+        .with_for_update()
+        .execution_options(populate_existing=True)
+    )
+    return result.scalar_one_or_none()
+
+
+def bump_version(session: ExerciseSession) -> None:
+    session.version += 1
+
+
+def add_participant(session: ExerciseSession, participant: Participant) -> None:
+    session.active_participants += 1
+    if participant.is_ready:
+        session.ready_participants += 1
+    bump_version(session)
+
+
+def set_participant_ready(session: ExerciseSession, participant: Participant, is_ready: bool) -> bool:
+    if participant.is_ready == is_ready:
+        return False
+    participant.is_ready = is_ready
+    session.ready_participants += 1 if is_ready else -1
+    bump_version(session)
+    return True
+
+
+def mark_participant_left(session: ExerciseSession, participant: Participant, *, now: datetime) -> None:
+    if participant.left_at is None:
+        session.active_participants -= 1
+        if participant.is_ready:
+            session.ready_participants -= 1
+        participant.left_at = now
+    if participant.token_revoked_at is None:
+        participant.token_revoked_at = now
+    participant.is_ready = False
+    bump_version(session)
+
+
+async def close_participants(db: AsyncSession, session: ExerciseSession, *, now: datetime) -> None:
+    # Ending a session is final: everyone still in it leaves and loses their token, so the
+    # session and its participant list never change afterwards.
+    await db.execute(
+        update(Participant)
+        .where(Participant.session_id == session.id)
+        .where(Participant.left_at.is_(None))
+        .values(
+            left_at=now,
+            token_revoked_at=func.coalesce(Participant.token_revoked_at, now),
+            is_ready=False,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    session.active_participants = 0
+    session.ready_participants = 0
+
+
+async def record_message(db: AsyncSession, session_id: uuid.UUID) -> bool:
+    # Single-statement increment; the status guard makes a concurrent end_session win.
+    result = await db.execute(
+        update(ExerciseSession)
+        .where(ExerciseSession.id == session_id)
+        .where(ExerciseSession.status == SessionStatus.running)
+        .values(message_count=ExerciseSession.message_count + 1)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
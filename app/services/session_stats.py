@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any
+
+from sqlalchemy import and_, func, literal_column, or_, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.settings import Settings, get_settings
+from app.db.models.exercise_session import ExerciseSession
+from app.db.models.message import Message
+from app.db.models.outbox_event import OutboxEvent
+from app.db.models.participant import Participant
+from app.ws.dispatcher import Event
+
+
+logger = logging.getLogger(__name__)
+
+# Message events can reach the aggregator twice (a cold load racing live events, or a
+# replay); remembering the most recent ids per session is enough to drop the duplicates.
+_RECENT_MESSAGE_IDS = 1024
+_RATE_WINDOWS_MINUTES = (1, 5, 15)
+
+
+def _minute(value: datetime) -> datetime:
+    return value.replace(second=0, microsecond=0)
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat() if value is not None else None
+
+
+@dataclass
+class _ParticipantStats:
+    display_name: str
+    is_ready: bool = False
+    left: bool = False
+    message_count: int = 0
+    first_submission_at: datetime | None = None
+
+
+class _SessionStats:
+    def __init__(self, *, started_at: datetime | None, ended: bool, window_minutes: int | None) -> None:
+        self.started_at = started_at
+        self.ended = ended
+        self.window_minutes = window_minutes
+        self.participants: dict[str, _ParticipantStats] = {}
+        self.total_messages = 0
+        self.minutes: dict[datetime, int] = {}
+        self.recent_ids: OrderedDict[str, None] = OrderedDict()
+        self.dirty = True
+
+    def add_messages(self, participant_id: str, minute: datetime, count: int, first_at: datetime) -> None:
+        participant = self.participants.get(participant_id)
+        if participant is not None:
+            participant.message_count += count
+            if participant.first_submission_at is None or first_at < participant.first_submission_at:
+                participant.first_submission_at = first_at
+        self.total_messages += count
+        self.minutes[minute] = self.minutes.get(minute, 0) + count
+        if self.window_minutes is not None:
+            oldest = max(self.minutes) - timedelta(minutes=self.window_minutes - 1)
+            for stale in [m for m in self.minutes if m < oldest]:
+                del self.minutes[stale]
+        self.dirty = True
+
+    def remember(self, message_id: str) -> bool:
+        if message_id in self.recent_ids:
+            return False
+        self.recent_ids[message_id] = None
+        while len(self.recent_ids) > _RECENT_MESSAGE_IDS:
+            self.recent_ids.popitem(last=False)
+        return True
+
+    def apply(self, event_type: str, data: dict[str, Any]) -> None:
+        if event_type == "message_submitted":
+            message = data["message"]
+            if self.remember(message["id"]):
+                created_at = datetime.fromisoformat(message["created_at"])
+                self.add_messages(message["participant_id"], _minute(created_at), 1, created_at)
+        elif event_type == "participant_joined":
+            participant = data["participant"]
+            self.participants.setdefault(
+                participant["id"],
+                _ParticipantStats(display_name=participant["display_name"], is_ready=participant["is_ready"]),
+            )
+            self.dirty = True
+        elif event_type == "participant_ready_changed":
+            participant = self.participants.get(data["participant"]["id"])
+            if participant is not None:
+                participant.is_ready = data["participant"]["is_ready"]
+                self.dirty = True
+        elif event_type == "participant_left":
+            participant = self.participants.get(data["participant"]["id"])
+            if participant is not None:
+                participant.left = True
+                participant.is_ready = False
+                self.dirty = True
+        elif event_type == "session_started":
+            started_at = data["session"]["started_at"]
+            self.started_at = datetime.fromisoformat(started_at) if started_at else None
+            self.dirty = True
+        elif event_type == "session_ended":
+            self.ended = True
+            self.dirty = True
+
+    def _seconds_since_start(self, value: datetime | None) -> float | None:
+        if value is None or self.started_at is None:
+            return None
+        return (value - self.started_at).total_seconds()
+
+    def snapshot(self, session_id: uuid.UUID, *, now: datetime) -> dict[str, Any]:
+        current = _minute(now)
+        rates = {}
+        for window in _RATE_WINDOWS_MINUTES:
+            since = current - timedelta(minutes=window - 1)
+            rates[f"last_{window}m"] = sum(c for m, c in self.minutes.items() if m >= since) / window
+
+        firsts = [p.first_submission_at for p in self.participants.values() if p.first_submission_at is not None]
+        return {
+            "session_id": str(session_id),
+            "started_at": _iso(self.started_at),
+            "total_messages": self.total_messages,
+            "seconds_to_first_submission": self._seconds_since_start(min(firsts) if firsts else None),
+            "submissions_per_minute": rates,
+            "timeline": [{"minute": _iso(m), "count": self.minutes[m]} for m in sorted(self.minutes)],
+            "participants": [
+                {
+                    "id": participant_id,
+                    "display_name": p.display_name,
+                    "is_ready": p.is_ready,
+                    "left": p.left,
+                    "message_count": p.message_count,
+                    "seconds_to_first_submission": self._seconds_since_start(p.first_submission_at),
+                }
+                for participant_id, p in self.participants.items()
+            ],
+        }
+
+
+class SessionStatsAggregator:
+    # Kept up to date by the event dispatcher (observe); a session is loaded from the database
+    # when an instructor socket connects or its stats are first read, after which it never
+    # needs the transcript again. Events for sessions that are not loaded are ignored.
+    def __init__(self, *, window_minutes: int = 60, max_sessions: int = 1000) -> None:
+        self._window_minutes = window_minutes
+        self._max_sessions = max_sessions
+        self._sessions: OrderedDict[str, _SessionStats] = OrderedDict()
+        self._loading: dict[str, list[Event]] = {}
+        self._loads: dict[str, asyncio.Event] = {}
+
+    def observe(self, event: Event) -> None:
+        key = str(event.session_id)
+        if key in self._loading:
+            self._loading[key].append(event)
+            return
+        stats = self._sessions.get(key)
+        if stats is not None:
+            stats.apply(event.event_type, event.data)
+
+    async def snapshot(self, db: AsyncSession, session: ExerciseSession) -> dict[str, Any]:
+        stats = await self._ensure_loaded(db, session)
+        return stats.snapshot(session.id, now=datetime.now(timezone.utc))
+
+    async def watch(self, db: AsyncSession, session: ExerciseSession) -> None:
+        # An instructor socket connected: follow the session from now on, and mark it dirty
+        # so the next broadcast gives the new socket the current stats.
+        stats = await self._ensure_loaded(db, session)
+        stats.dirty = True
+
+    async def _ensure_loaded(self, db: AsyncSession, session: ExerciseSession) -> _SessionStats:
+        key = str(session.id)
+        while key not in self._sessions:
+            loaded = self._loads.get(key)
+            if loaded is None:
+                # Only one load per session at a time: it owns the _loading buffer. Its result
+                # is returned as is, since the LRU may already have evicted it.
+                loaded = self._loads[key] = asyncio.Event()
+                try:
+                    return await self._load(db, session)
+                finally:
+                    del self._loads[key]
+                    loaded.set()
+            # Another task is loading it; check again once that load finishes or fails.
+            await loaded.wait()
+        self._sessions.move_to_end(key)
+        return self._sessions[key]
+
+    def take_dirty(self) -> list[tuple[str, dict[str, Any]]]:
+        now = datetime.now(timezone.utc)
+        changed = []
+        for key, stats in self._sessions.items():
+            if stats.dirty:
+                stats.dirty = False
+                changed.append((key, stats.snapshot(uuid.UUID(key), now=now)))
+        return changed
+
+    async def _load(self, db: AsyncSession, session: ExerciseSession) -> _SessionStats:
+        key = str(session.id)
+        self._loading[key] = []
+        try:
+            rows = await _aggregate_rows(db, session.id)
+        except BaseException:
+            self._loading.pop(key, None)
+            raise
+
+        stats = _SessionStats(
+            started_at=session.started_at,
+            ended=session.ended_at is not None,
+            window_minutes=self._window_minutes,
+        )
+        for row in rows:
+            participant_id = str(row.participant_id)
+            stats.participants.setdefault(
+                participant_id,
+                _ParticipantStats(display_name=row.display_name, is_ready=row.is_ready, left=row.left_at is not None),
+            )
+            if row.message_count:
+                stats.add_messages(participant_id, row.minute, row.message_count, row.first_at)
+            for message_id in row.recent_ids or ():
+                stats.remember(str(message_id))
+
+        for event in self._loading.pop(key):
+            stats.apply(event.event_type, event.data)
+
+        self._sessions[key] = stats
+        while len(self._sessions) > self._max_sessions:
+            self._sessions.popitem(last=False)
+        return stats
+
+
+async def _aggregate_rows(db: AsyncSession, session_id: uuid.UUID):
+    # One grouped pass over (participant, minute). Ids of messages whose event may still reach
+    # observe() come along so they are not counted twice: the newest ones (live events that
+    # raced this query) and any still pending in the outbox, which the relay can replay long
+    # after the message was written.
+    minute = func.date_trunc(literal_column("'minute'"), Message.created_at).label("minute")
+    pending_ids = select(
+        OutboxEvent.payload["message"]["id"].astext.cast(postgresql.UUID(as_uuid=True))
+    ).where(OutboxEvent.session_id == session_id, OutboxEvent.event_type == "message_submitted")
+    result = await db.execute(
+        select(
+            Participant.id.label("participant_id"),
+            Participant.display_name,
+            Participant.is_ready,
+            Participant.left_at,
+            minute,
+            func.count(Message.id).label("message_count"),
+            func.min(Message.created_at).label("first_at"),
+            func.array_agg(Message.id)
+            .filter(
+                or_(Message.created_at > func.now() - text("interval '1 minute'"), Message.id.in_(pending_ids))
+            )
+            .label("recent_ids"),
+        )
+        .select_from(Participant)
+        .outerjoin(Message, and_(Message.participant_id == Participant.id, Message.session_id == session_id))
+        .where(Participant.session_id == session_id)
+        .group_by(Participant.id, minute)
+        .order_by(Participant.joined_at.asc(), minute.asc())
+    )
+    return result.all()
+
+
+def build_archived_stats(archive: dict[str, Any], *, now: datetime) -> dict[str, Any]:
+    session = archive["session"]
+    started_at = session["started_at"]
+    stats = _SessionStats(
+        started_at=datetime.fromisoformat(started_at) if started_at else None,
+        ended=True,
+        window_minutes=None,
+    )
+    for p in archive["participants"]:
+        stats.participants[p["id"]] = _ParticipantStats(
+            display_name=p["display_name"], is_ready=p["is_ready"], left=p["left_at"] is not None
+        )
+    for m in archive["messages"]:
+        created_at = datetime.fromisoformat(m["created_at"])
+        stats.add_messages(m["participant_id"], _minute(created_at), 1, created_at)
+    return stats.snapshot(uuid.UUID(session["id"]), now=now)
+
+
+async def run_stats_broadcaster(stats: SessionStatsAggregator, ws: Any, settings: Settings) -> None:
+    while True:
+        await asyncio.sleep(settings.stats_broadcast_interval_seconds)
+        for session_id, snapshot in stats.take_dirty():
+            try:
+                await ws.broadcast_to_instructors(session_id=session_id, event_type="stats", data=snapshot)
+            except Exception:
+                logger.exception("Stats broadcast for session %s failed", session_id)
+
+
+@lru_cache
+def get_session_stats() -> SessionStatsAggregator:
+    settings = get_settings()
+    return SessionStatsAggregator(
+        window_minutes=settings.stats_window_minutes, max_sessions=settings.stats_max_sessions
+    )
@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+import uuid
+from collections import OrderedDict
+from functools import lru_cache
+
+
+class SessionVersionCache:
+    # Only ended sessions are cached: ending closes out every participant and nothing writes
+    # to an ended session afterwards (see close_participants), so the entry stays correct
+    # across workers without any invalidation.
+    def __init__(self, max_entries: int = 10_000) -> None:
+        self._max_entries = max_entries
+        self._entries: OrderedDict[uuid.UUID, tuple[uuid.UUID, int]] = OrderedDict()
+
+    def get(self, session_id: uuid.UUID, *, instructor_id: uuid.UUID) -> int | None:
+        entry = self._entries.get(session_id)
+        if entry is None or entry[0] != instructor_id:
+            return None
+        self._entries.move_to_end(session_id)
+        return entry[1]
+
+    def put_final(self, session_id: uuid.UUID, *, instructor_id: uuid.UUID, version: int) -> None:
+        self._entries[session_id] = (instructor_id, version)
+        self._entries.move_to_end(session_id)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+
+
+@lru_cache
+def get_session_version_cache() -> SessionVersionCache:
+    return SessionVersionCache()
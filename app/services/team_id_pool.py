@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Iterable
+
+import sqlalchemy as sa
+from sqlalchemy import delete, exists, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.settings import Settings
+from app.db.models.exercise_session import ExerciseSession
+from app.db.models.team_id_pool import TeamIdPoolEntry
+from app.services import team_id
+
+
+logger = logging.getLogger(__name__)
+
+
+async def allocate_team_id(db: AsyncSession) -> str | None:
+    # Claims one pooled ID inside the caller's transaction; a rollback returns it.
+    picked = (
+        select(TeamIdPoolEntry.team_id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        delete(TeamIdPoolEntry)
+        .where(TeamIdPoolEntry.team_id == picked)
+        .returning(TeamIdPoolEntry.team_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def discard_team_id(db: AsyncSession, value: str) -> None:
+    await db.execute(delete(TeamIdPoolEntry).where(TeamIdPoolEntry.team_id == value))
+
+
+async def release_team_ids(db: AsyncSession, values: Iterable[str]) -> None:
+    # Only for IDs whose sessions are gone (e.g. archived); joins the caller's transaction.
+    rows = [{"team_id": value} for value in values]
+    if rows:
+        await db.execute(postgresql.insert(TeamIdPoolEntry).values(rows).on_conflict_do_nothing())
+
+
+async def refill_team_id_pool(sessionmaker: async_sessionmaker[AsyncSession], *, target_size: int) -> int:
+    async with sessionmaker() as db:
+        current = (await db.execute(select(func.count()).select_from(TeamIdPoolEntry))).scalar_one()
+        missing = target_size - current
+        if missing <= 0:
+            return 0
+
+        candidates = {team_id.generate_team_id() for _ in range(missing)}
+        candidate = (
+            func.unnest(sa.cast(sorted(candidates), postgresql.ARRAY(sa.String(6))))
+            .column_valued("candidate")
+        )
+        result = await db.execute(
+            postgresql.insert(TeamIdPoolEntry)
+            .from_select(
+                ["team_id"],
+                select(candidate).where(~exists().where(ExerciseSession.team_id == candidate)),
+            )
+            .on_conflict_do_nothing()
+        )
+        await db.commit()
+        return result.rowcount
+
+
+async def run_team_id_pool_refiller(sessionmaker: async_sessionmaker[AsyncSession], settings: Settings) -> None:
+    while True:
+        try:
+            await refill_team_id_pool(sessionmaker, target_size=settings.team_id_pool_size)
+        except Exception:
+            logger.exception("Team ID pool refill failed")
+        await asyncio.sleep(settings.team_id_pool_refill_interval_seconds)
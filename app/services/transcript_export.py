@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from datetime import datetime
+from typing import Any, Literal
+
+from pydantic_core import to_json
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+ExportFormat = Literal["csv", "ndjson"]
+
+EXPORT_COLUMNS = ("id", "participant_id", "display_name", "content", "created_at")
+
+EXPORT_MEDIA_TYPES: dict[str, str] = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+# created_at rendered like the JSON API (pydantic): UTC with a "Z", and the fraction only
+# when there is one. Relies on the session time zone being UTC.
+_CREATED_AT = """(
+    to_char(m.created_at, 'YYYY-MM-DD"T"HH24:MI:SS')
+    || CASE WHEN date_part('microseconds', m.created_at)::bigint % 1000000 = 0
+            THEN '' ELSE to_char(m.created_at, '.US') END
+    || 'Z'
+)"""
+
+_CSV_QUERY = f"""
+SELECT m.id, m.participant_id, p.display_name, m.content, {_CREATED_AT} AS created_at
+FROM messages m
+JOIN participants p ON p.id = m.participant_id
+WHERE m.session_id = $1
+ORDER BY m.created_at, m.id
+"""
+
+_NDJSON_QUERY = f"""
+SELECT json_build_object(
+    'id', m.id,
+    'participant_id', m.participant_id,
+    'display_name', p.display_name,
+    'content', m.content,
+    'created_at', {_CREATED_AT}
+)::text
+FROM messages m
+JOIN participants p ON p.id = m.participant_id
+WHERE m.session_id = $1
+ORDER BY m.created_at, m.id
+"""
+
+# Chunks buffered between COPY and the HTTP response; bounds memory per export.
+_MAX_PENDING_CHUNKS = 16
+
+
+async def stream_session_transcript(
+    db: AsyncSession, *, session_id, export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    if export_format == "csv":
+        query = _CSV_QUERY
+        copy_options: dict[str, Any] = {"format": "csv", "header": True}
+    else:
+        # A single JSON column written as CSV with control-character quote/delimiter
+        # comes out verbatim: json_build_object never emits raw control characters,
+        # so nothing is quoted or escaped the way COPY's text format would.
+        query = _NDJSON_QUERY
+        copy_options = {"format": "csv", "quote": "\x01", "delimiter": "\x02"}
+
+    conn = await db.connection()
+    # _CREATED_AT formats in the session time zone.
+    await conn.exec_driver_sql("SET LOCAL TIME ZONE 'UTC'")
+    raw = await conn.get_raw_connection()
+    driver = raw.driver_connection
+
+    chunks: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=_MAX_PENDING_CHUNKS)
+
+    async def _sink(chunk: bytearray) -> None:
+        await chunks.put(bytes(chunk))
+
+    async def _copy() -> None:
+        try:
+            await driver.copy_from_query(
+                query, session_id, output=_sink, **copy_options
+            )
+        finally:
+            await chunks.put(None)
+
+    task = asyncio.create_task(_copy())
+    try:
+        while (chunk := await chunks.get()) is not None:
+            yield chunk
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await task
+
+
+def _api_timestamp(value: str) -> str:
+    # Archives store isoformat() ("+00:00"); exports use the JSON API's form.
+    return to_json(datetime.fromisoformat(value)).decode()[1:-1]
+
+
+async def stream_archived_transcript(
+    archive: dict[str, Any], *, export_format: ExportFormat
+) -> AsyncIterator[bytes]:
+    display_names = {p["id"]: p["display_name"] for p in archive["participants"]}
+
+    if export_format == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        writer.writerow(EXPORT_COLUMNS)
+        for m in archive["messages"]:
+            writer.writerow(
+                (
+                    m["id"],
+                    m["participant_id"],
+                    display_names[m["participant_id"]],
+                    m["content"],
+                    _api_timestamp(m["created_at"]),
+                )
+            )
+            if buffer.tell() >= 64 * 1024:
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode("utf-8")
+        return
+
+    for m in archive["messages"]:
+        row = {
+            **m,
+            "display_name": display_names[m["participant_id"]],
+            "created_at": _api_timestamp(m["created_at"]),
+        }
+        yield (json.dumps({k: row[k] for k in EXPORT_COLUMNS}) + "\n").encode("utf-8")
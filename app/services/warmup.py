@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.db.models.exercise_session import ExerciseSession
+from app.db.models.instructor import Instructor
+from app.db.models.participant import Participant
+from app.services.session_state import lock_session, lock_session_by_team_id, record_message
+
+
+logger = logging.getLogger(__name__)
+
+_NO_ID = uuid.UUID(int=0)
+
+
+async def _prepare_hot_statements(db: AsyncSession) -> None:
+    # The same statements the auth dependencies and the join/message paths issue, so their
+    # SQL text matches and later requests hit asyncpg's per-connection prepared statement
+    # cache. None of them match a row, and the session is closed (rolled back) afterwards.
+    await db.execute(select(Instructor).where(Instructor.id == _NO_ID))
+    await db.execute(select(Participant).where(Participant.token_hash == b""))
+    await db.execute(select(ExerciseSession).where(ExerciseSession.id == _NO_ID))
+    await lock_session(db, _NO_ID)
+    await lock_session_by_team_id(db, "")
+    await record_message(db, _NO_ID)
+
+
+async def warm_pool(sessionmaker: async_sessionmaker[AsyncSession], *, connections: int) -> None:
+    # Every session keeps its transaction (and so its connection) open until all of them
+    # have run, so each one warms a distinct pooled connection.
+    prepared = 0
+    all_prepared = asyncio.Event()
+
+    async def warm_one() -> None:
+        nonlocal prepared
+        async with sessionmaker() as db:
+            await _prepare_hot_statements(db)
+            prepared += 1
+            if prepared == connections:
+                all_prepared.set()
+            await all_prepared.wait()
+
+    tasks = [asyncio.create_task(warm_one()) for _ in range(connections)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def run_pool_warmup(sessionmaker: async_sessionmaker[AsyncSession], *, connections: int, state) -> None:
+    # Retries until the database answers; /readyz stays 503 until then.
+    delay = 0.5
+    while True:
+        try:
+            await warm_pool(sessionmaker, connections=connections)
+        except Exception:
+            logger.exception("Connection pool warm-up failed; retrying in %.1fs", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30.0)
+        else:
+            state.pool_warmed = True
+            return
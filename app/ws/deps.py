@@ -2,9 +2,17 @@ from __future__ import annotations
 
 from functools import lru_cache
 
+from app.core.settings import get_settings
+from app.ws.dispatcher import EventDispatcher
 from app.ws.manager import WsManager
 
 
 @lru_cache
 def get_ws_manager() -> WsManager:
     return WsManager()
+
+
+@lru_cache
+def get_event_dispatcher() -> EventDispatcher:
+    settings = get_settings()
+    return EventDispatcher(shards=settings.event_dispatcher_shards, max_queue_size=settings.event_queue_max_size)
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from app.core import tracing
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Event:
+    ws: Any
+    session_id: Any
+    event_type: str
+    data: dict[str, Any]
+    outbox_id: int | None = None
+    # Span of the request that published the event, so delivery joins its trace.
+    trace: Any = None
+
+
+class EventDispatcher:
+    # Post-commit fan-out off the request path. Events of one session always land on the
+    # same shard, and each shard has a single worker, so per-session order is preserved.
+    def __init__(self, *, shards: int = 4, max_queue_size: int = 10_000) -> None:
+        self._shards = shards
+        self._max_queue_size = max_queue_size
+        self._queues: list[asyncio.Queue[Event]] = []
+        self._workers: list[asyncio.Task] = []
+        self._published = 0
+        self._delivered = 0
+        self._failed = 0
+        self._max_depth = 0
+        self._acknowledged: list[int] = []
+        self._in_flight: set[int] = set()
+        self._listeners: list[Callable[[Event], None]] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        # Queues are created here so a restarted dispatcher binds to the current loop.
+        self._queues = [asyncio.Queue(maxsize=self._max_queue_size) for _ in range(self._shards)]
+        self._workers = [asyncio.create_task(self._run(queue)) for queue in self._queues]
+
+    async def stop(self, *, timeout: float = 5.0) -> None:
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self.drain(), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping %d undelivered events on shutdown", self.queue_depth)
+        for worker in self._workers:
+            worker.cancel()
+        for worker in self._workers:
+            with contextlib.suppress(asyncio.CancelledError):
+                await worker
+        self._workers = []
+        self._queues = []
+
+    async def publish(
+        self,
+        ws: Any,
+        *,
+        session_id: Any,
+        event_type: str,
+        data: dict[str, Any],
+        outbox_id: int | None = None,
+    ) -> None:
+        event = Event(
+            ws=ws,
+            session_id=session_id,
+            event_type=event_type,
+            data=data,
+            outbox_id=outbox_id,
+            trace=tracing.current_span(),
+        )
+        self._published += 1
+        if outbox_id is not None:
+            self._in_flight.add(outbox_id)
+        if not self.running:
+            # Outside the app lifespan (scripts, one-off tools) deliver inline.
+            await self._deliver(event)
+            return
+        queue = self._queues[hash(str(session_id)) % self._shards]
+        # Only blocks when the shard is full, which pushes back on the producer.
+        await queue.put(event)
+        self._max_depth = max(self._max_depth, queue.qsize())
+
+    async def drain(self) -> None:
+        for queue in list(self._queues):
+            await queue.join()
+
+    def add_listener(self, listener: Callable[[Event], None]) -> None:
+        # Listeners see every event once, in per-session order, before it is broadcast.
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[Event], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def take_acknowledged(self) -> list[int]:
+        # Outbox ids delivered since the last call; the outbox relay deletes them in batches.
+        acknowledged, self._acknowledged = self._acknowledged, []
+        return acknowledged
+
+    def unsettled_outbox_ids(self) -> set[int]:
+        # Outbox ids queued, being delivered, or delivered but not yet deleted; the relay
+        # must not replay these.
+        return self._in_flight | set(self._acknowledged)
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(queue.qsize() for queue in self._queues)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self._max_depth,
+            "published": self._published,
+            "delivered": self._delivered,
+            "failed": self._failed,
+        }
+
+    async def _run(self, queue: asyncio.Queue[Event]) -> None:
+        while True:
+            event = await queue.get()
+            try:
+                await self._deliver(event)
+            finally:
+                queue.task_done()
+
+    async def _deliver(self, event: Event) -> None:
+        with tracing.span(
+            "event.deliver",
+            parent=event.trace,
+            attributes={"event.type": event.event_type, "session.id": str(event.session_id)},
+        ):
+            for listener in self._listeners:
+                try:
+                    listener(event)
+                except Exception:
+                    logger.exception("Event listener failed for %s", event.event_type)
+            try:
+                await event.ws.broadcast(session_id=event.session_id, event_type=event.event_type, data=event.data)
+            except Exception:
+                self._failed += 1
+                logger.exception("Broadcast of %s for session %s failed", event.event_type, event.session_id)
+            else:
+                self._delivered += 1
+                if event.outbox_id is not None:
+                    self._acknowledged.append(event.outbox_id)
+            finally:
+                self._in_flight.discard(event.outbox_id)
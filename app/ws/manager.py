@@ -1,11 +1,15 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from collections import defaultdict
 from typing import Any
 
 from fastapi import WebSocket
 
+from app.core import tracing
+from app.core.metrics import WS_BROADCAST_DURATION, WS_SEND_FAILURES
+
 
 class WsManager:
     def __init__(self) -> None:
@@ -17,6 +21,12 @@ class WsManager:
     def _key(session_id) -> str:
         return str(session_id)
 
+    def connection_counts(self) -> dict[str, int]:
+        return {
+            "instructor": sum(len(c) for c in self._instructor_connections.values()),
+            "participant": sum(len(c) for c in self._participant_connections.values()),
+        }
+
     async def connect_instructor(self, session_id, websocket: WebSocket) -> None:
         await websocket.accept()
         async with self._lock:
@@ -38,6 +48,13 @@ class WsManager:
             if not self._participant_connections[key] and key in self._participant_connections:
                 self._participant_connections.pop(key, None)
 
+    async def broadcast_to_instructors(self, *, session_id, event_type: str, data: dict[str, Any]) -> None:
+        key = self._key(session_id)
+        async with self._lock:
+            targets = list(self._instructor_connections.get(key, set()))
+
+        await self._send_all(targets, event_type, data)
+
     async def broadcast(self, *, session_id, event_type: str, data: dict[str, Any]) -> None:
         key = self._key(session_id)
         async with self._lock:
@@ -45,13 +62,32 @@ class WsManager:
                 self._participant_connections.get(key, set())
             )
 
+        await self._send_all(targets, event_type, data)
+
+    async def _send_all(self, targets: list[WebSocket], event_type: str, data: dict[str, Any]) -> None:
         if not targets:
             return
 
         payload = {"type": event_type, "data": data}
-        for ws in targets:
-            try:
-                await ws.send_json(payload)
-            except Exception:
-                # Best-effort; stale sockets will be cleaned up on disconnect.
-                pass
+        start = time.perf_counter()
+        if tracing.enabled():
+            await self._send_all_traced(targets, event_type, payload)
+        else:
+            for ws in targets:
+                try:
+                    await ws.send_json(payload)
+                except Exception:
+                    # Best-effort; stale sockets will be cleaned up on disconnect.
+                    WS_SEND_FAILURES.inc(event_type)
+        WS_BROADCAST_DURATION.observe(time.perf_counter() - start, event_type)
+
+    async def _send_all_traced(self, targets: list[WebSocket], event_type: str, payload: dict[str, Any]) -> None:
+        with tracing.span("ws.broadcast", attributes={"event.type": event_type, "ws.targets": len(targets)}):
+            for ws in targets:
+                with tracing.span("ws.send") as send_span:
+                    try:
+                        await ws.send_json(payload)
+                    except Exception:
+                        WS_SEND_FAILURES.inc(event_type)
+                        if send_span is not None:
+                            send_span.error = True
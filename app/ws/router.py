@@ -6,16 +6,19 @@ from datetime import datetime, timezone
 
 from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
 from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
 from app.core.security import decode_access_token
 from app.core.settings import Settings, get_settings
-from app.db.deps import get_db_session
+from app.db.deps import get_sessionmaker
 from app.db.models.exercise_session import ExerciseSession, SessionStatus
 from app.db.models.instructor import Instructor
 from app.db.models.participant import Participant
 from app.services.participant_tokens import hash_participant_token
-from app.ws.deps import get_ws_manager
+from app.services.presence import PresenceTracker, get_presence_tracker
+from app.services.session_stats import SessionStatsAggregator, get_session_stats
+from app.ws.deps import get_event_dispatcher, get_ws_manager
+from app.ws.dispatcher import EventDispatcher
 from app.ws.manager import WsManager
 
 
@@ -29,9 +32,10 @@ async def ws_instructor(
     websocket: WebSocket,
     session_id: uuid.UUID,
     access_token: str | None = Query(default=None),
-    db: AsyncSession = Depends(get_db_session),
+    sessionmaker: async_sessionmaker[AsyncSession] = Depends(get_sessionmaker),
     settings: Settings = Depends(get_settings),
     ws: WsManager = Depends(get_ws_manager),
+    stats: SessionStatsAggregator = Depends(get_session_stats),
 ):
     auth_header = websocket.headers.get("authorization")
     token = None
@@ -50,18 +54,22 @@ async def ws_instructor(
         await websocket.close(code=1008)
         return
 
-    instructor_result = await db.execute(select(Instructor).where(Instructor.id == instructor_id))
-    instructor = instructor_result.scalar_one_or_none()
-    if instructor is None:
-        await websocket.close(code=1008)
-        return
-
-    session_result = await db.execute(
-        select(ExerciseSession)
-        .where(ExerciseSession.id == session_id)
-        .where(ExerciseSession.instructor_id == instructor.id)
-    )
-    session = session_result.scalar_one_or_none()
+    # A short-lived DB session: sockets stay open for the whole exercise and must not pin a
+    # pooled connection each.
+    async with sessionmaker() as db:
+        instructor_result = await db.execute(select(Instructor).where(Instructor.id == instructor_id))
+        instructor = instructor_result.scalar_one_or_none()
+        session = None
+        if instructor is not None:
+            session_result = await db.execute(
+                select(ExerciseSession)
+                .where(ExerciseSession.id == session_id)
+                .where(ExerciseSession.instructor_id == instructor.id)
+            )
+            session = session_result.scalar_one_or_none()
+        if session is not None and session.status != SessionStatus.ended:
+            # Live stats frames are only pushed for sessions the aggregator follows.
+            await stats.watch(db, session)
     if session is None:
         await websocket.close(code=1008)
         return
@@ -80,9 +88,11 @@ async def ws_participant(
     websocket: WebSocket,
     team_id: str,
     token: str | None = Query(default=None),
-    db: AsyncSession = Depends(get_db_session),
+    sessionmaker: async_sessionmaker[AsyncSession] = Depends(get_sessionmaker),
     settings: Settings = Depends(get_settings),
     ws: WsManager = Depends(get_ws_manager),
+    events: EventDispatcher = Depends(get_event_dispatcher),
+    presence: PresenceTracker = Depends(get_presence_tracker),
 ):
     normalized_team_id = team_id.strip().upper()
     if not _TEAM_ID_RE.match(normalized_team_id):
@@ -94,63 +104,57 @@ async def ws_participant(
         await websocket.close(code=1008)
         return
 
-    session_result = await db.execute(
-        select(ExerciseSession).where(ExerciseSession.team_id == normalized_team_id)
-    )
-    session = session_result.scalar_one_or_none()
-    if session is None:
-        await websocket.close(code=1008)
-        return
-
-    if session.status == SessionStatus.ended:
-        await websocket.close(code=1008)
-        return
-
     token_hash = hash_participant_token(token=token, pepper=settings.participant_token_pepper)
-    participant_result = await db.execute(
-        select(Participant)
-        .where(Participant.session_id == session.id)
-        .where(Participant.token_hash == token_hash)
-        .where(Participant.token_revoked_at.is_(None))
-        .where(Participant.left_at.is_(None))
-    )
-    participant = participant_result.scalar_one_or_none()
+    async with sessionmaker() as db:
+        session_result = await db.execute(
+            select(ExerciseSession).where(ExerciseSession.team_id == normalized_team_id)
+        )
+        session = session_result.scalar_one_or_none()
+        participant = None
+        if session is not None and session.status != SessionStatus.ended:
+            participant_result = await db.execute(
+                select(Participant)
+                .where(Participant.session_id == session.id)
+                .where(Participant.token_hash == token_hash)
+                .where(Participant.token_revoked_at.is_(None))
+                .where(Participant.left_at.is_(None))
+            )
+            participant = participant_result.scalar_one_or_none()
     if participant is None:
         await websocket.close(code=1008)
         return
 
     await ws.connect_participant(session.id, websocket)
+    if presence.connected(participant.id):
+        await events.publish(
+            ws,
+            session_id=session.id,
+            event_type="participant_reconnected",
+            data={"participant": {"id": str(participant.id), "display_name": participant.display_name}},
+        )
+
     try:
         while True:
             await websocket.receive_text()
     except WebSocketDisconnect:
         await ws.disconnect(session.id, websocket)
 
-        # Best-effort presence update: mark participant as left.
+        # The participant is only marked left if they do not reconnect within the grace window.
         now = datetime.now(timezone.utc)
-        try:
-            if participant.left_at is None:
-                participant.left_at = now
-            if participant.token_revoked_at is None:
-                participant.token_revoked_at = now
-            participant.is_ready = False
-            await db.commit()
-        except Exception:
-            try:
-                await db.rollback()
-            except Exception:
-                pass
+        if not presence.disconnected(session_id=session.id, participant_id=participant.id, now=now):
             return
 
         try:
-            await ws.broadcast(
+            await events.publish(
+                ws,
                 session_id=session.id,
-                event_type="participant_left",
+                event_type="participant_disconnected",
                 data={
                     "participant": {
                         "id": str(participant.id),
                         "display_name": participant.display_name,
-                        "left_at": now.isoformat(),
+                        "disconnected_at": now.isoformat(),
+                        "grace_seconds": presence.grace.total_seconds(),
                     }
                 },
             )
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import uuid
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.services.team_id import generate_team_id
+
+
+async def seed_session(
+    engine: AsyncEngine, *, messages: int, participants: int = 10, status: str = "ended"
+) -> tuple[uuid.UUID, uuid.UUID]:
+    instructor_id = uuid.uuid4()
+    session_id = uuid.uuid4()
+    participant_ids = [uuid.uuid4() for _ in range(participants)]
+
+    async with engine.begin() as conn:
+        await conn.execute(
+            text("INSERT INTO instructors (id, username, password_hash) VALUES (:id, :username, 'x')"),
+            {"id": instructor_id, "username": f"bench-{instructor_id}"},
+        )
+        await conn.execute(
+            text(
+                "INSERT INTO exercise_sessions (id, instructor_id, team_id, status, started_at) "
+                "VALUES (:id, :instructor_id, :team_id, CAST(:status AS session_status), now())"
+            ),
+            {"id": session_id, "instructor_id": instructor_id, "team_id": generate_team_id(), "status": status},
+        )
+        for i, participant_id in enumerate(participant_ids):
+            await conn.execute(
+                text(
+                    "INSERT INTO participants (id, session_id, display_name, token_hash) "
+                    "VALUES (:id, :session_id, :name, decode(md5(random()::text) || md5(random()::text), 'hex'))"
+                ),
+                {"id": participant_id, "session_id": session_id, "name": f"participant-{i}"},
+            )
+        await conn.execute(
+            text(
+                "INSERT INTO messages (id, session_id, participant_id, content, created_at) "
+                "SELECT gen_random_uuid(), :session_id, (CAST(:participant_ids AS uuid[]))[1 + g % :n], "
+                "'observed traffic to host-' || g || '.corp.local matching CVE-2024-' || (g % 9000 + 1000), "
+                "now() - interval '1 day' + g * interval '1 millisecond' "
+                "FROM generate_series(1, :messages) AS g"
+            ),
+            {
+                "session_id": session_id,
+                "participant_ids": participant_ids,
+                "n": participants,
+                "messages": messages,
+            },
+        )
+        await conn.execute(text("ANALYZE messages"))
+
+    return instructor_id, session_id
+
+
+async def drop_instructor(engine: AsyncEngine, instructor_id: uuid.UUID) -> None:
+    async with engine.begin() as conn:
+        await conn.execute(text("DELETE FROM instructors WHERE id = :id"), {"id": instructor_id})
+
+
+async def seed_instructors(engine: AsyncEngine, *, count: int) -> list[uuid.UUID]:
+    instructor_ids = [uuid.uuid4() for _ in range(count)]
+    async with engine.begin() as conn:
+        await conn.execute(
+            text(
+                "INSERT INTO instructors (id, username, password_hash) "
+                "SELECT id, 'bench-' || id, 'x' FROM unnest(CAST(:ids AS uuid[])) AS id"
+            ),
+            {"ids": instructor_ids},
+        )
+    return instructor_ids
@@ -0,0 +1,106 @@
+"""Export a large session's transcript through GET /sessions/{id}/export.
+
+Seeds one session with --messages rows into DATABASE_URL (use a scratch database),
+streams the export in-process and reports throughput and peak RSS growth.
+
+    uv run python -m benchmarks.bench_export --messages 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import resource
+import time
+
+from app.core.security import create_access_token
+from app.core.settings import get_settings
+from app.db.deps import get_engine
+from app.main import create_app
+from benchmarks._seed import drop_instructor, seed_session
+
+
+def _max_rss_mib() -> float:
+    # ru_maxrss is KiB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def _export(app, path: str, query: str, token: str) -> tuple[int, int, float]:
+    # Drive the ASGI app directly: httpx's ASGITransport buffers the whole body,
+    # which would hide whether the endpoint itself streams in constant memory.
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "headers": [(b"host", b"bench"), (b"authorization", f"Bearer {token}".encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    disconnected = asyncio.Event()
+    totals = {"status": 0, "bytes": 0, "lines": 0}
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            totals["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            body = message.get("body", b"")
+            totals["bytes"] += len(body)
+            totals["lines"] += body.count(b"\n")
+
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    elapsed = time.perf_counter() - started
+    disconnected.set()
+    if totals["status"] != 200:
+        raise RuntimeError(f"export failed with status {totals['status']}")
+    return totals["bytes"], totals["lines"], elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    engine = get_engine()
+
+    started = time.perf_counter()
+    instructor_id, session_id = await seed_session(engine, messages=args.messages)
+    print(f"seeded {args.messages} messages in {time.perf_counter() - started:.1f}s")
+
+    token = create_access_token(settings, instructor_id=str(instructor_id))
+
+    app = create_app()
+    try:
+        for export_format in ("csv", "ndjson"):
+            rss_before = _max_rss_mib()
+            total_bytes, lines, elapsed = await _export(
+                app, f"/sessions/{session_id}/export", f"format={export_format}", token
+            )
+            print(
+                f"{export_format:>6}: {lines} lines, {total_bytes / 2**20:.1f} MiB in {elapsed:.2f}s "
+                f"({lines / elapsed:,.0f} rows/s), peak RSS +{_max_rss_mib() - rss_before:.1f} MiB"
+            )
+    finally:
+        if not args.keep:
+            await drop_instructor(engine, instructor_id)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,85 @@
+"""Measure the cold import of app.main with `python -X importtime`.
+
+Imports the app --runs times, each in a fresh interpreter, and reports the median
+cumulative time of `app.main`, the heaviest top-level packages it pulls in, and which of
+the lazily imported dependencies were loaded anyway. Exits 1 when the median is above
+--target-ms, so it can gate CI on a fixed runner.
+
+    uv run python -m benchmarks.bench_import_time --runs 15 --target-ms 1100
+
+`app.main` builds the app on import, so DATABASE_URL, JWT_SECRET and
+PARTICIPANT_TOKEN_PEPPER must be resolvable (e.g. from .env).
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+
+# Dependencies that must only load on first use, not when the app is imported.
+LAZY_MODULES = ("jose", "cryptography", "bcrypt", "websockets")
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def import_profile() -> tuple[int, dict[str, int], set[str]]:
+    # (app.main cumulative us, cumulative us per top-level package, modules loaded)
+    code = "import app.main"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True
+    )
+    total = 0
+    packages: dict[str, int] = defaultdict(int)
+    loaded = set()
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, module = match.groups()
+        loaded.add(module)
+        if module == "app.main":
+            total = int(cumulative_us)
+        # Attribute each module's own time to its top-level package.
+        packages[module.split(".")[0]] += int(self_us)
+    return total, packages, loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=11)
+    parser.add_argument("--top", type=int, default=12)
+    parser.add_argument("--target-ms", type=float, help="fail when the median exceeds this")
+    args = parser.parse_args()
+
+    totals = []
+    per_package: dict[str, list[int]] = defaultdict(list)
+    loaded: set[str] = set()
+    for _ in range(args.runs):
+        total, packages, modules = import_profile()
+        totals.append(total)
+        for package, us in packages.items():
+            per_package[package].append(us)
+        loaded |= modules
+
+    median_ms = statistics.median(totals) / 1000
+    print(f"import app.main: median {median_ms:.0f} ms, min {min(totals) / 1000:.0f} ms over {args.runs} runs\n")
+    print(f"{'package':<24}{'median self ms':>16}")
+    ranked = sorted(per_package.items(), key=lambda item: statistics.median(item[1]), reverse=True)
+    for package, samples in ranked[: args.top]:
+        print(f"{package:<24}{statistics.median(samples) / 1000:>16.1f}")
+
+    eager = [m for m in LAZY_MODULES if m in loaded]
+    print(f"\nlazy dependencies loaded at import: {', '.join(eager) or 'none'}")
+
+    if args.target_ms is not None and median_ms > args.target_ms:
+        print(f"FAIL: median {median_ms:.0f} ms is above the {args.target_ms:.0f} ms target")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Time GET /sessions/{id}/messages/search against a large seeded transcript.
+
+Seeds one session with --messages rows into DATABASE_URL (use a scratch database), then
+runs rare, medium and very common queries through the endpoint and prints latency and the
+query plan of the first page, to confirm the GIN index on messages.search_vector is used.
+
+    uv run python -m benchmarks.bench_message_search --messages 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from sqlalchemy import text
+
+from app.core.security import create_access_token
+from app.core.settings import get_settings
+from app.db.deps import get_engine
+from app.main import create_app
+from benchmarks._seed import drop_instructor, seed_session
+
+
+QUERIES = {
+    "rare (1 hit)": "host-4242.corp.local",
+    "medium (~1/9000)": "CVE-2024-1234",
+    "common (every row)": "traffic",
+}
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    engine = get_engine()
+
+    started = time.perf_counter()
+    instructor_id, session_id = await seed_session(engine, messages=args.messages)
+    print(f"seeded {args.messages} messages in {time.perf_counter() - started:.1f}s")
+    token = create_access_token(settings, instructor_id=str(instructor_id))
+
+    try:
+        async with engine.connect() as conn:
+            plan = await conn.execute(
+                text(
+                    "EXPLAIN (ANALYZE, COSTS OFF) SELECT id FROM messages "
+                    "WHERE session_id = :session_id "
+                    "AND search_vector @@ websearch_to_tsquery('simple', :q) "
+                    "ORDER BY ts_rank(search_vector, websearch_to_tsquery('simple', :q)) DESC, id DESC LIMIT 21"
+                ),
+                {"session_id": session_id, "q": QUERIES["medium (~1/9000)"]},
+            )
+            print("\n".join(row[0] for row in plan))
+
+        app = create_app()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            headers = {"Authorization": f"Bearer {token}"}
+            for label, q in QUERIES.items():
+                samples = []
+                hits = 0
+                for _ in range(args.repeat):
+                    t0 = time.perf_counter()
+                    res = await client.get(
+                        f"/sessions/{session_id}/messages/search", headers=headers, params={"q": q}
+                    )
+                    samples.append(time.perf_counter() - t0)
+                    res.raise_for_status()
+                    hits = len(res.json()["results"])
+                print(
+                    f"{label:>20}: median {statistics.median(samples) * 1000:8.1f} ms  "
+                    f"min {min(samples) * 1000:8.1f} ms  ({hits} results on first page)"
+                )
+    finally:
+        if not args.keep:
+            await drop_instructor(engine, instructor_id)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
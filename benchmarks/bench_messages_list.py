@@ -0,0 +1,124 @@
+"""Compare the fast JSON path of GET /sessions/{id}/messages with the response_model path.
+
+Seeds one running session with --messages rows into DATABASE_URL (use a scratch database),
+then times, for the same rows:
+
+- encode only: building Pydantic models and letting FastAPI validate/serialize them again
+  versus encoding plain dicts straight from the row tuples;
+- the endpoint end to end through the ASGI app.
+
+    uv run python -m benchmarks.bench_messages_list --messages 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+import httpx
+from pydantic import TypeAdapter
+from pydantic_core import to_json
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.sessions import MessageResponse, MessagesListResponse
+from app.core.security import create_access_token
+from app.core.settings import get_settings
+from app.db.deps import get_engine
+from app.db.models.message import Message
+from app.db.models.participant import Participant
+from app.main import create_app
+from benchmarks._seed import drop_instructor, seed_session
+
+
+_FIELDS = tuple(MessageResponse.model_fields)
+
+
+def _model_path(session_id, rows) -> bytes:
+    # What a response_model route does with a returned model: build it, dump it,
+    # validate it against response_model again, serialize, then json.dumps.
+    adapter = TypeAdapter(MessagesListResponse)
+    model = MessagesListResponse(
+        session_id=session_id,
+        messages=[MessageResponse(**dict(zip(_FIELDS, row))) for row in rows],
+    )
+    validated = adapter.validate_python(model.model_dump())
+    content = adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _fast_path(session_id, rows) -> bytes:
+    return to_json({"session_id": session_id, "messages": [dict(zip(_FIELDS, row)) for row in rows]})
+
+
+def _time(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> float:
+    median = statistics.median(samples)
+    print(f"{label:>24}: median {median * 1000:7.2f} ms  min {min(samples) * 1000:7.2f} ms")
+    return median
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    engine = get_engine()
+    instructor_id, session_id = await seed_session(engine, messages=args.messages, status="running")
+    token = create_access_token(settings, instructor_id=str(instructor_id))
+
+    try:
+        async with async_sessionmaker(engine)() as db:
+            result = await db.execute(
+                select(
+                    Message.id,
+                    Message.participant_id,
+                    Participant.display_name,
+                    Message.content,
+                    Message.created_at,
+                )
+                .join(Participant, Participant.id == Message.participant_id)
+                .where(Message.session_id == session_id)
+                .order_by(Message.created_at.asc())
+            )
+            rows = result.all()
+
+        assert _model_path(session_id, rows) == _fast_path(session_id, rows)
+        print(f"{len(rows)} messages, {len(_fast_path(session_id, rows)) / 1024:.0f} KiB of JSON")
+        model = _report("encode, response_model", _time(lambda: _model_path(session_id, rows), args.repeat))
+        fast = _report("encode, fast path", _time(lambda: _fast_path(session_id, rows), args.repeat))
+        print(f"{'speedup':>24}: {model / fast:.1f}x")
+
+        app = create_app()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            headers = {"Authorization": f"Bearer {token}"}
+            samples = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                res = await client.get(f"/sessions/{session_id}/messages", headers=headers)
+                samples.append(time.perf_counter() - started)
+                res.raise_for_status()
+            _report("GET .../messages", samples)
+    finally:
+        if not args.keep:
+            await drop_instructor(engine, instructor_id)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,270 @@
+"""Drive lobby and exercise traffic through the real app and report latency and errors.
+
+Each simulated instructor creates a session and watches it over /ws/instructor; its
+participants join via /join, connect to /ws/participant/{team_id}, toggle ready, and once
+the instructor starts the session submit messages at --rate per participant until
+--duration elapses. Reported: p50/p95/p99 per endpoint, broadcast latency (message POST
+sent -> `message_submitted` frame on the instructor socket) and errors.
+
+Without --url the app is served by uvicorn inside this process, sharing the event loop
+with the load generator; that is fine for smoke runs, but for capacity numbers start a
+separate worker and point --url at it. Instructors are inserted straight into
+DATABASE_URL and tokens signed with JWT_SECRET, so both must match the server's. All
+traffic comes from one IP, so for capacity runs start the server with RATE_LIMITS='{}'.
+
+    uv run python -m benchmarks.loadgen --instructors 20 --rate 0.5 --duration 60
+    uv run python -m benchmarks.loadgen --url http://127.0.0.1:8000 --instructors 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import time
+import uuid
+from collections import defaultdict
+
+import httpx
+import uvicorn
+from websockets.asyncio.client import connect
+
+from app.core.security import create_access_token
+from app.core.settings import get_settings
+from app.db.deps import get_engine
+from app.main import create_app
+from benchmarks._seed import drop_instructor, seed_instructors
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class Recorder:
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.error_samples: dict[str, str] = {}
+        self.broadcast: list[float] = []
+        self.pending_broadcasts: dict[str, float] = {}
+
+    def error(self, label: str, detail: str) -> None:
+        self.errors[label] += 1
+        self.error_samples.setdefault(label, detail)
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs) -> dict | None:
+        t0 = time.perf_counter()
+        try:
+            res = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as exc:
+            self.error(label, repr(exc))
+            return None
+        self.latencies[label].append(time.perf_counter() - t0)
+        if res.status_code >= 400:
+            self.error(label, f"{res.status_code} {res.text[:200]}")
+            return None
+        return res.json()
+
+    def report(self, elapsed: float) -> None:
+        total = sum(len(v) for v in self.latencies.values())
+        print(f"\n{total} requests in {elapsed:.1f}s ({total / elapsed:.1f} req/s)\n")
+        print(f"{'endpoint':<42}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for label in sorted(set(self.latencies) | set(self.errors)):
+            samples = self.latencies.get(label) or [math.nan]
+            print(
+                f"{label:<42}{len(self.latencies.get(label, [])):>8}"
+                f"{percentile(samples, 50) * 1000:>10.1f}{percentile(samples, 95) * 1000:>10.1f}"
+                f"{percentile(samples, 99) * 1000:>10.1f}{self.errors.get(label, 0):>8}"
+            )
+        if self.broadcast:
+            print(
+                f"\nbroadcast latency ({len(self.broadcast)} messages): "
+                f"p50 {percentile(self.broadcast, 50) * 1000:.1f} ms  "
+                f"p95 {percentile(self.broadcast, 95) * 1000:.1f} ms  "
+                f"p99 {percentile(self.broadcast, 99) * 1000:.1f} ms"
+            )
+        if self.pending_broadcasts:
+            print(f"{len(self.pending_broadcasts)} submitted messages never reached the instructor socket")
+        for label, detail in self.error_samples.items():
+            print(f"first {label} error: {detail}")
+
+
+async def _watch_instructor(ws_url: str, recorder: Recorder, ready: asyncio.Event) -> None:
+    try:
+        async with connect(ws_url) as socket:
+            ready.set()
+            async for raw in socket:
+                frame = json.loads(raw)
+                if frame["type"] == "message_submitted":
+                    sent_at = recorder.pending_broadcasts.pop(frame["data"]["message"]["content"], None)
+                    if sent_at is not None:
+                        recorder.broadcast.append(time.perf_counter() - sent_at)
+    except Exception as exc:
+        recorder.error("WS /ws/instructor/{session_id}", repr(exc))
+    finally:
+        ready.set()
+
+
+async def _hold_participant_socket(ws_url: str, recorder: Recorder, connected: asyncio.Event) -> None:
+    try:
+        async with connect(ws_url) as socket:
+            connected.set()
+            async for _ in socket:
+                pass
+    except Exception as exc:
+        recorder.error("WS /ws/participant/{team_id}", repr(exc))
+    finally:
+        connected.set()
+
+
+async def _participant(
+    client: httpx.AsyncClient,
+    ws_base: str,
+    recorder: Recorder,
+    *,
+    team_id: str,
+    name: str,
+    started: asyncio.Event,
+    rate: float,
+    deadline: list[float],
+) -> None:
+    joined = await recorder.request(client, "POST /join", "POST", "/join", json={"team_id": team_id, "display_name": name})
+    if joined is None:
+        return
+    token = joined["participant_token"]
+    headers = {"X-Participant-Token": token}
+
+    connected = asyncio.Event()
+    socket_task = asyncio.create_task(
+        _hold_participant_socket(f"{ws_base}/ws/participant/{team_id}?token={token}", recorder, connected)
+    )
+    try:
+        await connected.wait()
+        await recorder.request(
+            client, "POST /participant/ready", "POST", "/participant/ready", headers=headers, json={"is_ready": True}
+        )
+        await started.wait()
+        while time.perf_counter() < deadline[0]:
+            # Poisson arrivals so participants do not submit in lockstep.
+            await asyncio.sleep(random.expovariate(rate))
+            content = f"load {uuid.uuid4()}"
+            recorder.pending_broadcasts[content] = time.perf_counter()
+            result = await recorder.request(
+                client, "POST /participant/message", "POST", "/participant/message", headers=headers,
+                json={"content": content},
+            )
+            if result is None:
+                recorder.pending_broadcasts.pop(content, None)
+    finally:
+        socket_task.cancel()
+
+
+async def _instructor(
+    client: httpx.AsyncClient, ws_base: str, recorder: Recorder, token: str, args: argparse.Namespace
+) -> None:
+    headers = {"Authorization": f"Bearer {token}"}
+    created = await recorder.request(client, "POST /sessions", "POST", "/sessions", headers=headers)
+    if created is None:
+        return
+    session_id, team_id = created["session_id"], created["team_id"]
+
+    watching = asyncio.Event()
+    watcher = asyncio.create_task(
+        _watch_instructor(f"{ws_base}/ws/instructor/{session_id}?access_token={token}", recorder, watching)
+    )
+    await watching.wait()
+
+    started = asyncio.Event()
+    deadline = [math.inf]
+    participants = [
+        asyncio.create_task(
+            _participant(
+                client, ws_base, recorder, team_id=team_id, name=f"p{i}", started=started,
+                rate=args.rate, deadline=deadline,
+            )
+        )
+        for i in range(args.participants)
+    ]
+
+    # Poll the lobby like the instructor UI does until everyone is ready.
+    for _ in range(200):
+        lobby = await recorder.request(
+            client, "GET /sessions/{session_id}/participants", "GET", f"/sessions/{session_id}/participants",
+            headers=headers,
+        )
+        if lobby is not None and sum(p["is_ready"] for p in lobby["participants"]) >= args.participants:
+            break
+        await asyncio.sleep(0.1)
+
+    await recorder.request(client, "POST /sessions/{session_id}/start", "POST", f"/sessions/{session_id}/start", headers=headers)
+    deadline[0] = time.perf_counter() + args.duration
+    started.set()
+    await asyncio.gather(*participants)
+
+    # Give in-flight broadcasts a moment before the session ends.
+    await asyncio.sleep(1.0)
+    await recorder.request(client, "POST /sessions/{session_id}/end", "POST", f"/sessions/{session_id}/end", headers=headers)
+    watcher.cancel()
+
+
+async def _serve_in_process() -> tuple[uvicorn.Server, asyncio.Task, str]:
+    config = uvicorn.Config(create_app(), host="127.0.0.1", port=0, log_level="warning", ws_max_queue=1024)
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    return server, task, f"http://127.0.0.1:{port}"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", help="base URL of a running API; default serves the app in-process")
+    parser.add_argument("--instructors", type=int, default=10)
+    parser.add_argument("--participants", type=int, default=10, help="participants per session")
+    parser.add_argument("--rate", type=float, default=0.2, help="messages per second per participant")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of message traffic")
+    parser.add_argument("--ramp", type=float, default=5.0, help="seconds over which instructors arrive")
+    args = parser.parse_args()
+    if args.rate <= 0:
+        parser.error("--rate must be positive")
+
+    settings = get_settings()
+    engine = get_engine()
+    instructor_ids = await seed_instructors(engine, count=args.instructors)
+    tokens = [create_access_token(settings, instructor_id=str(i)) for i in instructor_ids]
+
+    server = server_task = None
+    base_url = args.url
+    if base_url is None:
+        server, server_task, base_url = await _serve_in_process()
+    ws_base = base_url.replace("http", "ws", 1)
+
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.instructors * (args.participants + 1))
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+            started = time.perf_counter()
+
+            async def arrive(index: int, token: str) -> None:
+                await asyncio.sleep(args.ramp * index / max(args.instructors, 1))
+                await _instructor(client, ws_base, recorder, token, args)
+
+            await asyncio.gather(*(arrive(i, token) for i, token in enumerate(tokens)))
+            recorder.report(time.perf_counter() - started)
+    finally:
+        if server is not None:
+            server.should_exit = True
+            await server_task
+        for instructor_id in instructor_ids:
+            await drop_instructor(engine, instructor_id)
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,247 @@
+"""Micro-benchmarks for hot primitives, with JSON results and a regression comparison.
+
+No database needed. `run` times each benchmark and writes the results (plus the git
+commit they were taken at) as JSON; `compare` diffs two result files and exits non-zero
+when any benchmark's median got slower by more than --threshold.
+
+    uv run python -m benchmarks.micro run                       # -> benchmarks/results/<commit>.json
+    uv run python -m benchmarks.micro run -k broadcast -o head.json
+    uv run python -m benchmarks.micro compare base.json head.json --threshold 0.1
+
+Compare runs from the same machine; timings across hosts are not comparable.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from collections.abc import Callable
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.api.sessions import MessageResponse, MessagesListResponse
+from app.core.security import create_access_token, decode_access_token
+from app.core.settings import Settings
+from app.services.participant_tokens import hash_participant_token
+from app.services.team_id import generate_team_id
+from app.ws.manager import WsManager
+
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+_SETTINGS = Settings(
+    database_url="postgresql+asyncpg://bench@localhost/bench",
+    jwt_secret="bench-jwt-secret",
+    participant_token_pepper="bench-pepper",
+)
+
+
+class _NullSocket:
+    async def accept(self) -> None:
+        pass
+
+    async def send_json(self, payload: dict) -> None:
+        pass
+
+
+def _bench_hash_participant_token() -> Callable[[], object]:
+    token = "x" * 43
+    return lambda: hash_participant_token(token=token, pepper=_SETTINGS.participant_token_pepper)
+
+
+def _bench_create_access_token() -> Callable[[], object]:
+    instructor_id = str(uuid.uuid4())
+    return lambda: create_access_token(_SETTINGS, instructor_id=instructor_id)
+
+
+def _bench_decode_access_token() -> Callable[[], object]:
+    token = create_access_token(_SETTINGS, instructor_id=str(uuid.uuid4()))
+    return lambda: decode_access_token(_SETTINGS, token)
+
+
+def _bench_generate_team_id() -> Callable[[], object]:
+    return generate_team_id
+
+
+def _bench_ws_broadcast(subscribers: int) -> Callable[[], Callable[[], object]]:
+    def setup() -> Callable[[], object]:
+        manager = WsManager()
+        loop = asyncio.new_event_loop()
+        for i in range(subscribers):
+            connect = manager.connect_instructor if i == 0 else manager.connect_participant
+            loop.run_until_complete(connect("session", _NullSocket()))
+        data = {"message": {"id": str(uuid.uuid4()), "content": "observed traffic to host-1"}}
+        return lambda: loop.run_until_complete(
+            manager.broadcast(session_id="session", event_type="message_submitted", data=data)
+        )
+
+    return setup
+
+
+def _bench_messages_list_model(size: int) -> Callable[[], Callable[[], object]]:
+    def setup() -> Callable[[], object]:
+        session_id = uuid.uuid4()
+        participant_id = uuid.uuid4()
+        now = datetime.now(timezone.utc)
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "participant_id": participant_id,
+                "display_name": "participant-1",
+                "content": f"observed traffic to host-{i}.corp.local",
+                "created_at": now,
+            }
+            for i in range(size)
+        ]
+        return lambda: MessagesListResponse(
+            session_id=session_id, messages=[MessageResponse(**row) for row in rows]
+        )
+
+    return setup
+
+
+BENCHMARKS: dict[str, Callable[[], Callable[[], object]]] = {
+    "hash_participant_token": _bench_hash_participant_token,
+    "create_access_token": _bench_create_access_token,
+    "decode_access_token": _bench_decode_access_token,
+    "generate_team_id": _bench_generate_team_id,
+    "ws_broadcast[1]": _bench_ws_broadcast(1),
+    "ws_broadcast[10]": _bench_ws_broadcast(10),
+    "ws_broadcast[1000]": _bench_ws_broadcast(1000),
+    "messages_list_model[100]": _bench_messages_list_model(100),
+    "messages_list_model[10000]": _bench_messages_list_model(10_000),
+}
+
+
+def _time(fn: Callable[[], object], *, samples: int, min_sample_seconds: float) -> tuple[int, list[float]]:
+    # Calibrate loops per sample so timer resolution and call overhead do not dominate.
+    loops = 1
+    while True:
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        if time.perf_counter() - started >= min_sample_seconds:
+            break
+        loops *= 2
+
+    per_call = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        for _ in range(loops):
+            fn()
+        per_call.append((time.perf_counter() - started) / loops)
+    return loops, per_call
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _format_seconds(value: float) -> str:
+    for unit, scale in (("s", 1.0), ("ms", 1e-3), ("us", 1e-6)):
+        if value >= scale:
+            return f"{value / scale:.2f} {unit}"
+    return f"{value / 1e-9:.0f} ns"
+
+
+def run(args: argparse.Namespace) -> int:
+    commit = _git_commit()
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if args.k and args.k not in name:
+            continue
+        loops, per_call = _time(setup(), samples=args.samples, min_sample_seconds=args.min_sample_seconds)
+        results[name] = {
+            "median_s": statistics.median(per_call),
+            "min_s": min(per_call),
+            "stdev_s": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+            "loops": loops,
+            "samples": len(per_call),
+        }
+        print(f"{name:<30}{_format_seconds(results[name]['median_s']):>12}  (min {_format_seconds(min(per_call))})")
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{commit or 'results'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "commit": commit,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "results": results,
+            },
+            indent=2,
+        )
+        + "\n"
+    )
+    print(f"wrote {output}")
+    return 0
+
+
+def compare(args: argparse.Namespace) -> int:
+    base = json.loads(Path(args.base).read_text())
+    head = json.loads(Path(args.head).read_text())
+    print(f"base {base.get('commit')} -> head {head.get('commit')}\n")
+    print(f"{'benchmark':<30}{'base':>12}{'head':>12}{'change':>10}")
+
+    regressions = []
+    for name in sorted(set(base["results"]) | set(head["results"])):
+        before = base["results"].get(name)
+        after = head["results"].get(name)
+        if before is None or after is None:
+            print(f"{name:<30}{'only in ' + ('head' if before is None else 'base'):>34}")
+            continue
+        change = after["median_s"] / before["median_s"] - 1
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -args.threshold:
+            flag = "  faster"
+        print(
+            f"{name:<30}{_format_seconds(before['median_s']):>12}{_format_seconds(after['median_s']):>12}"
+            f"{change:>+10.1%}{flag}"
+        )
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) slower by more than {args.threshold:.0%}")
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="time the benchmarks and write JSON results")
+    run_parser.add_argument("-k", help="only benchmarks whose name contains this")
+    run_parser.add_argument("-o", "--output", help="results file (default: benchmarks/results/<commit>.json)")
+    run_parser.add_argument("--samples", type=int, default=7)
+    run_parser.add_argument("--min-sample-seconds", type=float, default=0.1)
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two results files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("head")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="relative slowdown to flag")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args()
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
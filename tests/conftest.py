@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import contextlib
 import os
 from urllib.parse import urlparse
 
@@ -10,10 +11,13 @@ from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
 from collections.abc import AsyncGenerator
 
+from app.core.query_stats import track_queries
 from app.core.settings import Settings, get_settings
-from app.db.deps import get_db_session
+from app.db.deps import get_db_session, get_sessionmaker
 from app.db.session import create_engine, create_sessionmaker
 from app.main import create_app
+from app.ws.deps import get_event_dispatcher
+from app.ws.dispatcher import EventDispatcher
 
 
 if not os.getenv("CI"):
@@ -107,6 +111,18 @@ def app(test_database_url: str, db_sessionmaker: async_sessionmaker[AsyncSession
             jwt_secret="test-jwt-secret",
             allow_instructor_register=False,
             participant_token_pepper="test-pepper",
+            # Background jobs are exercised directly by their tests.
+            archive_interval_seconds=0,
+            team_id_pool_refill_interval_seconds=0,
+            outbox_relay_interval_seconds=0,
+            # Cannot be disabled; an hour never ticks within a test.
+            outbox_cleanup_interval_seconds=3600,
+            stats_broadcast_interval_seconds=0,
+            presence_sweep_interval_seconds=0,
+            loop_monitor_interval_seconds=0,
+            db_pool_warmup_connections=0,
+            # Rate limiting has its own tests; keep it out of the rest of the suite.
+            rate_limits={},
         )
 
     async def override_db_session():
@@ -115,9 +131,18 @@ def app(test_database_url: str, db_sessionmaker: async_sessionmaker[AsyncSession
 
     app.dependency_overrides[get_settings] = override_settings
     app.dependency_overrides[get_db_session] = override_db_session
+    app.dependency_overrides[get_sessionmaker] = lambda: db_sessionmaker
+    events = EventDispatcher()
+    app.dependency_overrides[get_event_dispatcher] = lambda: events
     return app
 
 
+@pytest.fixture
+def event_dispatcher(app) -> EventDispatcher:
+    # Broadcasts run after the response; drain() before asserting on them.
+    return app.dependency_overrides[get_event_dispatcher]()
+
+
 @pytest_asyncio.fixture
 async def client(app):
     transport = ASGITransport(app=app)
@@ -130,3 +155,16 @@ async def client(app):
 async def db_session(db_sessionmaker: async_sessionmaker[AsyncSession]) -> AsyncGenerator[AsyncSession, None]:
     async with db_sessionmaker() as session:
         yield session
+
+
+@pytest.fixture
+def query_budget():
+    # `with query_budget(3): await client.post(...)` fails the test when the block issues more
+    # SQL statements than budgeted, so an N+1 or an extra round trip shows up in CI.
+    @contextlib.contextmanager
+    def budget(max_queries: int):
+        with track_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, f"{stats.count} SQL statements, budget is {max_queries}"
+
+    return budget
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+
+import pytest
+
+from app.core.settings import get_settings
+
+
+def _enable_admin(app, token: str = "admin-secret") -> dict[str, str]:
+    settings = app.dependency_overrides[get_settings]().model_copy(update={"admin_token": token})
+    app.dependency_overrides[get_settings] = lambda: settings
+    return {"X-Admin-Token": token}
+
+
+def _spin(seconds: float) -> int:
+    # Enough CPU on the loop thread for the sampler to catch.
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        total += sum(range(1000))
+    return total
+
+
+@pytest.mark.asyncio
+async def test_profiler_is_hidden_without_an_admin_token(client):
+    res = await client.post("/admin/profile", params={"seconds": 0.1}, headers={"X-Admin-Token": ""})
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_profiler_rejects_a_wrong_token(client, app):
+    _enable_admin(app)
+    res = await client.post("/admin/profile", params={"seconds": 0.1}, headers={"X-Admin-Token": "nope"})
+    assert res.status_code == 401
+    assert (await client.post("/admin/profile", params={"seconds": 0.1})).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_profile_returns_collapsed_stacks_of_the_loop(client, app):
+    headers = _enable_admin(app)
+
+    async def busy() -> None:
+        await asyncio.sleep(0.05)
+        for _ in range(6):
+            _spin(0.05)
+            await asyncio.sleep(0)
+
+    res, _ = await asyncio.gather(
+        client.post("/admin/profile", params={"seconds": 0.5, "interval_ms": 5, "tasks": True}, headers=headers),
+        busy(),
+    )
+
+    assert res.status_code == 200
+    assert res.headers["content-disposition"].startswith('attachment; filename="profile-')
+    assert int(res.headers["x-profile-samples"]) > 0
+    lines = res.text.splitlines()
+    assert lines and all(re.fullmatch(r"(loop|task:[^;]+);.+ \d+", line) for line in lines)
+    assert any(line.startswith("loop;") and "_spin" in line for line in lines)
+    assert any(line.startswith("task:") for line in lines)
+
+
+@pytest.mark.asyncio
+async def test_only_one_profile_runs_at_a_time(client, app):
+    headers = _enable_admin(app)
+    first, second = await asyncio.gather(
+        client.post("/admin/profile", params={"seconds": 0.3}, headers=headers),
+        client.post("/admin/profile", params={"seconds": 0.3}, headers=headers),
+    )
+    assert sorted([first.status_code, second.status_code]) == [200, 409]
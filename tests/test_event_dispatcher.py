@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+import pytest
+
+from app.core.security import hash_password
+from app.db.models.instructor import Instructor
+from app.ws.deps import get_ws_manager
+from app.ws.dispatcher import EventDispatcher
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+class BlockingWsManager(FakeWsManager):
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = asyncio.Event()
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        await self.release.wait()
+        await super().broadcast(session_id=session_id, event_type=event_type, data=data)
+
+
+class FlakyWsManager(FakeWsManager):
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        if data.get("fail"):
+            raise RuntimeError("socket gone")
+        await super().broadcast(session_id=session_id, event_type=event_type, data=data)
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+async def test_per_session_order_is_preserved():
+    dispatcher = EventDispatcher(shards=3)
+    dispatcher.start()
+    ws = FakeWsManager()
+    sessions = [uuid.uuid4() for _ in range(5)]
+    try:
+        for i in range(50):
+            for session_id in sessions:
+                await dispatcher.publish(ws, session_id=session_id, event_type="tick", data={"i": i})
+        await dispatcher.drain()
+    finally:
+        await dispatcher.stop()
+
+    for session_id in sessions:
+        seen = [c["data"]["i"] for c in ws.calls if c["session_id"] == str(session_id)]
+        assert seen == list(range(50))
+    assert dispatcher.stats()["delivered"] == 250
+
+
+@pytest.mark.asyncio
+async def test_failed_broadcast_does_not_stop_delivery():
+    dispatcher = EventDispatcher(shards=1)
+    dispatcher.start()
+    ws = FlakyWsManager()
+    session_id = uuid.uuid4()
+    try:
+        await dispatcher.publish(ws, session_id=session_id, event_type="a", data={"fail": True})
+        await dispatcher.publish(ws, session_id=session_id, event_type="b", data={})
+        await dispatcher.drain()
+    finally:
+        await dispatcher.stop()
+
+    assert [c["type"] for c in ws.calls] == ["b"]
+    assert dispatcher.stats()["failed"] == 1
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_pending_events():
+    dispatcher = EventDispatcher()
+    dispatcher.start()
+    ws = BlockingWsManager()
+    await dispatcher.publish(ws, session_id=uuid.uuid4(), event_type="a", data={})
+
+    stopping = asyncio.create_task(dispatcher.stop())
+    ws.release.set()
+    await stopping
+
+    assert [c["type"] for c in ws.calls] == ["a"]
+    assert not dispatcher.running
+
+
+@pytest.mark.asyncio
+async def test_http_response_does_not_wait_for_broadcast(client, db_session, app, event_dispatcher):
+    ws = BlockingWsManager()
+    app.dependency_overrides[get_ws_manager] = lambda: ws
+
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+
+    res = await asyncio.wait_for(
+        client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"}), timeout=5
+    )
+    assert res.status_code == 200
+    assert ws.calls == []
+
+    ws.release.set()
+    await event_dispatcher.drain()
+    assert [c["type"] for c in ws.calls] == ["participant_joined"]
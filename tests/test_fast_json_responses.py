@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import pytest
+
+from app.api.sessions import MessagesListResponse, ParticipantsListResponse
+from app.core.security import hash_password
+from app.db.models.instructor import Instructor
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+async def test_fast_path_matches_response_models(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    participant_headers = {"X-Participant-Token": joined["participant_token"]}
+    await client.post("/participant/ready", headers=participant_headers, json={"is_ready": True})
+    await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    for content in ("hello", "naïve ünïcode ✓"):
+        await client.post("/participant/message", headers=participant_headers, json={"content": content})
+
+    cases = {
+        "/participants": ParticipantsListResponse,
+        "/messages": MessagesListResponse,
+    }
+    for suffix, model in cases.items():
+        res = await client.get(f"/sessions/{created['session_id']}{suffix}", headers=headers)
+        assert res.status_code == 200
+        assert res.headers["content-type"] == "application/json"
+        # Byte-for-byte what FastAPI would have produced through response_model.
+        assert res.content == model.model_validate_json(res.content).model_dump_json().encode()
+
+    messages = (await client.get(f"/sessions/{created['session_id']}/messages", headers=headers)).json()
+    assert [m["content"] for m in messages["messages"]] == ["hello", "naïve ünïcode ✓"]
+    assert messages["messages"][0]["display_name"] == "Alice"
@@ -0,0 +1,15 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+
+from benchmarks.bench_import_time import LAZY_MODULES
+
+
+def test_importing_the_app_leaves_heavy_dependencies_unloaded():
+    code = (
+        "import sys, app.main; "
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
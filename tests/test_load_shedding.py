@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from app.core.load_shedding import LoadSheddingMiddleware, route_group
+from app.core.metrics import HTTP_REQUESTS_SHED
+from app.core.settings import Settings
+from app.main import create_app
+
+
+def _app(release: asyncio.Event, *, limits: dict[str, tuple[int, float]]):
+    async def message(request):
+        await release.wait()
+        return JSONResponse({"ok": True})
+
+    async def healthz(request):
+        return JSONResponse({"status": "ok"})
+
+    inner = Starlette(
+        routes=[
+            Route("/participant/message", message, methods=["POST"]),
+            Route("/healthz", healthz),
+        ]
+    )
+    return LoadSheddingMiddleware(inner, limits=limits, retry_after_seconds=3)
+
+
+def test_route_groups():
+    assert route_group("POST", "/auth/login") == "login"
+    assert route_group("POST", "/join") == "join"
+    assert route_group("POST", "/participant/message") == "message"
+    assert route_group("POST", "/participant/ready") == "participant"
+    assert route_group("GET", "/sessions") == "instructor_read"
+    assert route_group("GET", "/sessions/abc/messages") == "instructor_read"
+    assert route_group("GET", "/sessions/abc/export") == "export"
+    assert route_group("GET", "/sessionsx") is None
+    assert route_group("POST", "/sessions/abc/start") == "instructor_write"
+    assert route_group("GET", "/participants") is None
+    assert route_group("GET", "/healthz") is None
+    assert route_group("GET", "/metrics") is None
+    assert route_group("OPTIONS", "/sessions") is None
+
+
+@pytest.mark.asyncio
+async def test_request_over_queue_budget_is_shed_with_retry_after():
+    release = asyncio.Event()
+    app = _app(release, limits={"message": (1, 0.05)})
+    shed_before = HTTP_REQUESTS_SHED.value("message")
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        first = asyncio.create_task(client.post("/participant/message"))
+        await asyncio.sleep(0.01)
+
+        res = await client.post("/participant/message")
+        assert res.status_code == 503
+        assert res.headers["retry-after"] == "3"
+        assert res.json() == {"detail": "Server busy, retry later"}
+        assert HTTP_REQUESTS_SHED.value("message") == shed_before + 1
+
+        # Ungrouped routes are never held back.
+        assert (await client.get("/healthz")).status_code == 200
+
+        release.set()
+        assert (await first).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_queued_request_gets_a_freed_slot_within_budget():
+    release = asyncio.Event()
+    app = _app(release, limits={"message": (1, 2.0)})
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        first = asyncio.create_task(client.post("/participant/message"))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(client.post("/participant/message"))
+        await asyncio.sleep(0.01)
+        assert app.gates["message"].waiting == 1
+
+        release.set()
+        assert (await first).status_code == 200
+        assert (await second).status_code == 200
+        assert app.gates["message"].waiting == 0
+
+
+@pytest.mark.asyncio
+async def test_zero_queue_budget_fails_fast():
+    release = asyncio.Event()
+    app = _app(release, limits={"message": (1, 0.0)})
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        first = asyncio.create_task(client.post("/participant/message"))
+        await asyncio.sleep(0.01)
+        res = await client.post("/participant/message")
+        assert res.status_code == 503
+        release.set()
+        assert (await first).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_shed_responses_carry_cors_headers_and_preflights_pass(monkeypatch, test_database_url):
+    settings = Settings(
+        database_url=test_database_url,
+        jwt_secret="test-jwt-secret",
+        participant_token_pepper="test-pepper",
+        cors_origins="http://spa.test",
+        # No slots and no queue: every instructor read is shed.
+        load_shed_limits={"instructor_read": (0, 0.0)},
+    )
+    monkeypatch.setattr("app.main.get_settings", lambda: settings)
+    app = create_app()
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        preflight = await client.options(
+            "/sessions",
+            headers={"Origin": "http://spa.test", "Access-Control-Request-Method": "GET"},
+        )
+        assert preflight.status_code == 200
+        assert preflight.headers["access-control-allow-origin"] == "http://spa.test"
+
+        res = await client.get("/sessions", headers={"Origin": "http://spa.test"})
+        assert res.status_code == 503
+        assert res.headers["access-control-allow-origin"] == "http://spa.test"
+        assert res.headers["retry-after"] == "1"
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+
+import pytest
+
+from app.core.loop_monitor import LoopLagMonitor
+from app.core.metrics import LOOP_LAG, LOOP_STALLS
+
+
+def _block_the_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_stall_is_measured_and_logged_with_the_blocking_stack(caplog):
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+    stalls = LOOP_STALLS.value()
+    monitor.start()
+    try:
+        await asyncio.sleep(0.05)
+        with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+            _block_the_loop(0.3)
+            await asyncio.sleep(0.05)
+    finally:
+        await monitor.stop()
+
+    reports = [r.getMessage() for r in caplog.records if "Event loop blocked" in r.getMessage()]
+    assert len(reports) == 1
+    assert "_block_the_loop" in reports[0]
+    assert LOOP_STALLS.value() == stalls + 1
+
+
+@pytest.mark.asyncio
+async def test_healthy_loop_only_samples_lag(caplog):
+    monitor = LoopLagMonitor(interval=0.01, threshold=0.25)
+    samples = LOOP_LAG.count()
+    with caplog.at_level(logging.WARNING, logger="app.core.loop_monitor"):
+        monitor.start()
+        await asyncio.sleep(0.1)
+        await monitor.stop()
+
+    assert LOOP_LAG.count() > samples
+    assert not [r for r in caplog.records if "Event loop blocked" in r.getMessage()]
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.security import hash_password
+from app.db.models.instructor import Instructor
+from app.db.models.message import Message
+from app.services.idempotency import IdempotencyCache, get_idempotency_cache
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _running_session_participant(client, db_session) -> dict[str, str]:
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    participant_headers = {"X-Participant-Token": joined["participant_token"]}
+    await client.post("/participant/ready", headers=participant_headers, json={"is_ready": True})
+    start_res = await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    assert start_res.status_code == 200
+    return participant_headers
+
+
+async def _message_count(db_session) -> int:
+    return (await db_session.execute(select(func.count()).select_from(Message))).scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_retry_with_same_key_returns_original_message(client, db_session, app, event_dispatcher):
+    fake_ws = FakeWsManager()
+    app.dependency_overrides[get_ws_manager] = lambda: fake_ws
+    participant_headers = await _running_session_participant(client, db_session)
+
+    headers = {**participant_headers, "Idempotency-Key": "submit-1"}
+    first = await client.post("/participant/message", headers=headers, json={"content": "hello"})
+    second = await client.post("/participant/message", headers=headers, json={"content": "hello"})
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json()
+    assert await _message_count(db_session) == 1
+    await event_dispatcher.drain()
+    assert [c["type"] for c in fake_ws.calls].count("message_submitted") == 1
+
+
+@pytest.mark.asyncio
+async def test_retry_is_deduplicated_without_the_in_memory_cache(client, db_session, app):
+    fake_ws = FakeWsManager()
+    app.dependency_overrides[get_ws_manager] = lambda: fake_ws
+    participant_headers = await _running_session_participant(client, db_session)
+
+    headers = {**participant_headers, "Idempotency-Key": "submit-1"}
+    first = await client.post("/participant/message", headers=headers, json={"content": "hello"})
+
+    # Simulate a retry landing on another worker.
+    app.dependency_overrides[get_idempotency_cache] = lambda: IdempotencyCache()
+    second = await client.post("/participant/message", headers=headers, json={"content": "hello"})
+
+    assert second.json()["message_id"] == first.json()["message_id"]
+    assert await _message_count(db_session) == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_retries_insert_once(client, db_session, app, event_dispatcher):
+    fake_ws = FakeWsManager()
+    app.dependency_overrides[get_ws_manager] = lambda: fake_ws
+    participant_headers = await _running_session_participant(client, db_session)
+
+    headers = {**participant_headers, "Idempotency-Key": "burst"}
+    results = await asyncio.gather(
+        *(client.post("/participant/message", headers=headers, json={"content": "hello"}) for _ in range(5))
+    )
+
+    assert {r.status_code for r in results} == {200}
+    assert len({r.json()["message_id"] for r in results}) == 1
+    assert await _message_count(db_session) == 1
+    await event_dispatcher.drain()
+    assert [c["type"] for c in fake_ws.calls].count("message_submitted") == 1
+
+
+@pytest.mark.asyncio
+async def test_distinct_keys_and_no_key_create_separate_messages(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    participant_headers = await _running_session_participant(client, db_session)
+
+    await client.post("/participant/message", headers={**participant_headers, "Idempotency-Key": "a"}, json={"content": "x"})
+    await client.post("/participant/message", headers={**participant_headers, "Idempotency-Key": "b"}, json={"content": "x"})
+    await client.post("/participant/message", headers=participant_headers, json={"content": "x"})
+    await client.post("/participant/message", headers=participant_headers, json={"content": "x"})
+
+    assert await _message_count(db_session) == 4
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.core.security import hash_password
+from app.db.models.exercise_session import ExerciseSession
+from app.db.models.instructor import Instructor
+from app.services.archival import archive_ended_sessions
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+MESSAGES = [
+    "Found CVE-2024-3094 on web-01.corp.local",
+    "Patched web-01.corp.local",
+    "CVE-2024-3094 again: CVE-2024-3094 also on db-02.corp.local",
+    "Nothing suspicious on the firewall",
+]
+
+
+async def _session_with_messages(client, db_session, headers) -> dict:
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    participant_headers = {"X-Participant-Token": joined["participant_token"]}
+    await client.post("/participant/ready", headers=participant_headers, json={"is_ready": True})
+    await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    for content in MESSAGES:
+        res = await client.post("/participant/message", headers=participant_headers, json={"content": content})
+        assert res.status_code == 200
+    return created
+
+
+@pytest.mark.asyncio
+async def test_search_ranks_matching_messages(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    headers = await _login_and_get_headers(client, db_session)
+    created = await _session_with_messages(client, db_session, headers)
+
+    res = await client.get(
+        f"/sessions/{created['session_id']}/messages/search", headers=headers, params={"q": "CVE-2024-3094"}
+    )
+    assert res.status_code == 200
+    results = res.json()["results"]
+    assert [r["content"] for r in results] == [MESSAGES[2], MESSAGES[0]]
+    assert results[0]["rank"] > results[1]["rank"]
+    assert results[0]["display_name"] == "Alice"
+    assert res.json()["next_cursor"] is None
+
+    hosts = await client.get(
+        f"/sessions/{created['session_id']}/messages/search", headers=headers, params={"q": "web-01.corp.local"}
+    )
+    assert {r["content"] for r in hosts.json()["results"]} == {MESSAGES[0], MESSAGES[1]}
+
+
+@pytest.mark.asyncio
+async def test_search_paginates_with_cursor(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    headers = await _login_and_get_headers(client, db_session)
+    created = await _session_with_messages(client, db_session, headers)
+    url = f"/sessions/{created['session_id']}/messages/search"
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"q": "CVE-2024-3094 OR patched OR firewall", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        page = (await client.get(url, headers=headers, params=params)).json()
+        seen.extend(r["id"] for r in page["results"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert len(seen) == len(set(seen)) == 4
+
+    bad = await client.get(url, headers=headers, params={"q": "x", "cursor": "not-a-cursor"})
+    assert bad.status_code == 400
+    assert bad.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.asyncio
+async def test_search_is_scoped_to_owner(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    owner_headers = await _login_and_get_headers(client, db_session, username="owner")
+    other_headers = await _login_and_get_headers(client, db_session, username="other")
+    created = await _session_with_messages(client, db_session, owner_headers)
+
+    res = await client.get(
+        f"/sessions/{created['session_id']}/messages/search", headers=other_headers, params={"q": "CVE"}
+    )
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_search_falls_back_to_archive(client, db_session, db_sessionmaker, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    headers = await _login_and_get_headers(client, db_session)
+    created = await _session_with_messages(client, db_session, headers)
+    await client.post(f"/sessions/{created['session_id']}/end", headers=headers)
+
+    session = (
+        await db_session.execute(select(ExerciseSession).where(ExerciseSession.id == created["session_id"]))
+    ).scalar_one()
+    session.ended_at = datetime.now(timezone.utc) - timedelta(days=31)
+    await db_session.commit()
+    assert await archive_ended_sessions(db_sessionmaker, older_than=timedelta(days=30)) == 1
+
+    res = await client.get(
+        f"/sessions/{created['session_id']}/messages/search", headers=headers, params={"q": "CVE-2024-3094"}
+    )
+    assert res.status_code == 200
+    assert [r["content"] for r in res.json()["results"]] == [MESSAGES[2], MESSAGES[0]]
@@ -56,7 +56,7 @@ async def test_submit_message_rejects_when_not_running(client, db_session, app):
 
 
 @pytest.mark.asyncio
-async def test_submit_message_persists_broadcasts_and_lists(client, db_session, app):
+async def test_submit_message_persists_broadcasts_and_lists(client, db_session, app, event_dispatcher):
     fake_ws = FakeWsManager()
     app.dependency_overrides[get_ws_manager] = lambda: fake_ws
 
@@ -90,6 +90,7 @@ async def test_submit_message_persists_broadcasts_and_lists(client, db_session,
     assert body["content"] == "hello world"
     assert isinstance(body["message_id"], str) and body["message_id"]
 
+    await event_dispatcher.drain()
     assert any(c["type"] == "message_submitted" for c in fake_ws.calls)
 
     # Verify persistence
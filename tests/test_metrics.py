@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.metrics import (
+    HTTP_REQUEST_DURATION,
+    HTTP_REQUESTS,
+    WS_BROADCAST_DURATION,
+    WS_SEND_FAILURES,
+    MetricsRegistry,
+)
+from app.core.security import hash_password
+from app.db.models.instructor import Instructor
+from app.ws.manager import WsManager
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+class FakeSocket:
+    def __init__(self, *, fail: bool = False) -> None:
+        self.fail = fail
+        self.sent: list[dict] = []
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_json(self, payload: dict) -> None:
+        if self.fail:
+            raise RuntimeError("socket closed")
+        self.sent.append(payload)
+
+
+def test_registry_renders_prometheus_text():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("path",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1.0))
+    depth = registry.gauge("depth", "Depth.")
+    depth.set_function(lambda: 7)
+
+    requests.inc('/a"b')
+    requests.inc('/a"b', amount=2)
+    latency.observe(0.05)
+    latency.observe(0.1)
+    latency.observe(3.0)
+
+    lines = registry.render().splitlines()
+    assert "# TYPE requests_total counter" in lines
+    assert 'requests_total{path="/a\\"b"} 3' in lines
+    assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+    assert 'latency_seconds_bucket{le="1"} 2' in lines
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in lines
+    assert "latency_seconds_sum 3.15" in lines
+    assert "latency_seconds_count 3" in lines
+    assert "depth 7" in lines
+
+
+@pytest.mark.asyncio
+async def test_requests_are_labelled_by_route_template(client, db_session):
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+
+    route = "/sessions/{session_id}"
+    before = HTTP_REQUESTS.value("GET", route, "200")
+    observed = HTTP_REQUEST_DURATION.count("GET", route)
+    unmatched = HTTP_REQUESTS.value("GET", "unmatched", "404")
+
+    res = await client.get(f"/sessions/{created['session_id']}", headers=headers)
+    assert res.status_code == 200
+    assert (await client.get("/no-such-path")).status_code == 404
+
+    assert HTTP_REQUESTS.value("GET", route, "200") == before + 1
+    assert HTTP_REQUEST_DURATION.count("GET", route) == observed + 1
+    assert HTTP_REQUESTS.value("GET", "unmatched", "404") == unmatched + 1
+
+    res = await client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = res.text
+    assert f'http_request_duration_seconds_bucket{{method="GET",route="{route}",le="+Inf"}}' in body
+    assert created["session_id"] not in body
+    for name in (
+        "http_requests_in_flight 1",
+        "db_pool_checked_out ",
+        "db_pool_overflow ",
+        "db_pool_checkout_seconds_count ",
+        'ws_connections{role="instructor"} 0',
+        'ws_connections{role="participant"} 0',
+        "event_dispatcher_queue_depth 0",
+    ):
+        assert name in body
+
+
+@pytest.mark.asyncio
+async def test_broadcast_records_fan_out_and_send_failures():
+    manager = WsManager()
+    healthy, broken = FakeSocket(), FakeSocket(fail=True)
+    await manager.connect_instructor("s1", healthy)
+    await manager.connect_participant("s1", broken)
+    assert manager.connection_counts() == {"instructor": 1, "participant": 1}
+
+    failures = WS_SEND_FAILURES.value("metrics_test")
+    broadcasts = WS_BROADCAST_DURATION.count("metrics_test")
+    await manager.broadcast(session_id="s1", event_type="metrics_test", data={})
+
+    assert len(healthy.sent) == 1
+    assert WS_SEND_FAILURES.value("metrics_test") == failures + 1
+    assert WS_BROADCAST_DURATION.count("metrics_test") == broadcasts + 1
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from datetime import timedelta
+
+import pytest
+from asgi_lifespan import LifespanManager
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import select
+
+from app.core.security import hash_password
+from app.core.settings import get_settings
+from app.db.models.instructor import Instructor
+from app.db.models.outbox_event import OutboxEvent
+from app.services.outbox import (
+    add_outbox_event,
+    delete_delivered_events,
+    publish_outbox_event,
+    relay_pending_events,
+)
+from app.ws.deps import get_ws_manager
+from app.ws.dispatcher import EventDispatcher
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+class BrokenWsManager(FakeWsManager):
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        raise RuntimeError("socket gone")
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _pending(db_session) -> list[str]:
+    result = await db_session.execute(select(OutboxEvent.event_type).order_by(OutboxEvent.id))
+    return list(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_delivered_events_are_acknowledged_and_deleted(
+    client, db_session, db_sessionmaker, app, event_dispatcher
+):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})
+
+    assert await _pending(db_session) == ["participant_joined"]
+
+    await event_dispatcher.drain()
+    await delete_delivered_events(db_sessionmaker, event_dispatcher.take_acknowledged())
+    assert await _pending(db_session) == []
+
+
+@pytest.mark.asyncio
+async def test_delivered_events_are_deleted_with_the_relay_disabled(db_session, app, event_dispatcher):
+    settings = app.dependency_overrides[get_settings]().model_copy(
+        update={"outbox_relay_interval_seconds": 0, "outbox_cleanup_interval_seconds": 0.02}
+    )
+    app.dependency_overrides[get_settings] = lambda: settings
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+
+    async with LifespanManager(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+            headers = await _login_and_get_headers(client, db_session)
+            created = (await client.post("/sessions", headers=headers)).json()
+            await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})
+            await event_dispatcher.drain()
+
+            for _ in range(100):
+                if await _pending(db_session) == []:
+                    break
+                await asyncio.sleep(0.02)
+
+            # Checked before shutdown, which deletes acknowledged rows on its own.
+            assert await _pending(db_session) == []
+            assert event_dispatcher.take_acknowledged() == []
+
+
+@pytest.mark.asyncio
+async def test_failed_broadcast_is_replayed_by_relay(client, db_session, db_sessionmaker, app, event_dispatcher):
+    app.dependency_overrides[get_ws_manager] = lambda: BrokenWsManager()
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    await client.post(
+        "/participant/ready",
+        headers={"X-Participant-Token": joined["participant_token"]},
+        json={"is_ready": True},
+    )
+    await event_dispatcher.drain()
+    assert event_dispatcher.take_acknowledged() == []
+
+    ws = FakeWsManager()
+    observed = []
+    event_dispatcher.add_listener(observed.append)
+    relayed = await relay_pending_events(db_sessionmaker, event_dispatcher, ws, older_than=timedelta(0))
+    await event_dispatcher.drain()
+
+    assert relayed == 2
+    # Replays go through the dispatcher, so listeners see them too.
+    assert [e.event_type for e in observed] == ["participant_joined", "participant_ready_changed"]
+    assert [c["type"] for c in ws.calls] == ["participant_joined", "participant_ready_changed"]
+    assert ws.calls[0]["data"]["participant"]["display_name"] == "Alice"
+    assert ws.calls[0]["session_id"] == created["session_id"]
+
+    await delete_delivered_events(db_sessionmaker, event_dispatcher.take_acknowledged())
+    assert await _pending(db_session) == []
+
+
+@pytest.mark.asyncio
+async def test_relay_leaves_events_within_grace_period(db_session, db_sessionmaker):
+    add_outbox_event(db_session, session_id=uuid.uuid4(), event_type="fresh", data={})
+    await db_session.commit()
+
+    ws = FakeWsManager()
+    assert await relay_pending_events(db_sessionmaker, EventDispatcher(), ws, older_than=timedelta(minutes=5)) == 0
+    assert ws.calls == []
+    assert await _pending(db_session) == ["fresh"]
+
+
+@pytest.mark.asyncio
+async def test_failed_replay_is_leased_and_kept_for_a_later_run(db_session, db_sessionmaker):
+    session_id = uuid.uuid4()
+    for event_type in ("first", "second"):
+        add_outbox_event(db_session, session_id=session_id, event_type=event_type, data={})
+    await db_session.commit()
+
+    events = EventDispatcher()
+    assert await relay_pending_events(db_sessionmaker, events, BrokenWsManager(), older_than=timedelta(0)) == 2
+    assert events.take_acknowledged() == []
+    assert await _pending(db_session) == ["first", "second"]
+
+    # Claimed rows are not replayed again until the grace period has passed once more.
+    ws = FakeWsManager()
+    assert await relay_pending_events(db_sessionmaker, events, ws, older_than=timedelta(minutes=5)) == 0
+    assert await relay_pending_events(db_sessionmaker, events, ws, older_than=timedelta(0)) == 2
+    assert [c["type"] for c in ws.calls] == ["first", "second"]
+
+
+@pytest.mark.asyncio
+async def test_relay_skips_events_still_held_by_the_dispatcher(db_session, db_sessionmaker):
+    queued = add_outbox_event(db_session, session_id=uuid.uuid4(), event_type="queued", data={})
+    add_outbox_event(db_session, session_id=uuid.uuid4(), event_type="lost", data={})
+    await db_session.commit()
+
+    # A shard backed up for longer than the grace period still holds "queued".
+    events = EventDispatcher()
+    events.start()
+    try:
+        gate = asyncio.Event()
+
+        class BlockedWsManager(FakeWsManager):
+            async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+                await gate.wait()
+                await super().broadcast(session_id=session_id, event_type=event_type, data=data)
+
+        ws = BlockedWsManager()
+        await publish_outbox_event(events, ws, queued)
+        assert await relay_pending_events(db_sessionmaker, events, ws, older_than=timedelta(0)) == 1
+
+        gate.set()
+        await events.drain()
+        assert sorted(c["type"] for c in ws.calls) == ["lost", "queued"]
+    finally:
+        await events.stop()
+
+
+@pytest.mark.asyncio
+async def test_rolled_back_request_writes_no_event(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+
+    res = await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    assert res.status_code == 400
+    assert await _pending(db_session) == []
@@ -33,7 +33,7 @@ async def test_leave_requires_participant_token(client):
 
 
 @pytest.mark.asyncio
-async def test_leave_sets_left_at_revokes_token_broadcasts_and_frees_capacity(client, db_session, app):
+async def test_leave_sets_left_at_revokes_token_broadcasts_and_frees_capacity(client, db_session, app, event_dispatcher):
     fake_ws = FakeWsManager()
     app.dependency_overrides[get_ws_manager] = lambda: fake_ws
 
@@ -56,6 +56,7 @@ async def test_leave_sets_left_at_revokes_token_broadcasts_and_frees_capacity(cl
     assert left_body["session_id"] == created["session_id"]
     assert left_body["left_at"]
 
+    await event_dispatcher.drain()
     assert any(c["type"] == "participant_left" for c in fake_ws.calls)
 
     # Token should be invalid after leaving
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.security import hash_password
+from app.db.models.exercise_session import ExerciseSession, SessionStatus
+from app.db.models.instructor import Instructor
+from app.db.models.participant import Participant
+from app.services.presence import PendingDeparture, PresenceTracker, persist_departures
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_reconnect_within_grace_cancels_departure():
+    presence = PresenceTracker(grace_seconds=30)
+    session_id, participant_id = uuid.uuid4(), uuid.uuid4()
+    t0 = datetime.now(timezone.utc)
+
+    assert presence.connected(participant_id) is False
+    assert presence.disconnected(session_id=session_id, participant_id=participant_id, now=t0) is True
+    assert presence.is_pending(participant_id)
+
+    assert presence.connected(participant_id) is True
+    assert not presence.is_pending(participant_id)
+    assert presence.take_expired(t0 + timedelta(minutes=5)) == []
+
+
+def test_departure_starts_when_last_socket_closes_and_expires_after_grace():
+    presence = PresenceTracker(grace_seconds=30)
+    session_id, participant_id = uuid.uuid4(), uuid.uuid4()
+    t0 = datetime.now(timezone.utc)
+
+    presence.connected(participant_id)
+    presence.connected(participant_id)
+    assert presence.disconnected(session_id=session_id, participant_id=participant_id, now=t0) is False
+    assert presence.disconnected(session_id=session_id, participant_id=participant_id, now=t0) is True
+
+    assert presence.take_expired(t0 + timedelta(seconds=29)) == []
+    expired = presence.take_expired(t0 + timedelta(seconds=30))
+    assert [d.participant_id for d in expired] == [participant_id]
+    assert not presence.is_pending(participant_id)
+
+
+@pytest.mark.asyncio
+async def test_expired_departures_are_persisted_in_one_batch(
+    client, db_session, db_sessionmaker, app, event_dispatcher
+):
+    fake_ws = FakeWsManager()
+    app.dependency_overrides[get_ws_manager] = lambda: fake_ws
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = {}
+    for name in ("Alice", "Bob", "Carol"):
+        joined[name] = (
+            await client.post("/join", json={"team_id": created["team_id"], "display_name": name})
+        ).json()
+    # Carol leaves on her own during the grace window.
+    await client.post("/participant/leave", headers={"X-Participant-Token": joined["Carol"]["participant_token"]})
+    await event_dispatcher.drain()
+    fake_ws.calls.clear()
+
+    session_id = uuid.UUID(created["session_id"])
+    dropped_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+    departures = [
+        PendingDeparture(
+            session_id=session_id,
+            participant_id=uuid.UUID(joined[name]["participant_id"]),
+            disconnected_at=dropped_at,
+        )
+        for name in ("Alice", "Bob", "Carol")
+    ]
+
+    persisted = await persist_departures(db_sessionmaker, event_dispatcher, fake_ws, departures)
+    await event_dispatcher.drain()
+
+    assert persisted == 2
+    assert sorted(c["data"]["participant"]["display_name"] for c in fake_ws.calls) == ["Alice", "Bob"]
+    assert {c["type"] for c in fake_ws.calls} == {"participant_left"}
+
+    participants = (
+        await db_session.execute(select(Participant).where(Participant.session_id == session_id))
+    ).scalars().all()
+    by_name = {p.display_name: p for p in participants}
+    assert by_name["Alice"].left_at == dropped_at
+    assert by_name["Alice"].token_revoked_at is not None
+
+    session = (await db_session.execute(select(ExerciseSession).where(ExerciseSession.id == session_id))).scalar_one()
+    assert session.active_participants == 0
+
+
+@pytest.mark.asyncio
+async def test_departures_from_ended_sessions_are_ignored(
+    client, db_session, db_sessionmaker, app, event_dispatcher
+):
+    fake_ws = FakeWsManager()
+    app.dependency_overrides[get_ws_manager] = lambda: fake_ws
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    await event_dispatcher.drain()
+    fake_ws.calls.clear()
+
+    # An ended session whose participant was never closed out, e.g. ended before end_session
+    # froze participants.
+    session_id = uuid.UUID(created["session_id"])
+    await db_session.execute(
+        update(ExerciseSession).where(ExerciseSession.id == session_id).values(status=SessionStatus.ended)
+    )
+    await db_session.commit()
+    version = (
+        await db_session.execute(select(ExerciseSession.version).where(ExerciseSession.id == session_id))
+    ).scalar_one()
+
+    departure = PendingDeparture(
+        session_id=session_id,
+        participant_id=uuid.UUID(joined["participant_id"]),
+        disconnected_at=datetime.now(timezone.utc) - timedelta(minutes=1),
+    )
+    assert await persist_departures(db_sessionmaker, event_dispatcher, fake_ws, [departure]) == 0
+    await event_dispatcher.drain()
+    assert fake_ws.calls == []
+
+    db_session.expire_all()
+    session = (await db_session.execute(select(ExerciseSession).where(ExerciseSession.id == session_id))).scalar_one()
+    assert session.version == version
+    assert session.active_participants == 1
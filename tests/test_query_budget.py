@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import re
+
+import pytest
+
+from app.core.metrics import HTTP_REQUEST_QUERIES
+from app.core.security import hash_password
+from app.db.models.instructor import Instructor
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+async def test_exercise_flow_stays_within_query_budgets(client, db_session, app, query_budget):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    headers = await _login_and_get_headers(client, db_session)
+
+    with query_budget(3):
+        created = (await client.post("/sessions", headers=headers)).json()
+    session_id = created["session_id"]
+
+    with query_budget(5):
+        joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    participant_headers = {"X-Participant-Token": joined["participant_token"]}
+
+    with query_budget(7):
+        await client.post("/participant/ready", headers=participant_headers, json={"is_ready": True})
+    with query_budget(4):
+        assert (await client.post(f"/sessions/{session_id}/start", headers=headers)).status_code == 200
+    with query_budget(5):
+        await client.post("/participant/message", headers=participant_headers, json={"content": "hello"})
+    with query_budget(2):
+        await client.get(f"/sessions/{session_id}", headers=headers)
+    with query_budget(7):
+        await client.post("/participant/leave", headers=participant_headers)
+    with query_budget(5):
+        assert (await client.post(f"/sessions/{session_id}/end", headers=headers)).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_list_endpoints_do_not_query_per_row(client, db_session, app, query_budget):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    headers = await _login_and_get_headers(client, db_session)
+    for _ in range(5):
+        created = (await client.post("/sessions", headers=headers)).json()
+    for name in ("Alice", "Bob", "Carol", "Dave"):
+        await client.post("/join", json={"team_id": created["team_id"], "display_name": name})
+
+    with query_budget(2):
+        assert len((await client.get("/sessions", headers=headers)).json()["sessions"]) == 5
+    with query_budget(3):
+        res = await client.get(f"/sessions/{created['session_id']}/participants", headers=headers)
+        assert len(res.json()["participants"]) == 4
+
+
+@pytest.mark.asyncio
+async def test_server_timing_header_and_metric(client, db_session):
+    headers = await _login_and_get_headers(client, db_session)
+    observed = HTTP_REQUEST_QUERIES.count("GET", "/sessions")
+
+    res = await client.get("/sessions", headers=headers)
+
+    match = re.fullmatch(r'db;dur=[\d.]+;desc="(\d+) queries", app;dur=[\d.]+', res.headers["server-timing"])
+    assert match is not None
+    assert int(match.group(1)) >= 1
+    assert HTTP_REQUEST_QUERIES.count("GET", "/sessions") == observed + 1
+
+
+def test_query_budget_fails_when_exceeded(query_budget):
+    with pytest.raises(AssertionError, match="3 SQL statements, budget is 2"):
+        with query_budget(2) as stats:
+            stats.count = 3
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from app.core.metrics import HTTP_REQUESTS_RATE_LIMITED
+from app.core.security import hash_password
+from app.core.settings import get_settings
+from app.db.models.instructor import Instructor
+from app.services.rate_limit import MemoryRateLimiter, PostgresRateLimiter, get_rate_limiter
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _enable_rate_limits(app, limits: dict[str, tuple[int, float]]) -> None:
+    settings = app.dependency_overrides[get_settings]().model_copy(update={"rate_limits": limits})
+    app.dependency_overrides[get_settings] = lambda: settings
+    limiter = MemoryRateLimiter()
+    app.dependency_overrides[get_rate_limiter] = lambda: limiter
+
+
+@pytest.mark.asyncio
+async def test_memory_bucket_allows_burst_then_refills_and_expires():
+    now = [0.0]
+    limiter = MemoryRateLimiter(clock=lambda: now[0])
+
+    for _ in range(3):
+        assert await limiter.hit("k", requests=3, seconds=30.0) == 0.0
+    assert await limiter.hit("k", requests=3, seconds=30.0) == pytest.approx(10.0)
+    assert await limiter.hit("other", requests=3, seconds=30.0) == 0.0
+
+    now[0] = 10.0
+    assert await limiter.hit("k", requests=3, seconds=30.0) == 0.0
+    assert await limiter.hit("k", requests=3, seconds=30.0) > 0
+
+    # Buckets that have refilled completely are dropped on the next sweep.
+    now[0] = 100.0
+    await limiter.hit("fresh", requests=3, seconds=30.0)
+    assert len(limiter) == 1
+
+
+@pytest.mark.asyncio
+async def test_login_is_limited_per_ip(client, app):
+    _enable_rate_limits(app, {"login_ip": (2, 60.0)})
+    limited_before = HTTP_REQUESTS_RATE_LIMITED.value("login_ip")
+
+    for _ in range(2):
+        res = await client.post("/auth/login", json={"username": "nobody", "password": "wrong-password"})
+        assert res.status_code == 401
+
+    res = await client.post("/auth/login", json={"username": "nobody", "password": "wrong-password"})
+    assert res.status_code == 429
+    assert res.json()["detail"] == "Too many requests"
+    assert 1 <= int(res.headers["retry-after"]) <= 30
+    assert HTTP_REQUESTS_RATE_LIMITED.value("login_ip") == limited_before + 1
+
+
+@pytest.mark.asyncio
+async def test_join_is_limited_per_team_id(client, app):
+    _enable_rate_limits(app, {"join_team": (1, 60.0)})
+
+    res = await client.post("/join", json={"team_id": "ABCDEF", "display_name": "Alice"})
+    assert res.status_code == 404
+    res = await client.post("/join", json={"team_id": "ABCDEF", "display_name": "Bob"})
+    assert res.status_code == 429
+    res = await client.post("/join", json={"team_id": "BCDEFG", "display_name": "Bob"})
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_participant_requests_are_limited_per_participant(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    alice = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    bob = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Bob"})).json()
+
+    _enable_rate_limits(app, {"participant": (2, 60.0)})
+    alice_headers = {"X-Participant-Token": alice["participant_token"]}
+    for is_ready in (True, False):
+        res = await client.post("/participant/ready", headers=alice_headers, json={"is_ready": is_ready})
+        assert res.status_code == 200
+    res = await client.post("/participant/ready", headers=alice_headers, json={"is_ready": True})
+    assert res.status_code == 429
+
+    res = await client.post(
+        "/participant/ready", headers={"X-Participant-Token": bob["participant_token"]}, json={"is_ready": True}
+    )
+    assert res.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_postgres_buckets_are_shared_between_limiters(db_sessionmaker):
+    # Two limiters stand in for two workers.
+    first = PostgresRateLimiter(db_sessionmaker)
+    second = PostgresRateLimiter(db_sessionmaker)
+
+    assert await first.hit("join_ip:203.0.113.7", requests=2, seconds=60.0) == 0.0
+    assert await second.hit("join_ip:203.0.113.7", requests=2, seconds=60.0) == 0.0
+    retry_after = await first.hit("join_ip:203.0.113.7", requests=2, seconds=60.0)
+    assert 0 < retry_after <= 30.0
+    assert await second.hit("join_ip:198.51.100.1", requests=2, seconds=60.0) == 0.0
+
+
+@pytest.mark.asyncio
+async def test_postgres_refusals_always_block_under_concurrency(db_sessionmaker):
+    limiters = [PostgresRateLimiter(db_sessionmaker) for _ in range(2)]
+    results = await asyncio.gather(
+        *(limiters[i % 2].hit("login_ip:203.0.113.9", requests=3, seconds=60.0) for i in range(12))
+    )
+
+    assert sum(1 for retry_after in results if retry_after == 0.0) == 3
+    assert all(retry_after > 0 for retry_after in sorted(results)[3:])
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import pytest
+
+from app.db.deps import get_sessionmaker
+from app.db.session import create_engine, create_sessionmaker
+from app.services.warmup import run_pool_warmup, warm_pool
+
+
+@pytest.mark.asyncio
+async def test_liveness_does_not_touch_the_database(client, app):
+    app.dependency_overrides[get_sessionmaker] = lambda: None
+    res = await client.get("/healthz")
+    assert res.status_code == 200
+    assert res.json() == {"status": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_ready_only_after_warm_up_and_with_database(client, app, db_sessionmaker):
+    app.state.pool_warmed = False
+    res = await client.get("/readyz")
+    assert res.status_code == 503
+    assert res.json()["detail"] == "Warming up"
+
+    await run_pool_warmup(db_sessionmaker, connections=2, state=app.state)
+    res = await client.get("/readyz")
+    assert res.status_code == 200
+    assert res.json() == {"status": "ready"}
+
+    unreachable = create_engine("postgresql+asyncpg://nobody@127.0.0.1:1/cyberxercise_test")
+    app.dependency_overrides[get_sessionmaker] = lambda: create_sessionmaker(unreachable)
+    try:
+        res = await client.get("/readyz")
+    finally:
+        await unreachable.dispose()
+    assert res.status_code == 503
+    assert res.json()["detail"] == "Database unreachable"
+
+
+@pytest.mark.asyncio
+async def test_warm_pool_opens_distinct_connections(test_database_url):
+    engine = create_engine(test_database_url, pool_size=3)
+    try:
+        assert engine.pool.checkedin() == 0
+        await warm_pool(create_sessionmaker(engine), connections=3)
+        assert engine.pool.checkedin() == 3
+        assert engine.pool.checkedout() == 0
+    finally:
+        await engine.dispose()
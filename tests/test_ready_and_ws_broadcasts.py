@@ -36,7 +36,7 @@ async def test_ready_requires_participant_token(client):
 
 
 @pytest.mark.asyncio
-async def test_ready_toggles_and_broadcasts(client, db_session, app):
+async def test_ready_toggles_and_broadcasts(client, db_session, app, event_dispatcher):
     fake_ws = FakeWsManager()
     app.dependency_overrides[get_ws_manager] = lambda: fake_ws
 
@@ -50,6 +50,7 @@ async def test_ready_toggles_and_broadcasts(client, db_session, app):
     joined = join_res.json()
 
     # join should broadcast participant_joined
+    await event_dispatcher.drain()
     assert any(c["type"] == "participant_joined" for c in fake_ws.calls)
 
     ready_res = await client.post(
@@ -62,6 +63,7 @@ async def test_ready_toggles_and_broadcasts(client, db_session, app):
     assert body["participant_id"] == joined["participant_id"]
     assert body["is_ready"] is True
 
+    await event_dispatcher.drain()
     assert any(c["type"] == "participant_ready_changed" for c in fake_ws.calls)
 
 
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import update
+
+from app.core.security import hash_password
+from app.db.models.exercise_session import ExerciseSession
+from app.db.models.instructor import Instructor
+from app.services.presence import PresenceTracker, persist_departures
+from app.services.response_cache import CachedResponse, ResponseCache, get_response_cache
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _ended_session(client, headers) -> dict:
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    participant_headers = {"X-Participant-Token": joined["participant_token"]}
+    await client.post("/participant/ready", headers=participant_headers, json={"is_ready": True})
+    await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    await client.post("/participant/message", headers=participant_headers, json={"content": "hello"})
+    await client.post(f"/sessions/{created['session_id']}/end", headers=headers)
+    return created
+
+
+def test_cache_evicts_least_recently_used_by_size():
+    cache = ResponseCache(max_bytes=10)
+    owner = uuid.uuid4()
+    a, b, c = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+
+    cache.put("details", a, CachedResponse(instructor_id=owner, body=b"aaaa"))
+    cache.put("details", b, CachedResponse(instructor_id=owner, body=b"bbbb"))
+    assert cache.get("details", a, instructor_id=owner) is not None
+    cache.put("details", c, CachedResponse(instructor_id=owner, body=b"cccc"))
+
+    assert cache.get("details", b, instructor_id=owner) is None
+    assert cache.get("details", a, instructor_id=owner) is not None
+    assert cache.size == 8
+
+    cache.put("details", uuid.uuid4(), CachedResponse(instructor_id=owner, body=b"x" * 11))
+    assert cache.size == 8
+
+
+@pytest.mark.asyncio
+async def test_ended_session_responses_are_served_from_cache(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    cache = ResponseCache(max_bytes=1 << 20)
+    app.dependency_overrides[get_response_cache] = lambda: cache
+
+    headers = await _login_and_get_headers(client, db_session)
+    created = await _ended_session(client, headers)
+    base = f"/sessions/{created['session_id']}"
+
+    first = {suffix: await client.get(base + suffix, headers=headers) for suffix in ("", "/participants", "/messages")}
+    for res in first.values():
+        assert res.status_code == 200
+        assert res.headers["Cache-Control"] == "private, max-age=31536000, immutable"
+
+    # Prove the second read never reaches the session row.
+    await db_session.execute(
+        update(ExerciseSession).where(ExerciseSession.id == created["session_id"]).values(max_participants=1)
+    )
+    await db_session.commit()
+
+    for suffix, res in first.items():
+        again = await client.get(base + suffix, headers=headers)
+        assert again.status_code == 200
+        assert again.content == res.content
+
+    etag = first[""].headers["ETag"]
+    assert (await client.get(base, headers={**headers, "If-None-Match": etag})).status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_cached_response_is_not_served_to_other_instructors(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache(max_bytes=1 << 20)
+
+    owner_headers = await _login_and_get_headers(client, db_session, username="owner")
+    other_headers = await _login_and_get_headers(client, db_session, username="other")
+    created = await _ended_session(client, owner_headers)
+    url = f"/sessions/{created['session_id']}/messages"
+
+    assert (await client.get(url, headers=owner_headers)).status_code == 200
+    assert (await client.get(url, headers=other_headers)).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_live_sessions_are_not_cached(client, db_session, app):
+    cache = ResponseCache(max_bytes=1 << 20)
+    app.dependency_overrides[get_response_cache] = lambda: cache
+
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+
+    res = await client.get(f"/sessions/{created['session_id']}", headers=headers)
+    assert res.status_code == 200
+    assert "Cache-Control" not in res.headers
+    assert cache.size == 0
+
+
+@pytest.mark.asyncio
+async def test_participants_who_disconnect_after_end_leave_the_cached_list_valid(
+    client, db_session, db_sessionmaker, app, event_dispatcher
+):
+    fake_ws = FakeWsManager()
+    app.dependency_overrides[get_ws_manager] = lambda: fake_ws
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache(max_bytes=1 << 20)
+
+    headers = await _login_and_get_headers(client, db_session)
+    presence = PresenceTracker(grace_seconds=30)
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    participant_id = uuid.UUID(joined["participant_id"])
+    presence.connected(participant_id)
+    participant_headers = {"X-Participant-Token": joined["participant_token"]}
+    await client.post("/participant/ready", headers=participant_headers, json={"is_ready": True})
+    await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    ended = (await client.post(f"/sessions/{created['session_id']}/end", headers=headers)).json()
+
+    url = f"/sessions/{created['session_id']}/participants"
+    cached = await client.get(url, headers=headers)
+    [participant] = cached.json()["participants"]
+    assert participant["left_at"] == ended["ended_at"]
+    assert participant["is_ready"] is False
+    assert (await client.post("/participant/ready", headers=participant_headers, json={"is_ready": False})).status_code == 401
+
+    # The socket drops after the class ends and the grace window runs out.
+    dropped_at = datetime.now(timezone.utc)
+    presence.disconnected(session_id=uuid.UUID(created["session_id"]), participant_id=participant_id, now=dropped_at)
+    await event_dispatcher.drain()
+    fake_ws.calls.clear()
+    expired = presence.take_expired(dropped_at + timedelta(seconds=30))
+    assert await persist_departures(db_sessionmaker, event_dispatcher, fake_ws, expired) == 0
+    await event_dispatcher.drain()
+    assert fake_ws.calls == []
+
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache(max_bytes=0)
+    fresh = await client.get(url, headers=headers)
+    assert fresh.content == cached.content
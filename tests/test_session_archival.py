@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.security import hash_password
+from app.db.models.exercise_session import ExerciseSession
+from app.db.models.instructor import Instructor
+from app.db.models.message import Message
+from app.db.models.participant import Participant
+from app.db.models.session_archive import SessionArchive
+from app.services.archival import archive_ended_sessions
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _run_and_end_session(client, headers) -> tuple[dict, dict]:
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = (
+        await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})
+    ).json()
+    participant_headers = {"X-Participant-Token": joined["participant_token"]}
+
+    await client.post("/participant/ready", headers=participant_headers, json={"is_ready": True})
+    await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    await client.post("/participant/message", headers=participant_headers, json={"content": "CVE-2024-1234"})
+    end_res = await client.post(f"/sessions/{created['session_id']}/end", headers=headers)
+    assert end_res.status_code == 200
+    return created, joined
+
+
+@pytest.mark.asyncio
+async def test_archive_skips_recently_ended_sessions(client, db_session, db_sessionmaker, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+
+    headers = await _login_and_get_headers(client, db_session)
+    await _run_and_end_session(client, headers)
+
+    archived = await archive_ended_sessions(db_sessionmaker, older_than=timedelta(days=30))
+    assert archived == 0
+
+
+@pytest.mark.asyncio
+async def test_archived_session_is_served_from_archive(client, db_session, db_sessionmaker, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+
+    headers = await _login_and_get_headers(client, db_session)
+    created, joined = await _run_and_end_session(client, headers)
+
+    before = (await client.get(f"/sessions/{created['session_id']}", headers=headers)).json()
+
+    session = (
+        await db_session.execute(
+            select(ExerciseSession).where(ExerciseSession.id == created["session_id"])
+        )
+    ).scalar_one()
+    session.ended_at = datetime.now(timezone.utc) - timedelta(days=31)
+    await db_session.commit()
+
+    archived = await archive_ended_sessions(db_sessionmaker, older_than=timedelta(days=30))
+    assert archived == 1
+
+    # Hot tables no longer hold the session.
+    for model in (ExerciseSession, Participant, Message):
+        count = (await db_session.execute(select(func.count()).select_from(model))).scalar_one()
+        assert count == 0
+
+    archive = (await db_session.execute(select(SessionArchive))).scalar_one()
+    assert archive.participant_count == 1
+    assert archive.message_count == 1
+
+    detail_res = await client.get(f"/sessions/{created['session_id']}", headers=headers)
+    assert detail_res.status_code == 200
+    detail = detail_res.json()
+    assert detail["status"] == "ended"
+    assert detail["team_id"] == created["team_id"]
+    assert detail["started_at"] == before["started_at"]
+
+    participants_res = await client.get(f"/sessions/{created['session_id']}/participants", headers=headers)
+    assert participants_res.status_code == 200
+    assert [p["id"] for p in participants_res.json()["participants"]] == [joined["participant_id"]]
+
+    messages_res = await client.get(f"/sessions/{created['session_id']}/messages", headers=headers)
+    assert messages_res.status_code == 200
+    messages = messages_res.json()["messages"]
+    assert len(messages) == 1
+    assert messages[0]["display_name"] == "Alice"
+    assert messages[0]["content"] == "CVE-2024-1234"
+
+
+@pytest.mark.asyncio
+async def test_archived_session_other_instructor_404(client, db_session, db_sessionmaker, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+
+    headers_a = await _login_and_get_headers(client, db_session, username="a")
+    created, _ = await _run_and_end_session(client, headers_a)
+
+    session = (
+        await db_session.execute(
+            select(ExerciseSession).where(ExerciseSession.id == created["session_id"])
+        )
+    ).scalar_one()
+    session.ended_at = datetime.now(timezone.utc) - timedelta(days=31)
+    await db_session.commit()
+    assert await archive_ended_sessions(db_sessionmaker, older_than=timedelta(days=30)) == 1
+
+    headers_b = await _login_and_get_headers(client, db_session, username="b")
+    res = await client.get(f"/sessions/{created['session_id']}", headers=headers_b)
+    assert res.status_code == 404
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.core.security import hash_password
+from app.db.models.exercise_session import ExerciseSession
+from app.db.models.instructor import Instructor
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _counters(db_session, session_id: str) -> tuple[int, int, int]:
+    session = (
+        await db_session.execute(
+            select(ExerciseSession)
+            .where(ExerciseSession.id == session_id)
+            .execution_options(populate_existing=True)
+        )
+    ).scalar_one()
+    return session.active_participants, session.ready_participants, session.message_count
+
+
+@pytest.mark.asyncio
+async def test_counters_follow_join_ready_leave_and_messages(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    session_id = created["session_id"]
+
+    alice = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    bob = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Bob"})).json()
+    assert await _counters(db_session, session_id) == (2, 0, 0)
+
+    alice_headers = {"X-Participant-Token": alice["participant_token"]}
+    bob_headers = {"X-Participant-Token": bob["participant_token"]}
+
+    await client.post("/participant/ready", headers=alice_headers, json={"is_ready": True})
+    # Repeating the same state must not double count.
+    await client.post("/participant/ready", headers=alice_headers, json={"is_ready": True})
+    await client.post("/participant/ready", headers=bob_headers, json={"is_ready": True})
+    assert await _counters(db_session, session_id) == (2, 2, 0)
+
+    await client.post("/participant/ready", headers=bob_headers, json={"is_ready": False})
+    assert await _counters(db_session, session_id) == (2, 1, 0)
+
+    start_res = await client.post(f"/sessions/{session_id}/start", headers=headers)
+    assert start_res.json()["detail"] == "Not all participants are ready"
+
+    leave_res = await client.post("/participant/leave", headers=bob_headers)
+    assert leave_res.status_code == 200
+    assert await _counters(db_session, session_id) == (1, 1, 0)
+
+    start_res = await client.post(f"/sessions/{session_id}/start", headers=headers)
+    assert start_res.status_code == 200
+
+    for content in ("one", "two"):
+        res = await client.post("/participant/message", headers=alice_headers, json={"content": content})
+        assert res.status_code == 200
+    assert await _counters(db_session, session_id) == (1, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_joins_respect_capacity(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers, json={"max_participants": 2})).json()
+
+    results = await asyncio.gather(
+        *(
+            client.post("/join", json={"team_id": created["team_id"], "display_name": f"P{i}"})
+            for i in range(6)
+        )
+    )
+
+    assert sorted(r.status_code for r in results) == [200, 200, 409, 409, 409, 409]
+    assert await _counters(db_session, created["session_id"]) == (2, 0, 0)
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.core.security import hash_password
+from app.db.models.exercise_session import ExerciseSession
+from app.db.models.instructor import Instructor
+from app.services.presence import PresenceTracker, persist_departures
+from app.services.response_cache import ResponseCache, get_response_cache
+from app.services.session_versions import SessionVersionCache, get_session_version_cache
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("suffix", ["", "/participants"])
+async def test_matching_etag_returns_304_until_session_changes(client, db_session, app, suffix):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    url = f"/sessions/{created['session_id']}{suffix}"
+
+    first = await client.get(url, headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    revalidated = await client.get(url, headers={**headers, "If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == etag
+    assert revalidated.content == b""
+
+    joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    after_join = await client.get(url, headers={**headers, "If-None-Match": etag})
+    assert after_join.status_code == 200
+    assert after_join.headers["ETag"] != etag
+
+    etag = after_join.headers["ETag"]
+    await client.post(
+        "/participant/ready",
+        headers={"X-Participant-Token": joined["participant_token"]},
+        json={"is_ready": True},
+    )
+    after_ready = await client.get(url, headers={**headers, "If-None-Match": etag})
+    assert after_ready.status_code == 200
+    assert after_ready.headers["ETag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_weak_and_listed_etags_match(client, db_session):
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    url = f"/sessions/{created['session_id']}"
+    etag = (await client.get(url, headers=headers)).headers["ETag"]
+
+    res = await client.get(url, headers={**headers, "If-None-Match": f'"stale", W/{etag}'})
+    assert res.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_etag_is_not_shared_across_instructors(client, db_session):
+    owner_headers = await _login_and_get_headers(client, db_session, username="owner")
+    other_headers = await _login_and_get_headers(client, db_session, username="other")
+    created = (await client.post("/sessions", headers=owner_headers)).json()
+    url = f"/sessions/{created['session_id']}"
+    etag = (await client.get(url, headers=owner_headers)).headers["ETag"]
+
+    res = await client.get(url, headers={**other_headers, "If-None-Match": etag})
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_ended_session_version_is_cached(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    versions = SessionVersionCache()
+    app.dependency_overrides[get_session_version_cache] = lambda: versions
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache(max_bytes=0)
+
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    await client.post(
+        "/participant/ready",
+        headers={"X-Participant-Token": joined["participant_token"]},
+        json={"is_ready": True},
+    )
+    await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    await client.post(f"/sessions/{created['session_id']}/end", headers=headers)
+
+    url = f"/sessions/{created['session_id']}"
+    etag = (await client.get(url, headers=headers)).headers["ETag"]
+    assert (await client.get(url, headers={**headers, "If-None-Match": etag})).status_code == 304
+
+    instructor_id = (await client.get(url, headers=headers)).json()["instructor_id"]
+    cached = versions.get(uuid.UUID(created["session_id"]), instructor_id=uuid.UUID(instructor_id))
+    assert cached is not None
+    assert etag == f'"{created["session_id"]}-{cached}"'
+
+
+@pytest.mark.asyncio
+async def test_cached_ended_version_survives_late_disconnects(
+    client, db_session, db_sessionmaker, app, event_dispatcher
+):
+    fake_ws = FakeWsManager()
+    app.dependency_overrides[get_ws_manager] = lambda: fake_ws
+    versions = SessionVersionCache()
+    app.dependency_overrides[get_session_version_cache] = lambda: versions
+    app.dependency_overrides[get_response_cache] = lambda: ResponseCache(max_bytes=0)
+
+    headers = await _login_and_get_headers(client, db_session)
+    presence = PresenceTracker(grace_seconds=30)
+    created = (await client.post("/sessions", headers=headers)).json()
+    session_id = uuid.UUID(created["session_id"])
+    joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    participant_id = uuid.UUID(joined["participant_id"])
+    presence.connected(participant_id)
+    await client.post(
+        "/participant/ready",
+        headers={"X-Participant-Token": joined["participant_token"]},
+        json={"is_ready": True},
+    )
+    await client.post(f"/sessions/{session_id}/start", headers=headers)
+    await client.post(f"/sessions/{session_id}/end", headers=headers)
+
+    url = f"/sessions/{session_id}/participants"
+    etag = (await client.get(url, headers=headers)).headers["ETag"]
+    # Memoizes the ended session's version.
+    assert (await client.get(url, headers={**headers, "If-None-Match": etag})).status_code == 304
+
+    dropped_at = datetime.now(timezone.utc)
+    presence.disconnected(session_id=session_id, participant_id=participant_id, now=dropped_at)
+    expired = presence.take_expired(dropped_at + timedelta(seconds=30))
+    await persist_departures(db_sessionmaker, event_dispatcher, fake_ws, expired)
+
+    version = (
+        await db_session.execute(select(ExerciseSession.version).where(ExerciseSession.id == session_id))
+    ).scalar_one()
+    assert etag == f'"{session_id}-{version}"'
+    assert (await client.get(url, headers={**headers, "If-None-Match": etag})).status_code == 304
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import csv
+import io
+import json
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.core.security import hash_password
+from app.db.models.exercise_session import ExerciseSession
+from app.db.models.instructor import Instructor
+from app.services.archival import archive_ended_sessions
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+TRICKY_CONTENT = 'host "db01", path C:\\temp\nsecond line'
+
+
+async def _session_with_messages(client, headers) -> tuple[dict, dict]:
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = (
+        await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})
+    ).json()
+    participant_headers = {"X-Participant-Token": joined["participant_token"]}
+
+    await client.post("/participant/ready", headers=participant_headers, json={"is_ready": True})
+    await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    for content in ("first", TRICKY_CONTENT):
+        res = await client.post("/participant/message", headers=participant_headers, json={"content": content})
+        assert res.status_code == 200
+    return created, joined
+
+
+@pytest.mark.asyncio
+async def test_export_requires_auth(client):
+    res = await client.get(f"/sessions/{uuid.uuid4()}/export")
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_export_csv_streams_transcript(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+
+    headers = await _login_and_get_headers(client, db_session)
+    created, joined = await _session_with_messages(client, headers)
+
+    res = await client.get(f"/sessions/{created['session_id']}/export?format=csv", headers=headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/csv")
+    assert created["team_id"] in res.headers["content-disposition"]
+
+    rows = list(csv.DictReader(io.StringIO(res.text)))
+    assert [r["content"] for r in rows] == ["first", TRICKY_CONTENT]
+    assert rows[0]["participant_id"] == joined["participant_id"]
+    assert rows[0]["display_name"] == "Alice"
+    assert datetime.fromisoformat(rows[0]["created_at"]).utcoffset() == timedelta(0)
+
+
+@pytest.mark.asyncio
+async def test_export_ndjson_matches_message_listing(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+
+    headers = await _login_and_get_headers(client, db_session)
+    created, _ = await _session_with_messages(client, headers)
+
+    res = await client.get(f"/sessions/{created['session_id']}/export?format=ndjson", headers=headers)
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "application/x-ndjson"
+
+    exported = [json.loads(line) for line in res.text.splitlines()]
+    listed = (await client.get(f"/sessions/{created['session_id']}/messages", headers=headers)).json()
+
+    assert [e["id"] for e in exported] == [m["id"] for m in listed["messages"]]
+    assert [e["created_at"] for e in exported] == [m["created_at"] for m in listed["messages"]]
+    assert exported[1]["content"] == TRICKY_CONTENT
+    assert exported[1]["display_name"] == "Alice"
+
+
+@pytest.mark.asyncio
+async def test_export_archived_session(client, db_session, db_sessionmaker, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+
+    headers = await _login_and_get_headers(client, db_session)
+    created, _ = await _session_with_messages(client, headers)
+    await client.post(f"/sessions/{created['session_id']}/end", headers=headers)
+
+    live = await client.get(f"/sessions/{created['session_id']}/export?format=ndjson", headers=headers)
+
+    session = (
+        await db_session.execute(
+            select(ExerciseSession).where(ExerciseSession.id == created["session_id"])
+        )
+    ).scalar_one()
+    session.ended_at = datetime.now(timezone.utc) - timedelta(days=31)
+    await db_session.commit()
+    assert await archive_ended_sessions(db_sessionmaker, older_than=timedelta(days=30)) == 1
+
+    archived = await client.get(f"/sessions/{created['session_id']}/export?format=ndjson", headers=headers)
+    assert archived.status_code == 200
+
+    assert [json.loads(line) for line in archived.text.splitlines()] == [
+        json.loads(line) for line in live.text.splitlines()
+    ]
+
+    archived_csv = await client.get(f"/sessions/{created['session_id']}/export?format=csv", headers=headers)
+    rows = list(csv.DictReader(io.StringIO(archived_csv.text)))
+    assert [r["content"] for r in rows] == ["first", TRICKY_CONTENT]
@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import select
+
+from app.core.security import hash_password
+from app.db.models.exercise_session import ExerciseSession
+from app.db.models.instructor import Instructor
+from app.services.archival import archive_ended_sessions
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_requires_auth(client):
+    res = await client.get("/sessions")
+    assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_paginates_newest_first(client, db_session):
+    headers = await _login_and_get_headers(client, db_session)
+    created_ids = [(await client.post("/sessions", headers=headers)).json()["session_id"] for _ in range(5)]
+
+    other_headers = await _login_and_get_headers(client, db_session, username="other")
+    await client.post("/sessions", headers=other_headers)
+
+    seen: list[str] = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        res = await client.get("/sessions", headers=headers, params=params)
+        assert res.status_code == 200
+        body = res.json()
+        assert len(body["sessions"]) <= 2
+        seen.extend(s["id"] for s in body["sessions"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == list(reversed(created_ids))
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_reports_counts(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    for name in ("Alice", "Bob"):
+        joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": name})).json()
+        await client.post(
+            "/participant/ready",
+            headers={"X-Participant-Token": joined["participant_token"]},
+            json={"is_ready": True},
+        )
+    await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    await client.post(
+        "/participant/message",
+        headers={"X-Participant-Token": joined["participant_token"]},
+        json={"content": "hello"},
+    )
+
+    res = await client.get("/sessions", headers=headers)
+    assert res.status_code == 200
+    [summary] = res.json()["sessions"]
+    assert summary["id"] == created["session_id"]
+    assert summary["status"] == "running"
+    assert summary["participant_count"] == 2
+    assert summary["message_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_includes_archived_sessions(client, db_session, db_sessionmaker, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+
+    headers = await _login_and_get_headers(client, db_session)
+    old = (await client.post("/sessions", headers=headers)).json()
+    joined = (await client.post("/join", json={"team_id": old["team_id"], "display_name": "Alice"})).json()
+    await client.post(
+        "/participant/ready",
+        headers={"X-Participant-Token": joined["participant_token"]},
+        json={"is_ready": True},
+    )
+    await client.post(f"/sessions/{old['session_id']}/start", headers=headers)
+    await client.post(f"/sessions/{old['session_id']}/end", headers=headers)
+    new = (await client.post("/sessions", headers=headers)).json()
+
+    session = (
+        await db_session.execute(select(ExerciseSession).where(ExerciseSession.id == old["session_id"]))
+    ).scalar_one()
+    session.ended_at = datetime.now(timezone.utc) - timedelta(days=31)
+    await db_session.commit()
+    assert await archive_ended_sessions(db_sessionmaker, older_than=timedelta(days=30)) == 1
+
+    first = (await client.get("/sessions", headers=headers, params={"limit": 1})).json()
+    assert [s["id"] for s in first["sessions"]] == [new["session_id"]]
+
+    second = (
+        await client.get("/sessions", headers=headers, params={"limit": 1, "cursor": first["next_cursor"]})
+    ).json()
+    assert [s["id"] for s in second["sessions"]] == [old["session_id"]]
+    assert second["sessions"][0]["status"] == "ended"
+    assert second["sessions"][0]["participant_count"] == 1
+    assert second["next_cursor"] is None
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_rejects_invalid_cursor(client, db_session):
+    headers = await _login_and_get_headers(client, db_session)
+    res = await client.get("/sessions", headers=headers, params={"cursor": "not-a-cursor"})
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Invalid cursor"
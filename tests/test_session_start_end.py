@@ -65,7 +65,7 @@ async def test_start_rejects_when_not_all_ready(client, db_session, app):
 
 
 @pytest.mark.asyncio
-async def test_start_success_sets_running_and_broadcasts(client, db_session, app):
+async def test_start_success_sets_running_and_broadcasts(client, db_session, app, event_dispatcher):
     fake_ws = FakeWsManager()
     app.dependency_overrides[get_ws_manager] = lambda: fake_ws
 
@@ -90,6 +90,7 @@ async def test_start_success_sets_running_and_broadcasts(client, db_session, app
     assert body["status"] == "running"
     assert body["started_at"] is not None
 
+    await event_dispatcher.drain()
     assert any(c["type"] == "session_started" for c in fake_ws.calls)
 
 
@@ -135,7 +136,7 @@ async def test_end_rejects_when_not_running(client, db_session, app):
 
 
 @pytest.mark.asyncio
-async def test_end_success_sets_ended_and_broadcasts(client, db_session, app):
+async def test_end_success_sets_ended_and_broadcasts(client, db_session, app, event_dispatcher):
     fake_ws = FakeWsManager()
     app.dependency_overrides[get_ws_manager] = lambda: fake_ws
 
@@ -164,4 +165,5 @@ async def test_end_success_sets_ended_and_broadcasts(client, db_session, app):
     assert body["ended_at"] is not None
     assert body["ended_by"] == "instructor"
 
+    await event_dispatcher.drain()
     assert any(c["type"] == "session_ended" for c in fake_ws.calls)
@@ -0,0 +1,291 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+from datetime import timedelta
+
+import pytest
+from fastapi import WebSocketDisconnect
+from pydantic import ValidationError
+from sqlalchemy import delete, update
+
+from app.core.security import create_access_token, hash_password
+from app.core.settings import Settings, get_settings
+from app.db.models.exercise_session import ExerciseSession
+from app.db.models.instructor import Instructor
+from app.db.models.message import Message
+from app.services.outbox import relay_pending_events
+from app.services.session_stats import SessionStatsAggregator, get_session_stats
+from app.ws.deps import get_ws_manager
+from app.ws.dispatcher import Event
+from app.ws.router import ws_instructor
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+class BrokenWsManager(FakeWsManager):
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        raise RuntimeError("socket gone")
+
+
+class SlowEmptyDb:
+    # Stands in for the database during a cold load: blocks until released, returns no rows,
+    # and records how many loads ran at the same time.
+    def __init__(self, release: asyncio.Event) -> None:
+        self.release = release
+        self.active = 0
+        self.max_active = 0
+
+    async def execute(self, statement):
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await self.release.wait()
+            await asyncio.sleep(0)
+            return self
+        finally:
+            self.active -= 1
+
+    def all(self) -> list:
+        return []
+
+
+class FakeInstructorSocket:
+    def __init__(self) -> None:
+        self.headers: dict[str, str] = {}
+        self.closed_with: int | None = None
+
+    async def close(self, code: int) -> None:
+        self.closed_with = code
+
+    async def receive_text(self) -> str:
+        raise WebSocketDisconnect()
+
+
+class FakeSocketManager(FakeWsManager):
+    async def connect_instructor(self, session_id, websocket) -> None:
+        pass
+
+    async def disconnect(self, session_id, websocket) -> None:
+        pass
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _running_session(client, headers) -> tuple[dict, dict[str, dict[str, str]]]:
+    created = (await client.post("/sessions", headers=headers)).json()
+    participants = {}
+    for name in ("Alice", "Bob"):
+        joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": name})).json()
+        participants[name] = {"X-Participant-Token": joined["participant_token"]}
+        await client.post("/participant/ready", headers=participants[name], json={"is_ready": True})
+    await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    return created, participants
+
+
+@pytest.mark.asyncio
+async def test_stats_load_cold_then_follow_events(client, db_session, app, event_dispatcher):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    stats = SessionStatsAggregator()
+    app.dependency_overrides[get_session_stats] = lambda: stats
+    event_dispatcher.add_listener(stats.observe)
+
+    headers = await _login_and_get_headers(client, db_session)
+    created, participants = await _running_session(client, headers)
+    for _ in range(3):
+        await client.post("/participant/message", headers=participants["Alice"], json={"content": "x"})
+    await event_dispatcher.drain()
+
+    url = f"/sessions/{created['session_id']}/stats"
+    cold = (await client.get(url, headers=headers)).json()
+    by_name = {p["display_name"]: p for p in cold["participants"]}
+    assert cold["total_messages"] == 3
+    assert by_name["Alice"]["message_count"] == 3
+    assert by_name["Alice"]["seconds_to_first_submission"] >= 0
+    assert by_name["Bob"]["message_count"] == 0
+    assert by_name["Bob"]["seconds_to_first_submission"] is None
+    assert cold["submissions_per_minute"]["last_1m"] == 3
+    assert sum(bucket["count"] for bucket in cold["timeline"]) == 3
+
+    # Later reads come from the aggregator alone, not from the transcript.
+    await db_session.execute(delete(Message))
+    await db_session.commit()
+    await client.post("/participant/message", headers=participants["Bob"], json={"content": "y"})
+    await client.post("/participant/leave", headers=participants["Bob"])
+    await event_dispatcher.drain()
+
+    warm = (await client.get(url, headers=headers)).json()
+    by_name = {p["display_name"]: p for p in warm["participants"]}
+    assert warm["total_messages"] == 4
+    assert by_name["Bob"]["message_count"] == 1
+    assert by_name["Bob"]["left"] is True
+
+
+@pytest.mark.asyncio
+async def test_replayed_message_events_are_counted_once(client, db_session, app, event_dispatcher):
+    fake_ws = FakeWsManager()
+    app.dependency_overrides[get_ws_manager] = lambda: fake_ws
+    stats = SessionStatsAggregator()
+    app.dependency_overrides[get_session_stats] = lambda: stats
+    event_dispatcher.add_listener(stats.observe)
+
+    headers = await _login_and_get_headers(client, db_session)
+    created, participants = await _running_session(client, headers)
+    url = f"/sessions/{created['session_id']}/stats"
+    assert (await client.get(url, headers=headers)).json()["total_messages"] == 0
+    stats.take_dirty()
+
+    await client.post("/participant/message", headers=participants["Alice"], json={"content": "x"})
+    await event_dispatcher.drain()
+    submitted = next(c for c in fake_ws.calls if c["type"] == "message_submitted")
+    stats.observe(
+        Event(ws=None, session_id=submitted["session_id"], event_type="message_submitted", data=submitted["data"])
+    )
+
+    changed = stats.take_dirty()
+    assert [session_id for session_id, _ in changed] == [created["session_id"]]
+    assert changed[0][1]["total_messages"] == 1
+    assert stats.take_dirty() == []
+
+
+@pytest.mark.asyncio
+async def test_old_message_replayed_after_cold_load_is_counted_once(
+    client, db_session, db_sessionmaker, app, event_dispatcher
+):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    stats = SessionStatsAggregator()
+    app.dependency_overrides[get_session_stats] = lambda: stats
+    event_dispatcher.add_listener(stats.observe)
+
+    headers = await _login_and_get_headers(client, db_session)
+    created, participants = await _running_session(client, headers)
+    await event_dispatcher.drain()
+
+    # The live delivery is lost and the message is older than any "recent" window by the
+    # time the session is loaded (e.g. after a restart).
+    app.dependency_overrides[get_ws_manager] = lambda: BrokenWsManager()
+    await client.post("/participant/message", headers=participants["Alice"], json={"content": "x"})
+    await event_dispatcher.drain()
+    await db_session.execute(update(Message).values(created_at=Message.created_at - timedelta(minutes=10)))
+    await db_session.commit()
+
+    url = f"/sessions/{created['session_id']}/stats"
+    assert (await client.get(url, headers=headers)).json()["total_messages"] == 1
+
+    await relay_pending_events(db_sessionmaker, event_dispatcher, FakeWsManager(), older_than=timedelta(0))
+    await event_dispatcher.drain()
+
+    snapshot = (await client.get(url, headers=headers)).json()
+    assert snapshot["total_messages"] == 1
+    assert sum(bucket["count"] for bucket in snapshot["timeline"]) == 1
+    by_name = {p["display_name"]: p for p in snapshot["participants"]}
+    assert by_name["Alice"]["message_count"] == 1
+
+
+@pytest.mark.asyncio
+async def test_session_is_never_loaded_twice_at_once():
+    stats = SessionStatsAggregator(max_sessions=1)
+    release = asyncio.Event()
+    session, other = ExerciseSession(id=uuid.uuid4()), ExerciseSession(id=uuid.uuid4())
+    db, other_db = SlowEmptyDb(release), SlowEmptyDb(release)
+
+    # The other session's load finishes right after the first one and evicts it, so the
+    # task queued behind the first load has to load it again while newcomers keep arriving.
+    tasks = [
+        asyncio.create_task(stats.snapshot(db, session)),
+        asyncio.create_task(stats.snapshot(other_db, other)),
+        asyncio.create_task(stats.snapshot(db, session)),
+    ]
+    await asyncio.sleep(0)
+    release.set()
+    for _ in range(5):
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(stats.snapshot(db, session)))
+    await asyncio.gather(*tasks)
+
+    assert db.max_active == 1
+
+
+@pytest.mark.asyncio
+async def test_load_returns_stats_even_when_evicted_at_once():
+    stats = SessionStatsAggregator(max_sessions=0)
+    release = asyncio.Event()
+    release.set()
+    session = ExerciseSession(id=uuid.uuid4())
+
+    snapshot = await stats.snapshot(SlowEmptyDb(release), session)
+    await stats.watch(SlowEmptyDb(release), session)
+
+    assert snapshot["session_id"] == str(session.id)
+    assert snapshot["total_messages"] == 0
+    with pytest.raises(ValidationError) as exc:
+        Settings(
+            database_url="postgresql+asyncpg://localhost/db",
+            jwt_secret="secret",
+            participant_token_pepper="pepper",
+            stats_max_sessions=0,
+        )
+    assert [error["loc"] for error in exc.value.errors()] == [("stats_max_sessions",)]
+
+
+@pytest.mark.asyncio
+async def test_stats_for_other_instructor_is_404(client, db_session, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    owner_headers = await _login_and_get_headers(client, db_session, username="owner")
+    other_headers = await _login_and_get_headers(client, db_session, username="other")
+    created = (await client.post("/sessions", headers=owner_headers)).json()
+
+    res = await client.get(f"/sessions/{created['session_id']}/stats", headers=other_headers)
+    assert res.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_instructor_socket_makes_stats_broadcast_without_http_read(
+    client, db_session, db_sessionmaker, app, event_dispatcher
+):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+    stats = SessionStatsAggregator()
+    event_dispatcher.add_listener(stats.observe)
+
+    headers = await _login_and_get_headers(client, db_session)
+    created, participants = await _running_session(client, headers)
+    await event_dispatcher.drain()
+    # Nobody has read /stats, so the aggregator does not follow the session yet.
+    assert stats.take_dirty() == []
+
+    settings = app.dependency_overrides[get_settings]()
+    instructor = (await client.get(f"/sessions/{created['session_id']}", headers=headers)).json()
+    socket = FakeInstructorSocket()
+    await ws_instructor(
+        socket,
+        uuid.UUID(created["session_id"]),
+        access_token=create_access_token(settings, instructor_id=instructor["instructor_id"]),
+        sessionmaker=db_sessionmaker,
+        settings=settings,
+        ws=FakeSocketManager(),
+        stats=stats,
+    )
+    assert socket.closed_with is None
+    [(session_id, snapshot)] = stats.take_dirty()
+    assert session_id == created["session_id"]
+    assert snapshot["total_messages"] == 0
+
+    await client.post("/participant/message", headers=participants["Alice"], json={"content": "x"})
+    await event_dispatcher.drain()
+    [(_, snapshot)] = stats.take_dirty()
+    assert snapshot["total_messages"] == 1
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.security import hash_password
+from app.db.models.exercise_session import ExerciseSession
+from app.db.models.instructor import Instructor
+from app.db.models.team_id_pool import TeamIdPoolEntry
+from app.services import team_id
+from app.services.archival import archive_ended_sessions
+from app.services.team_id_pool import refill_team_id_pool
+from app.ws.deps import get_ws_manager
+
+
+class FakeWsManager:
+    def __init__(self) -> None:
+        self.calls: list[dict] = []
+
+    async def broadcast(self, *, session_id, event_type: str, data: dict) -> None:
+        self.calls.append({"session_id": str(session_id), "type": event_type, "data": data})
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _pool(db_session) -> set[str]:
+    result = await db_session.execute(select(TeamIdPoolEntry.team_id))
+    return set(result.scalars().all())
+
+
+@pytest.mark.asyncio
+async def test_refill_tops_up_to_target(db_session, db_sessionmaker):
+    added = await refill_team_id_pool(db_sessionmaker, target_size=20)
+    assert added == 20
+    assert len(await _pool(db_session)) == 20
+
+    assert await refill_team_id_pool(db_sessionmaker, target_size=20) == 0
+
+
+@pytest.mark.asyncio
+async def test_create_session_takes_id_from_pool(client, db_session, db_sessionmaker):
+    headers = await _login_and_get_headers(client, db_session)
+    await refill_team_id_pool(db_sessionmaker, target_size=5)
+    pooled = await _pool(db_session)
+
+    res = await client.post("/sessions", headers=headers)
+    assert res.status_code == 201
+    created_team_id = res.json()["team_id"]
+
+    assert created_team_id in pooled
+    assert created_team_id not in await _pool(db_session)
+
+
+@pytest.mark.asyncio
+async def test_refill_skips_ids_used_by_sessions(client, db_session, db_sessionmaker, monkeypatch):
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+
+    candidates = iter([created["team_id"], "ABCDEF"])
+    monkeypatch.setattr(team_id, "generate_team_id", lambda: next(candidates))
+
+    await db_session.execute(TeamIdPoolEntry.__table__.delete())
+    await db_session.commit()
+
+    added = await refill_team_id_pool(db_sessionmaker, target_size=2)
+    assert added == 1
+    assert await _pool(db_session) == {"ABCDEF"}
+
+
+@pytest.mark.asyncio
+async def test_archival_recycles_team_id(client, db_session, db_sessionmaker, app):
+    app.dependency_overrides[get_ws_manager] = lambda: FakeWsManager()
+
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    await client.post(
+        "/participant/ready",
+        headers={"X-Participant-Token": joined["participant_token"]},
+        json={"is_ready": True},
+    )
+    await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    await client.post(f"/sessions/{created['session_id']}/end", headers=headers)
+
+    session = (
+        await db_session.execute(select(ExerciseSession).where(ExerciseSession.id == created["session_id"]))
+    ).scalar_one()
+    session.ended_at = datetime.now(timezone.utc) - timedelta(days=31)
+    await db_session.commit()
+
+    assert await archive_ended_sessions(db_sessionmaker, older_than=timedelta(days=30)) == 1
+    assert created["team_id"] in await _pool(db_session)
+
+    remaining = (await db_session.execute(select(func.count()).select_from(ExerciseSession))).scalar_one()
+    assert remaining == 0
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.core import tracing
+from app.core.security import hash_password
+from app.core.settings import Settings
+from app.db.models.instructor import Instructor
+from app.ws.deps import get_ws_manager
+from app.ws.manager import WsManager
+
+
+async def _login_and_get_headers(client, db_session, *, username: str = "instructor") -> dict[str, str]:
+    instructor = Instructor(username=username, password_hash=hash_password("password-1234"))
+    db_session.add(instructor)
+    await db_session.commit()
+
+    res = await client.post("/auth/login", json={"username": username, "password": "password-1234"})
+    assert res.status_code == 200
+    token = res.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+class FakeSocket:
+    async def accept(self) -> None:
+        pass
+
+    async def send_json(self, payload: dict) -> None:
+        pass
+
+
+def _read_spans(path) -> list[dict]:
+    spans = []
+    for line in path.read_text().splitlines():
+        for resource in json.loads(line)["resourceSpans"]:
+            for scope in resource["scopeSpans"]:
+                spans.extend(scope["spans"])
+    return spans
+
+
+@pytest.mark.asyncio
+async def test_message_trace_spans_request_db_and_broadcast(client, db_session, app, event_dispatcher, tmp_path):
+    manager = WsManager()
+    app.dependency_overrides[get_ws_manager] = lambda: manager
+    headers = await _login_and_get_headers(client, db_session)
+    created = (await client.post("/sessions", headers=headers)).json()
+    joined = (await client.post("/join", json={"team_id": created["team_id"], "display_name": "Alice"})).json()
+    participant_headers = {"X-Participant-Token": joined["participant_token"]}
+    await client.post("/participant/ready", headers=participant_headers, json={"is_ready": True})
+    await client.post(f"/sessions/{created['session_id']}/start", headers=headers)
+    await manager.connect_instructor(created["session_id"], FakeSocket())
+    await event_dispatcher.drain()
+
+    trace_file = tmp_path / "traces.jsonl"
+    tracing.configure_tracing(
+        Settings(database_url="unused", jwt_secret="x", participant_token_pepper="y", trace_file=str(trace_file))
+    )
+    trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+    try:
+        res = await client.post(
+            "/participant/message",
+            headers={**participant_headers, "traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+            json={"content": "hello"},
+        )
+        await event_dispatcher.drain()
+    finally:
+        tracing.shutdown_tracing()
+
+    assert res.status_code == 200
+    assert res.headers["traceresponse"].startswith(f"00-{trace_id}-")
+
+    spans = _read_spans(trace_file)
+    assert {s["traceId"] for s in spans} == {trace_id}
+    by_name = {}
+    for s in spans:
+        by_name.setdefault(s["name"], []).append(s)
+
+    root = by_name["POST /participant/message"][0]
+    assert root["parentSpanId"] == "00f067aa0ba902b7"
+    assert root["kind"] == tracing.KIND_SERVER
+    assert by_name["get_current_participant"][0]["parentSpanId"] == root["spanId"]
+    assert by_name["db.commit"][0]["parentSpanId"] == root["spanId"]
+    assert any("INSERT INTO messages" in a["value"]["stringValue"] for q in by_name["db.query"] for a in q["attributes"])
+
+    deliveries = [
+        s for s in by_name["event.deliver"]
+        if {"key": "event.type", "value": {"stringValue": "message_submitted"}} in s["attributes"]
+    ]
+    assert deliveries and deliveries[0]["parentSpanId"] == root["spanId"]
+    broadcasts = [s for s in by_name["ws.broadcast"] if s["parentSpanId"] == deliveries[0]["spanId"]]
+    assert len(broadcasts) == 1
+    assert [s["parentSpanId"] for s in by_name["ws.send"]].count(broadcasts[0]["spanId"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_tracing_is_off_without_a_trace_file(client):
+    assert not tracing.enabled()
+    with tracing.span("noop") as current:
+        assert current is None
+    # No per-call context manager is built while tracing is off.
+    assert tracing.span("a") is tracing.span("b")
+
+    res = await client.get("/sessions")
+    assert "traceresponse" not in res.headers